@@ -0,0 +1,282 @@
+"""Нагрузочный тест оплаты заказов.
+
+    python practise.py load --orders 100000 --threads 16 --failure-rate 0.02
+    python -m benchmarks.load_test --repository sqlite --gateway micro_batching --latency 0.001
+
+Заказы из WorkloadGenerator сохраняются заранее (вне замера), затем операции
+смеси выполняются через PayOrderUseCase в пуле потоков. Отчет: пропускная
+способность, исходы операций и задержки p50/p95/p99 по каждому виду операций.
+
+Исходы: ok - операция прошла, rejected - ожидаемый отказ по сценарию операции
+(оплата отмененного или пустого заказа), failed - отказ платежного шлюза,
+unexpected - все остальное, включая ConcurrentModificationError и успех там,
+где ожидался отказ. Код возврата 1, если есть неожиданные исходы.
+"""
+import argparse
+import json
+import math
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.domain.order import Order
+from src.application.ports.order_repository import OrderRepository
+from src.application.ports.payment_gateway import PaymentGateway, PaymentGatewayUnavailableError
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.payment_gateways.micro_batching_payment_gateway import MicroBatchingPaymentGateway
+from src.infrastructure.payment_gateways.resilient_payment_gateway import ResilientPaymentGateway
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.sqlite_order_repository import SqliteOrderRepository
+from src.infrastructure.repositories.cold_order_store import SqliteColdOrderStore
+from src.infrastructure.repositories.tiered_order_repository import TieredOrderRepository
+from benchmarks.workload import CANCEL, DUPLICATE_PAY, EMPTY, PAY, WorkloadConfig, WorkloadGenerator, parse_mix
+
+REPOSITORIES = ("memory", "sqlite", "tiered")
+GATEWAYS = ("fake", "resilient", "micro_batching")
+
+OK = "ok"
+REJECTED = "rejected"
+FAILED = "failed"
+UNEXPECTED = "unexpected"
+
+PERCENTILES = (50, 95, 99)
+
+
+class UnexpectedOutcomeError(Exception):
+    """Операция завершилась не так, как предписывает ее сценарий"""
+
+
+@dataclass(frozen=True)
+class LoadTestConfig:
+    workload: WorkloadConfig = field(default_factory=WorkloadConfig)
+    threads: int = 8
+    repository: str = "memory"
+    gateway: str = "fake"
+    failure_rate: float = 0.0
+    latency: float = 0.0
+
+    def __post_init__(self):
+        if self.threads <= 0:
+            raise ValueError("Число потоков должно быть положительным")
+        if self.repository not in REPOSITORIES:
+            raise ValueError(f"Неизвестный репозиторий: {self.repository}")
+        if self.gateway not in GATEWAYS:
+            raise ValueError(f"Неизвестный шлюз: {self.gateway}")
+
+
+@dataclass
+class LoadTestReport:
+    duration: float = 0.0
+    outcomes: Dict[str, int] = field(default_factory=lambda: {OK: 0, REJECTED: 0, FAILED: 0, UNEXPECTED: 0})
+    operation_outcomes: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+
+    @property
+    def operations(self) -> int:
+        return sum(self.outcomes.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.duration if self.duration else 0.0
+
+    def record(self, operation: str, outcome: str, latency: float) -> None:
+        self.outcomes[outcome] += 1
+        counts = self.operation_outcomes.setdefault(operation, dict.fromkeys(self.outcomes, 0))
+        counts[outcome] += 1
+        self.latencies.setdefault(operation, []).append(latency)
+
+    def percentiles(self, operation: Optional[str] = None) -> Dict[int, float]:
+        """Задержки в секундах для p50/p95/p99; operation=None - по всем операциям"""
+        if operation is None:
+            samples = sorted(latency for values in self.latencies.values() for latency in values)
+        else:
+            samples = sorted(self.latencies.get(operation, ()))
+        return {percentile: _nearest_rank(samples, percentile) for percentile in PERCENTILES}
+
+    def to_json(self) -> Dict:
+        return {
+            "operations": self.operations,
+            "duration_seconds": self.duration,
+            "throughput_per_second": self.throughput,
+            "outcomes": dict(self.outcomes),
+            "operation_outcomes": {name: dict(counts) for name, counts in sorted(self.operation_outcomes.items())},
+            "latency_seconds": self._latency_json(),
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"Операций: {self.operations} за {self.duration:.2f} с, {self.throughput:,.0f} оп/с",
+            "Исходы: " + ", ".join(f"{name}={count}" for name, count in self.outcomes.items()),
+            *(
+                f"  {operation}: " + ", ".join(f"{name}={count}" for name, count in counts.items() if count)
+                for operation, counts in sorted(self.operation_outcomes.items())
+            ),
+            f"{'операция':15} {'кол-во':>8} " + " ".join(f"{'p' + str(p) + ' мс':>10}" for p in PERCENTILES),
+        ]
+        for name in ["all", *sorted(self.latencies)]:
+            operation = None if name == "all" else name
+            count = self.operations if operation is None else len(self.latencies[name])
+            values = self.percentiles(operation)
+            lines.append(f"{name:15} {count:>8} " + " ".join(f"{values[p] * 1000:>10.3f}" for p in PERCENTILES))
+        return "\n".join(lines)
+
+    def _latency_json(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for name in ["all", *sorted(self.latencies)]:
+            values = self.percentiles(None if name == "all" else name)
+            result[name] = {f"p{p}": value for p, value in values.items()}
+        return result
+
+
+def run_load_test(config: LoadTestConfig) -> LoadTestReport:
+    directory = tempfile.mkdtemp(prefix="orders-load-")
+    repository, gateway, close = _build_stack(config, directory)
+    try:
+        use_case = PayOrderUseCase(repository, gateway)
+        operations = list(WorkloadGenerator(config.workload).operations())
+        repository.save_many(order for _, order in operations)
+        handlers = _handlers(use_case, repository)
+
+        def execute(item: Tuple[str, Order]) -> Tuple[str, str, float]:
+            operation, order = item
+            started = time.perf_counter()
+            try:
+                outcome = handlers[operation](order.id)
+            except PaymentGatewayUnavailableError:
+                outcome = FAILED
+            except Exception:
+                outcome = UNEXPECTED
+            return operation, outcome, time.perf_counter() - started
+
+        report = LoadTestReport()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=config.threads) as pool:
+            for operation, outcome, latency in pool.map(execute, operations, chunksize=64):
+                report.record(operation, outcome, latency)
+        report.duration = time.perf_counter() - started
+        return report
+    finally:
+        close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _handlers(use_case: PayOrderUseCase, repository: OrderRepository) -> Dict[str, Callable[[str], str]]:
+    """Сценарии операций; каждый возвращает ожидаемый исход или бросает исключение"""
+    def pay(order_id: str) -> str:
+        use_case.execute(order_id)
+        return OK
+
+    def duplicate_pay(order_id: str) -> str:
+        # Клиент повторяет запрос с тем же ключом: второй ответ берется из кэша идемпотентности
+        key = f"pay-{order_id}"
+        first = use_case.execute(order_id, idempotency_key=key)
+        if use_case.execute(order_id, idempotency_key=key) != first:
+            raise UnexpectedOutcomeError(f"Повторная оплата заказа {order_id} вернула другой ответ")
+        return OK
+
+    def cancel(order_id: str) -> str:
+        with repository.lock(order_id):
+            order = repository.get_by_id(order_id)
+            if order is None:
+                raise UnexpectedOutcomeError(f"Заказ {order_id} не найден")
+            order.cancel()
+            repository.save(order)
+        return _rejected(use_case, order_id, "Нельзя оплатить отмененный заказ")
+
+    def empty(order_id: str) -> str:
+        return _rejected(use_case, order_id, "Нельзя оплатить пустой заказ")
+
+    return {PAY: pay, DUPLICATE_PAY: duplicate_pay, CANCEL: cancel, EMPTY: empty}
+
+
+def _rejected(use_case: PayOrderUseCase, order_id: str, reason: str) -> str:
+    """Оплата должна быть отклонена предметной областью именно по причине reason"""
+    try:
+        use_case.execute(order_id)
+    except ValueError as error:
+        # Подклассы ValueError (конфликт версий, отказ шлюза) - не бизнес-отказ
+        if type(error) is not ValueError or str(error) != reason:
+            raise
+        return REJECTED
+    raise UnexpectedOutcomeError(f"Оплата заказа {order_id} должна была быть отклонена: {reason}")
+
+
+def _build_stack(config: LoadTestConfig, directory: str) -> Tuple[OrderRepository, PaymentGateway, Callable[[], None]]:
+    closers = []
+    if config.repository == "sqlite":
+        repository = SqliteOrderRepository(f"{directory}/orders.db", pool_size=config.threads)
+        closers.append(repository.close)
+    elif config.repository == "tiered":
+        # write_through (по умолчанию): сохранения сразу на диске, как у sqlite - сравнение честное
+        repository = TieredOrderRepository(SqliteColdOrderStore(f"{directory}/cold.db"), write_through=True)
+        closers.append(repository.close)
+    else:
+        repository = InMemoryOrderRepository()
+
+    fake = FakePaymentGateway()
+    fake.set_fail_mode(False, failure_rate=config.failure_rate, latency=config.latency, seed=config.workload.seed)
+    gateway: PaymentGateway = fake
+    if config.gateway == "resilient":
+        gateway = ResilientPaymentGateway(fake)
+    elif config.gateway == "micro_batching":
+        gateway = MicroBatchingPaymentGateway(fake, max_batch_size=config.threads)
+        closers.insert(0, gateway.close)
+
+    def close() -> None:
+        for closer in closers:
+            closer()
+
+    return repository, gateway, close
+
+
+def _nearest_rank(samples: List[float], percentile: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[max(0, math.ceil(percentile / 100 * len(samples)) - 1)]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест оплаты заказов")
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--customers", type=int, default=1_000)
+    parser.add_argument("--mean-lines", type=float, default=3.0, help="среднее число строк в заказе")
+    parser.add_argument("--mix", type=parse_mix, default=None,
+                        help="смесь операций, например pay=0.85,duplicate_pay=0.05,cancel=0.05,empty=0.05")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--repository", choices=REPOSITORIES, default="memory")
+    parser.add_argument("--gateway", choices=GATEWAYS, default="fake")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="доля отказов платежного шлюза")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка шлюза на запрос, секунды")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="куда записать отчет в JSON")
+    args = parser.parse_args(argv)
+
+    workload = WorkloadConfig(
+        orders=args.orders,
+        customers=args.customers,
+        mean_lines=args.mean_lines,
+        seed=args.seed,
+        **({"mix": args.mix} if args.mix is not None else {})
+    )
+    report = run_load_test(LoadTestConfig(
+        workload=workload,
+        threads=args.threads,
+        repository=args.repository,
+        gateway=args.gateway,
+        failure_rate=args.failure_rate,
+        latency=args.latency
+    ))
+    print(report.format())
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report.to_json(), file, indent=2, ensure_ascii=False)
+    return 1 if report.outcomes[UNEXPECTED] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
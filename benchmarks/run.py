@@ -0,0 +1,113 @@
+"""Запуск бенчмарков и сравнение с сохраненной базовой линией.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+    python -m benchmarks.run --baseline benchmarks/baseline.json --save-baseline
+
+Код возврата 1, если какая-либо метрика хуже базовой больше чем на порог или
+отсутствует в базовой линии; 2, если базовая линия снята с другим --scale.
+"""
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.suite import BENCHMARKS, Metrics, run_suite
+
+
+def to_json(metrics: Metrics, scale: float) -> Dict:
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "scale": scale,
+        "metrics": {name: {"value": value, "unit": unit} for name, (value, unit) in metrics.items()},
+    }
+
+
+class BaselineMismatchError(ValueError):
+    """Результаты и базовая линия сняты на разных размерах нагрузки и несравнимы"""
+
+
+def find_regressions(
+    results: Dict,
+    baseline: Dict,
+    threshold: float,
+    thresholds: Dict[str, float] = None
+) -> List[str]:
+    """Метрики, выросшие относительно базовой линии больше чем на порог (0.2 = 20%),
+    и метрики, которых в базовой линии нет: имена метрик включают размер нагрузки"""
+    if results.get("scale") != baseline.get("scale"):
+        raise BaselineMismatchError(
+            f"Базовая линия снята с scale={baseline.get('scale')}, текущий запуск - с scale={results.get('scale')}"
+        )
+    thresholds = thresholds or {}
+    regressions = []
+    for name, current in results["metrics"].items():
+        reference = baseline["metrics"].get(name)
+        if reference is None:
+            regressions.append(f"{name}: нет в базовой линии")
+            continue
+        if reference["value"] <= 0:
+            continue
+        change = current["value"] / reference["value"] - 1
+        if change > thresholds.get(name, threshold):
+            regressions.append(
+                f"{name}: {reference['value']:.1f} -> {current['value']:.1f} {current['unit']} (+{change:.0%})"
+            )
+    return regressions
+
+
+def _parse_thresholds(values: List[str]) -> Dict[str, float]:
+    thresholds = {}
+    for value in values:
+        name, _, limit = value.partition("=")
+        thresholds[name] = float(limit)
+    return thresholds
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей модели заказов")
+    parser.add_argument("--scale", type=float, default=1.0, help="множитель размеров (1.0 = 10^6 заказов в репозитории)")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), default=[])
+    parser.add_argument("--output", help="куда записать результаты в JSON")
+    parser.add_argument("--baseline", help="файл базовой линии для сравнения")
+    parser.add_argument("--save-baseline", action="store_true", help="записать результаты как новую базовую линию")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимое ухудшение, доля")
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="METRIC=LIMIT",
+                        help="порог для отдельной метрики")
+    args = parser.parse_args(argv)
+
+    results = to_json(run_suite(args.scale, args.only), args.scale)
+    for name, metric in results["metrics"].items():
+        print(f"{name:45} {metric['value']:14.1f} {metric['unit']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+        return 0
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        try:
+            regressions = find_regressions(results, baseline, args.threshold, _parse_thresholds(args.threshold_for))
+        except BaselineMismatchError as e:
+            print(f"\nСравнение невозможно: {e}")
+            return 2
+        if regressions:
+            print("\nРегрессии производительности:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nРегрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
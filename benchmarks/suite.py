@@ -0,0 +1,178 @@
+"""Бенчмарки горячих путей: Money, Order, PayOrderUseCase, InMemoryOrderRepository и платежный шлюз.
+
+Каждый бенчмарк возвращает словарь метрик {имя: (значение, единица)}; для всех
+метрик меньшее значение лучше.
+"""
+import gc
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Callable, Dict, List, Tuple
+
+from src.domain.money import Money
+from src.domain.order import Order
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.application.ports.payment_gateway import PaymentGateway
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.payment_gateways.micro_batching_payment_gateway import MicroBatchingPaymentGateway
+
+Metrics = Dict[str, Tuple[float, str]]
+
+PRICE = Money(Decimal("19.99"), "USD")
+
+
+def _best_time(function: Callable[[], None], repeat: int = 5) -> float:
+    """Лучшее из repeat измерений, в секундах"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _per_op(seconds: float, operations: int) -> float:
+    return seconds / operations * 1e9
+
+
+def _build_order(lines: int) -> Order:
+    order = Order(customer_id="customer")
+    for i in range(lines):
+        order.add_line(f"product-{i}", "Товар", 1 + i % 5, PRICE)
+    return order
+
+
+def bench_money(scale: float) -> Metrics:
+    operations = max(1, int(200_000 * scale))
+    amount = Decimal("19.99")
+    other = Money(Decimal("5.01"), "USD")
+
+    def construct():
+        for _ in range(operations):
+            Money(amount, "USD")
+
+    def arithmetic():
+        for _ in range(operations):
+            PRICE + other * 3
+
+    return {
+        "money.construct": (_per_op(_best_time(construct), operations), "ns/op"),
+        "money.add_mul": (_per_op(_best_time(arithmetic), operations), "ns/op"),
+    }
+
+
+def bench_order(scale: float) -> Metrics:
+    # Размеры заказов не масштабируются: метрика должна описывать рост с числом строк
+    metrics: Metrics = {}
+    for lines in (10, 100, 1_000, 10_000):
+        build = _best_time(lambda: _build_order(lines), repeat=3)
+        metrics[f"order.add_line[{lines}]"] = (_per_op(build, lines), "ns/line")
+
+        order = _build_order(lines)
+        reads = 1_000
+
+        def read_total():
+            for _ in range(reads):
+                order.total_amount
+
+        metrics[f"order.total_amount[{lines}]"] = (_per_op(_best_time(read_total), reads), "ns/op")
+    return metrics
+
+
+def bench_pay_order(scale: float) -> Metrics:
+    count = max(1, int(20_000 * scale))
+
+    def run():
+        repository = InMemoryOrderRepository()
+        use_case = PayOrderUseCase(repository, FakePaymentGateway())
+        orders = [_build_order(3) for _ in range(count)]
+        repository.save_many(orders)
+        started = time.perf_counter()
+        for order in orders:
+            use_case.execute(order.id)
+        return time.perf_counter() - started
+
+    best = min(run() for _ in range(3))
+    return {"pay_order.execute": (_per_op(best, count), "ns/op")}
+
+
+def bench_repository(scale: float) -> Metrics:
+    count = max(1, int(1_000_000 * scale))
+    orders: List[Order] = [_build_order(2) for _ in range(count)]
+
+    repository = InMemoryOrderRepository()
+    started = time.perf_counter()
+    for order in orders:
+        repository.save(order)
+    save = time.perf_counter() - started
+
+    ids = [order.id for order in orders]
+    started = time.perf_counter()
+    for order_id in ids:
+        repository.get_by_id(order_id)
+    get = time.perf_counter() - started
+
+    del repository, orders
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        repository = InMemoryOrderRepository()
+        for _ in range(count):
+            repository.save(_build_order(2))
+        memory = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    return {
+        f"repository.save[{count}]": (_per_op(save, count), "ns/op"),
+        f"repository.get_by_id[{count}]": (_per_op(get, count), "ns/op"),
+        f"repository.memory_per_order[{count}]": (memory / count, "bytes/order"),
+    }
+
+
+def bench_payment_gateway(scale: float) -> Metrics:
+    """Параллельные charge к шлюзу с 4 соединениями и задержкой 1 мс на запрос: напрямую и через микропакеты"""
+    count = max(1, int(2_000 * scale))
+    threads = 32
+
+    def run(gateway: PaymentGateway, inner: FakePaymentGateway) -> Tuple[float, int]:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda i: gateway.charge(f"order-{i}", PRICE), range(count)))
+        return time.perf_counter() - started, inner.round_trips
+
+    direct = FakePaymentGateway(max_connections=4)
+    direct.set_fail_mode(False, latency=0.001)
+    direct_time, direct_trips = run(direct, direct)
+
+    inner = FakePaymentGateway(max_connections=4)
+    inner.set_fail_mode(False, latency=0.001)
+    with MicroBatchingPaymentGateway(inner, max_batch_size=threads, max_wait=0.001) as batching:
+        batched_time, batched_trips = run(batching, inner)
+
+    return {
+        "payment_gateway.charge[direct]": (_per_op(direct_time, count), "ns/op"),
+        "payment_gateway.charge[micro_batched]": (_per_op(batched_time, count), "ns/op"),
+        "payment_gateway.round_trips_per_charge[micro_batched]": (batched_trips / count, "trips/op"),
+    }
+
+
+BENCHMARKS: Dict[str, Callable[[float], Metrics]] = {
+    "money": bench_money,
+    "order": bench_order,
+    "pay_order": bench_pay_order,
+    "repository": bench_repository,
+    "payment_gateway": bench_payment_gateway,
+}
+
+
+def run_suite(scale: float = 1.0, only: List[str] = ()) -> Metrics:
+    metrics: Metrics = {}
+    for name, benchmark in BENCHMARKS.items():
+        if not only or name in only:
+            metrics.update(benchmark(scale))
+    return metrics
@@ -0,0 +1,114 @@
+"""Генератор синтетической нагрузки: клиенты, заказы и смесь операций.
+
+Генерация детерминирована при одинаковом seed. Число строк в заказе имеет
+геометрическое распределение (большинство заказов маленькие, редкие - большие),
+клиенты выбираются по закону Ципфа, цены товаров - логнормальные.
+"""
+import random
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Dict, Iterator, List, Tuple
+
+from src.domain.money import Money
+from src.domain.order import Order
+
+PAY = "pay"
+DUPLICATE_PAY = "duplicate_pay"
+CANCEL = "cancel"
+EMPTY = "empty"
+
+OPERATIONS = (PAY, DUPLICATE_PAY, CANCEL, EMPTY)
+
+DEFAULT_MIX = {PAY: 0.85, DUPLICATE_PAY: 0.05, CANCEL: 0.05, EMPTY: 0.05}
+
+
+@dataclass(frozen=True)
+class WorkloadConfig:
+    orders: int = 10_000
+    customers: int = 1_000
+    products: int = 5_000
+    mean_lines: float = 3.0
+    max_lines: int = 100
+    currency: str = "USD"
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 42
+
+    def __post_init__(self):
+        if self.orders < 0 or self.customers <= 0 or self.products <= 0:
+            raise ValueError("Размеры нагрузки должны быть положительными")
+        if self.mean_lines < 1 or self.max_lines < 1:
+            raise ValueError("Среднее и максимальное число строк должны быть не меньше 1")
+        unknown = set(self.mix) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Неизвестные операции: {', '.join(sorted(unknown))}")
+        if any(weight < 0 for weight in self.mix.values()) or sum(self.mix.values()) <= 0:
+            raise ValueError("Доли операций должны быть неотрицательными и не все нулевые")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Разбирает смесь вида "pay=0.8,duplicate_pay=0.1,cancel=0.05,empty=0.05" """
+    mix = {}
+    for part in filter(None, (item.strip() for item in text.split(","))):
+        name, separator, weight = part.partition("=")
+        if not separator:
+            raise ValueError(f"Ожидалось имя=доля: {part}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+class WorkloadGenerator:
+    """Создает заказы и операции над ними по WorkloadConfig"""
+
+    def __init__(self, config: WorkloadConfig):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._customers = [f"customer-{i:06d}" for i in range(config.customers)]
+        self._customer_weights = list(accumulate(1 / rank for rank in range(1, config.customers + 1)))
+        self._catalog = [
+            (f"product-{i:06d}", f"Товар {i}", self._price())
+            for i in range(config.products)
+        ]
+        operations = [name for name in OPERATIONS if config.mix.get(name, 0) > 0]
+        self._operations = operations
+        self._operation_weights = list(accumulate(config.mix[name] for name in operations))
+
+    def operations(self) -> Iterator[Tuple[str, Order]]:
+        """Пары (операция, заказ); заказ для EMPTY создается без строк"""
+        for _ in range(self.config.orders):
+            operation = self._random.choices(self._operations, cum_weights=self._operation_weights)[0]
+            yield operation, self._order(empty=operation == EMPTY)
+
+    def _order(self, empty: bool) -> Order:
+        customer_id = self._random.choices(self._customers, cum_weights=self._customer_weights)[0]
+        order = Order(customer_id=customer_id)
+        if empty:
+            return order
+        for product_id, name, price in self._random.sample(self._catalog, min(self._line_count(), len(self._catalog))):
+            order.add_line(product_id, name, self._quantity(), price)
+        return order
+
+    def _line_count(self) -> int:
+        # Геометрическое распределение на {1, 2, ...} со средним mean_lines
+        mean = self.config.mean_lines
+        if mean == 1:
+            return 1
+        success = 1 / mean
+        count = 1
+        while self._random.random() > success and count < self.config.max_lines:
+            count += 1
+        return count
+
+    def _quantity(self) -> int:
+        return 1 if self._random.random() < 0.8 else self._random.randint(2, 5)
+
+    def _price(self) -> Money:
+        cents = max(1, int(self._random.lognormvariate(7.5, 1.0)))
+        return Money.from_units(cents, 2, self.config.currency)
+
+
+def line_counts(orders: List[Order]) -> Dict[int, int]:
+    """Распределение числа строк: число строк -> число заказов"""
+    counts: Dict[int, int] = {}
+    for order in orders:
+        counts[len(order.lines)] = counts.get(len(order.lines), 0) + 1
+    return dict(sorted(counts.items()))
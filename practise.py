@@ -1,19 +1,27 @@
+"""Демонстрация системы заказов и нагрузочный тест.
+
+    python practise.py                 # сценарий-демонстрация
+    python practise.py load --help     # нагрузочный тест (benchmarks/load_test.py)
+"""
+import sys
 from decimal import Decimal
 from datetime import datetime
 import uuid
 
 from src.domain.money import Money
 from src.domain.order import Order
+from src.domain.order_status import OrderStatus
 from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
 from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
 from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.application.read_models.order_aggregates import OrderAggregates
 
 
 def print_separator():
     print("\n" + "=" * 60 + "\n")
 
 
-def main():
+def run_demo():
     print("СИСТЕМА УПРАВЛЕНИЯ ЗАКАЗАМИ И ОПЛАТАМИ")
     print_separator()
 
@@ -22,6 +30,8 @@ def main():
     repository = InMemoryOrderRepository()
     gateway = FakePaymentGateway()
     use_case = PayOrderUseCase(repository, gateway)
+    aggregates = OrderAggregates()
+    repository.add_listener(aggregates)
     print("   Репозиторий и платёжный шлюз инициализированы")
 
     print_separator()
@@ -128,35 +138,38 @@ def main():
     print("5. ПРОВЕРКА ТРАНЗАКЦИЙ В ПЛАТЕЖНОМ ШЛЮЗЕ")
     print(f"   Всего транзакций: {len(gateway.transactions)}")
 
-    for i, (trans_id, trans_data) in enumerate(gateway.transactions.items(), 1):
+    for i, transaction in enumerate(gateway.transactions, 1):
         print(f"\n   Транзакция #{i}:")
-        print(f"   ID: {trans_id}")
-        print(f"   Заказ: {trans_data['order_id']}")
-        print(f"   Сумма: {trans_data['amount']}")
-        print(f"   Статус: {trans_data['status']}")
+        print(f"   ID: {transaction.transaction_id}")
+        print(f"   Заказ: {transaction.order_id}")
+        print(f"   Сумма: {transaction.amount}")
+        print(f"   Статус: {transaction.status}")
 
     print_separator()
 
     # Итоги
     print("6. ИТОГИ")
-    orders = [order1, order2, empty_order]
-    paid_count = sum(1 for o in orders if repository.get_by_id(o.id) and repository.get_by_id(o.id).is_paid())
-    total_revenue = Money.zero()
-
-    for order in orders:
-        saved_order = repository.get_by_id(order.id)
-        if saved_order and saved_order.is_paid():
-            total_revenue = total_revenue + saved_order.total_amount
-
-    print(f"   Всего заказов: {len(orders)}")
-    print(f"   Оплачено: {paid_count}")
-    print(f"   Ожидают оплаты: {len(orders) - paid_count}")
-    print(f"   Общая выручка: {total_revenue}")
+    print(f"   Всего заказов: {aggregates.total_orders}")
+    print(f"   Оплачено: {aggregates.count(OrderStatus.PAID)}")
+    print(f"   Ожидают оплаты: {aggregates.count(OrderStatus.CREATED)}")
+    print(f"   Общая выручка: {aggregates.revenue('USD')}")
+    # Представления берут статус и сумму из сводки, строки заказов не загружаются
+    for view in repository.find_views_by_status(OrderStatus.PAID):
+        print(f"   {view.id} ({view.customer_id}): {view.total_amount}")
 
     print_separator()
     print("✅ ВСЕ ОПЕРАЦИИ ВЫПОЛНЕНЫ УСПЕШНО")
     print("Process finished with exit code 0")
 
 
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "load":
+        from benchmarks.load_test import main as load_test
+        return load_test(argv[1:])
+    run_demo()
+    return 0
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
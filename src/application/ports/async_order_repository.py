@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from src.domain.order import Order
+
+
+class AsyncOrderRepository(ABC):
+    """Асинхронный интерфейс для работы с заказами"""
+
+    @abstractmethod
+    async def get_by_id(self, order_id: str) -> Optional[Order]:
+        pass
+
+    @abstractmethod
+    async def save(self, order: Order) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, order_id: str) -> None:
+        pass
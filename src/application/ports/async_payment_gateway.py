@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from src.domain.money import Money
+
+
+class AsyncPaymentGateway(ABC):
+    """Асинхронный интерфейс для платежного шлюза"""
+
+    @abstractmethod
+    async def charge(self, order_id: str, amount: Money) -> str:
+        pass
+
+    @abstractmethod
+    async def refund(self, transaction_id: str, amount: Money) -> None:
+        pass
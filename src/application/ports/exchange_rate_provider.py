@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Union
+
+# Курс - точное число: Decimal от источника или Fraction для кросс-курсов
+Rate = Union[Decimal, Fraction]
+
+
+class ExchangeRateProvider(ABC):
+    """Интерфейс источника курсов валют"""
+
+    @abstractmethod
+    def get_rates(self, target_currency: str) -> Dict[str, Rate]:
+        """Таблица курсов в target_currency: 1 единица валюты = rate единиц target_currency.
+
+        Курсы не округляются: кросс-курс, который не выражается конечной
+        десятичной дробью, возвращается как Fraction.
+        """
+        pass
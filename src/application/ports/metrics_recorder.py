@@ -0,0 +1,50 @@
+import time
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, nullcontext
+
+
+class MetricsRecorder(ABC):
+    """Интерфейс для сбора метрик: задержки операций, ошибки и счетчики"""
+
+    @abstractmethod
+    def observe(self, operation: str, seconds: float, error: bool = False) -> None:
+        pass
+
+    @abstractmethod
+    def increment(self, event: str, value: float = 1) -> None:
+        pass
+
+    def timer(self, operation: str) -> AbstractContextManager:
+        """Замеряет время блока; исключение внутри блока учитывается как ошибка"""
+        return _Timer(self, operation)
+
+
+class NullMetricsRecorder(MetricsRecorder):
+    """Ничего не записывает; timer возвращает общий пустой контекст"""
+
+    _NULL_TIMER = nullcontext()
+
+    def observe(self, operation: str, seconds: float, error: bool = False) -> None:
+        pass
+
+    def increment(self, event: str, value: float = 1) -> None:
+        pass
+
+    def timer(self, operation: str) -> AbstractContextManager:
+        return self._NULL_TIMER
+
+
+class _Timer:
+
+    __slots__ = ("_recorder", "_operation", "_started")
+
+    def __init__(self, recorder: MetricsRecorder, operation: str):
+        self._recorder = recorder
+        self._operation = operation
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self._recorder.observe(self._operation, time.perf_counter() - self._started, exc_type is not None)
+        return False
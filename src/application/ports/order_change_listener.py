@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from src.domain.order_summary import OrderSummary
+
+
+class OrderChangeListener(ABC):
+    """Подписчик на изменения заказов в репозитории"""
+
+    @abstractmethod
+    def on_order_changed(self, before: Optional[OrderSummary], after: Optional[OrderSummary]) -> None:
+        """before - снимок до сохранения (None для нового заказа), after - после (None при удалении)"""
+        pass
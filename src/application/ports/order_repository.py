@@ -1,10 +1,41 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import AbstractContextManager, nullcontext
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
 from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.domain.order_view import OrderView
+
+
+class ConcurrentModificationError(ValueError):
+    """Заказ был изменен и сохранен другим участником после загрузки"""
+
+    def __init__(self, order_id: str):
+        super().__init__(f"Заказ {order_id} был изменен параллельно")
+        self.order_id = order_id
+
+    def __reduce__(self):
+        return type(self), (self.order_id,)
+
+
+def check_unique_orders(orders: Iterable[Order]) -> List[Order]:
+    """Заказы для save_many: один и тот же id дважды в пачке дал бы ложный конфликт версии"""
+    orders = list(orders)
+    seen = set()
+    for order in orders:
+        if order.id in seen:
+            raise ValueError(f"Заказ {order.id} передан в пачку несколько раз")
+        seen.add(order.id)
+    return orders
 
 
 class OrderRepository(ABC):
-    """Интерфейс для работы с заказами"""
+    """Интерфейс для работы с заказами.
+
+    save работает как compare-and-swap: если сохраненная версия заказа не совпадает
+    с order.version, выбрасывается ConcurrentModificationError, иначе заказ
+    сохраняется, а его версия увеличивается.
+    """
 
     @abstractmethod
     def get_by_id(self, order_id: str) -> Optional[Order]:
@@ -16,4 +47,63 @@ class OrderRepository(ABC):
 
     @abstractmethod
     def delete(self, order_id: str) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def find_by_customer(self, customer_id: str) -> List[Order]:
+        pass
+
+    @abstractmethod
+    def find_by_status(self, status: OrderStatus) -> List[Order]:
+        pass
+
+    @abstractmethod
+    def find_created_between(self, start: datetime, end: datetime) -> List[Order]:
+        """Заказы, созданные в интервале [start, end], по возрастанию времени"""
+        pass
+
+    @abstractmethod
+    def find_paid_between(self, start: datetime, end: datetime) -> List[Order]:
+        """Заказы, оплаченные в интервале [start, end], по возрастанию времени"""
+        pass
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        """Загружает несколько заказов, отсутствующие пропускаются"""
+        orders = {}
+        for order_id in order_ids:
+            order = self.get_by_id(order_id)
+            if order is not None:
+                orders[order_id] = order
+        return orders
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        for order in orders:
+            self.save(order)
+
+    def get_view(self, order_id: str) -> Optional[OrderView]:
+        """Представление заказа без загрузки строк, если реализация хранит сводку"""
+        order = self.get_by_id(order_id)
+        return OrderView.of(order) if order is not None else None
+
+    def find_views_by_customer(self, customer_id: str) -> List[OrderView]:
+        return [OrderView.of(order) for order in self.find_by_customer(customer_id)]
+
+    def find_views_by_status(self, status: OrderStatus) -> List[OrderView]:
+        return [OrderView.of(order) for order in self.find_by_status(status)]
+
+    @abstractmethod
+    def iter_orders(self, batch_size: int = 1000) -> Iterator[Order]:
+        """Перебирает все заказы, читая их пачками по batch_size, а не одним списком"""
+        pass
+
+    @abstractmethod
+    def iter_ids(self, batch_size: int = 1000) -> Iterator[str]:
+        """Перебирает id всех заказов, не загружая сами заказы"""
+        pass
+
+    def lock(self, order_id: str) -> AbstractContextManager:
+        """Блокировка заказа на время чтения-изменения-записи"""
+        return nullcontext()
+
+    def lock_many(self, order_ids: Iterable[str]) -> AbstractContextManager:
+        return nullcontext()
@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Tuple, Union
 from src.domain.money import Money
 
 
+class PaymentGatewayUnavailableError(ValueError):
+    """Шлюз временно недоступен: платеж не выполнен, запрос можно повторить"""
+
+
 class PaymentGateway(ABC):
     """Интерфейс для платежного шлюза"""
 
@@ -11,4 +16,14 @@ class PaymentGateway(ABC):
 
     @abstractmethod
     def refund(self, transaction_id: str, amount: Money) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    def charge_many(self, payments: Iterable[Tuple[str, Money]]) -> Dict[str, Union[str, Exception]]:
+        """Списывает несколько платежей: order_id -> transaction_id или ошибка"""
+        results: Dict[str, Union[str, Exception]] = {}
+        for order_id, amount in payments:
+            try:
+                results[order_id] = self.charge(order_id, amount)
+            except ValueError as e:
+                results[order_id] = e
+        return results
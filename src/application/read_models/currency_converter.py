@@ -0,0 +1,113 @@
+import threading
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Tuple
+from src.domain.money import Money
+from src.application.ports.exchange_rate_provider import ExchangeRateProvider
+
+# Курс как несократимая дробь: числитель и знаменатель
+Ratio = Tuple[int, int]
+
+
+class CurrencyConverter:
+    """Пересчет сумм между валютами по кэшируемой таблице курсов.
+
+    Таблица курсов в целевую валюту запрашивается у провайдера один раз за ttl
+    секунд. Курсы хранятся как целые дроби, поэтому пересчет - целочисленная
+    арифметика над единицами Money с одним банковским округлением до places
+    знаков. Пачки сумм группируются по валюте, и курс ищется один раз на валюту.
+    """
+
+    def __init__(
+        self,
+        provider: ExchangeRateProvider,
+        ttl: float = 300.0,
+        places: int = 2,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if places < 0:
+            raise ValueError("Число знаков не может быть отрицательным")
+        self._provider = provider
+        self.ttl = ttl
+        self.places = places
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Tuple[float, Dict[str, Ratio]]] = {}
+
+    def rate(self, source: str, target: str) -> Decimal:
+        numerator, denominator = self._ratio(source, target)
+        return Decimal(numerator) / Decimal(denominator)
+
+    def convert(self, amount: Money, target: str) -> Money:
+        if amount.currency == target:
+            return amount
+        units, scale = amount.as_units()
+        return Money.from_units(self._convert_units(units, scale, self._ratio(amount.currency, target)), self.places, target)
+
+    def convert_many(self, amounts: Iterable[Money], target: str) -> List[Money]:
+        """Пересчитывает пачку сумм, порядок сохраняется"""
+        amounts = list(amounts)
+        converted: List[Money] = list(amounts)
+        by_currency: Dict[str, List[int]] = {}
+        for position, amount in enumerate(amounts):
+            if amount.currency != target:
+                by_currency.setdefault(amount.currency, []).append(position)
+
+        convert_units = self._convert_units
+        places = self.places
+        for currency, positions in by_currency.items():
+            ratio = self._ratio(currency, target)
+            for position in positions:
+                units, scale = amounts[position].as_units()
+                converted[position] = Money.from_units(convert_units(units, scale, ratio), places, target)
+        return converted
+
+    def total(self, amounts: Iterable[Money], target: str) -> Money:
+        """Сумма в целевой валюте: суммы складываются точно по валютам и пересчитываются один раз на валюту"""
+        by_currency: Dict[str, Money] = {}
+        for amount in amounts:
+            current = by_currency.get(amount.currency)
+            by_currency[amount.currency] = amount if current is None else current + amount
+
+        total = Money.zero(target)
+        for amount in by_currency.values():
+            total = total + self.convert(amount, target)
+        return total
+
+    def invalidate(self) -> None:
+        """Сбрасывает кэш курсов"""
+        with self._lock:
+            self._tables.clear()
+
+    def _ratio(self, source: str, target: str) -> Ratio:
+        if source == target:
+            return 1, 1
+        table = self._table(target)
+        ratio = table.get(source)
+        if ratio is None:
+            raise ValueError(f"Нет курса {source} -> {target}")
+        return ratio
+
+    def _table(self, target: str) -> Dict[str, Ratio]:
+        now = self._clock()
+        with self._lock:
+            cached = self._tables.get(target)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+        table = {
+            currency: rate.as_integer_ratio()
+            for currency, rate in self._provider.get_rates(target).items()
+        }
+        with self._lock:
+            self._tables[target] = (now + self.ttl, table)
+        return table
+
+    def _convert_units(self, units: int, scale: int, ratio: Ratio) -> int:
+        # Отрицательный масштаб (Decimal("1E+2")) умножает числитель: 10 ** -1 - уже float
+        numerator = units * ratio[0] * 10 ** (self.places + max(-scale, 0))
+        denominator = ratio[1] * 10 ** max(scale, 0)
+        quotient, remainder = divmod(numerator, denominator)
+        # Банковское округление: половина округляется к четному
+        if remainder * 2 > denominator or (remainder * 2 == denominator and quotient % 2):
+            quotient += 1
+        return quotient
@@ -0,0 +1,86 @@
+from collections import Counter
+from datetime import date
+from typing import Dict, Optional
+from src.domain.money import Money
+from src.domain.order_status import OrderStatus
+from src.domain.order_summary import OrderSummary
+from src.application.ports.order_change_listener import OrderChangeListener
+
+
+class OrderAggregates(OrderChangeListener):
+    """Материализованные агрегаты: выручка по валютам, клиентам и дням, число заказов по статусам.
+
+    Каждое изменение заказа обновляет агрегаты за O(1): вклад старого снимка
+    вычитается, вклад нового прибавляется.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._revenue: Dict[str, Money] = {}
+        self._revenue_by_customer: Dict[str, Dict[str, Money]] = {}
+        self._revenue_by_day: Dict[date, Dict[str, Money]] = {}
+
+    def on_order_changed(self, before: Optional[OrderSummary], after: Optional[OrderSummary]) -> None:
+        if before is not None:
+            self._counts[before.status] -= 1
+            if before.is_paid():
+                self._subtract_revenue(before)
+        if after is not None:
+            self._counts[after.status] += 1
+            if after.is_paid():
+                self._add_revenue(after)
+
+    def count(self, status: OrderStatus) -> int:
+        return self._counts[status]
+
+    @property
+    def total_orders(self) -> int:
+        return sum(self._counts.values())
+
+    def revenue(self, currency: str = "USD") -> Money:
+        return self._revenue.get(currency) or Money.zero(currency)
+
+    def revenue_by_currency(self) -> Dict[str, Money]:
+        """Выручка по всем валютам; для отчета в одной валюте - CurrencyConverter.total"""
+        return dict(self._revenue)
+
+    def customer_revenue(self, customer_id: str, currency: str = "USD") -> Money:
+        return self._revenue_by_customer.get(customer_id, {}).get(currency) or Money.zero(currency)
+
+    def daily_revenue(self, day: date, currency: str = "USD") -> Money:
+        return self._revenue_by_day.get(day, {}).get(currency) or Money.zero(currency)
+
+    def _add_revenue(self, summary: OrderSummary) -> None:
+        amount = summary.total_amount
+        _add(self._revenue, amount)
+        _add(self._revenue_by_customer.setdefault(summary.customer_id, {}), amount)
+        _add(self._revenue_by_day.setdefault(_day(summary), {}), amount)
+
+    def _subtract_revenue(self, summary: OrderSummary) -> None:
+        amount = summary.total_amount
+        _subtract(self._revenue, amount)
+        _subtract_nested(self._revenue_by_customer, summary.customer_id, amount)
+        _subtract_nested(self._revenue_by_day, _day(summary), amount)
+
+
+def _day(summary: OrderSummary) -> date:
+    return (summary.paid_at or summary.created_at).date()
+
+
+def _add(totals: Dict[str, Money], amount: Money) -> None:
+    current = totals.get(amount.currency)
+    totals[amount.currency] = amount if current is None else current + amount
+
+
+def _subtract(totals: Dict[str, Money], amount: Money) -> None:
+    remaining = totals[amount.currency] - amount
+    if remaining.is_zero():
+        del totals[amount.currency]
+    else:
+        totals[amount.currency] = remaining
+
+
+def _subtract_nested(totals: Dict, key, amount: Money) -> None:
+    _subtract(totals[key], amount)
+    if not totals[key]:
+        del totals[key]
@@ -0,0 +1,79 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Union
+from src.application.ports.async_order_repository import AsyncOrderRepository
+from src.application.ports.order_repository import ConcurrentModificationError
+from src.application.ports.async_payment_gateway import AsyncPaymentGateway
+
+
+class AsyncPayOrderUseCase:
+    """Асинхронный Use Case для оплаты заказа с ограничением параллелизма"""
+
+    def __init__(
+        self,
+        order_repository: AsyncOrderRepository,
+        payment_gateway: AsyncPaymentGateway,
+        max_concurrency: int = 100
+    ):
+        if max_concurrency <= 0:
+            raise ValueError("Ограничение параллелизма должно быть положительным")
+        self.order_repository = order_repository
+        self.payment_gateway = payment_gateway
+        self.max_concurrency = max_concurrency
+        # Блокировки заказов, которые сейчас оплачиваются: [блокировка, число ожидающих]
+        self._order_locks: Dict[str, list] = {}
+
+    async def execute(self, order_id: str) -> Dict[str, Any]:
+        async with self._lock_order(order_id):
+            order = await self.order_repository.get_by_id(order_id)
+            if not order:
+                raise ValueError(f"Заказ {order_id} не найден")
+
+            order.pay()
+
+            transaction_id = await self.payment_gateway.charge(
+                order_id=order_id,
+                amount=order.total_amount
+            )
+
+            try:
+                await self.order_repository.save(order)
+            except ConcurrentModificationError:
+                # Заказ изменили после загрузки (например, отменили в другом процессе)
+                await self.payment_gateway.refund(transaction_id, order.total_amount)
+                raise
+
+        return {
+            "success": True,
+            "order_id": order_id,
+            "transaction_id": transaction_id,
+            "amount": str(order.total_amount),
+            "status": order.status.value
+        }
+
+    async def execute_many(self, order_ids: Iterable[str]) -> List[Union[Dict[str, Any], Exception]]:
+        """Оплачивает заказы параллельно, не более max_concurrency одновременно"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def execute_limited(order_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute(order_id)
+
+        return await asyncio.gather(
+            *(execute_limited(order_id) for order_id in order_ids),
+            return_exceptions=True
+        )
+
+    @asynccontextmanager
+    async def _lock_order(self, order_id: str) -> AsyncIterator[None]:
+        entry = self._order_locks.get(order_id)
+        if entry is None:
+            entry = self._order_locks[order_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._order_locks[order_id]
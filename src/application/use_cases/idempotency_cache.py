@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+
+class IdempotencyCache:
+    """Кэш результатов по ключу идемпотентности: LRU с ограничением размера и TTL.
+
+    Повторный запрос с тем же ключом получает сохраненный результат, не выполняя
+    операцию снова. Параллельные дубли, пришедшие пока операция выполняется,
+    ждут ее завершения и получают тот же результат или ту же ошибку.
+    Ошибки не кэшируются: после неудачи запрос с тем же ключом выполняется заново.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 24 * 60 * 60, clock: Callable[[], float] = time.monotonic):
+        if max_size <= 0:
+            raise ValueError("Размер кэша должен быть положительным")
+        if ttl <= 0:
+            raise ValueError("Время жизни записи должно быть положительным")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._completed: "OrderedDict[str, Tuple[str, Dict[str, Any], float]]" = OrderedDict()
+        self._in_flight: Dict[str, Tuple[str, Future]] = {}
+
+    def run(self, key: str, order_id: str, operation: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._completed.get(key)
+            if entry is not None:
+                cached_order_id, result, expires_at = entry
+                if expires_at > self._clock():
+                    self._check_order(key, cached_order_id, order_id)
+                    self._completed.move_to_end(key)
+                    return dict(result)
+                del self._completed[key]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                future: Future = Future()
+                self._in_flight[key] = (order_id, future)
+            else:
+                self._check_order(key, in_flight[0], order_id)
+
+        if in_flight is not None:
+            return dict(in_flight[1].result())
+
+        try:
+            result = operation()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            self._completed[key] = (order_id, result, self._clock() + self.ttl)
+            while len(self._completed) > self.max_size:
+                self._completed.popitem(last=False)
+        future.set_result(result)
+        return dict(result)
+
+    def __len__(self) -> int:
+        return len(self._completed)
+
+    @staticmethod
+    def _check_order(key: str, cached_order_id: str, order_id: str) -> None:
+        if cached_order_id != order_id:
+            raise ValueError(f"Ключ идемпотентности {key} уже использован для заказа {cached_order_id}")
@@ -1,28 +1,65 @@
-from typing import Dict, Any
-from src.application.ports.order_repository import OrderRepository
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Set
+from src.application.ports.order_repository import ConcurrentModificationError, OrderRepository
 from src.application.ports.payment_gateway import PaymentGateway
+from src.application.ports.metrics_recorder import MetricsRecorder, NullMetricsRecorder
+from src.application.use_cases.idempotency_cache import IdempotencyCache
 
 
 class PayOrderUseCase:
     """Use Case для оплаты заказа"""
 
-    def __init__(self, order_repository: OrderRepository, payment_gateway: PaymentGateway):
+    def __init__(
+        self,
+        order_repository: OrderRepository,
+        payment_gateway: PaymentGateway,
+        idempotency_cache: Optional[IdempotencyCache] = None,
+        metrics: Optional[MetricsRecorder] = None
+    ):
         self.order_repository = order_repository
         self.payment_gateway = payment_gateway
+        self.idempotency_cache = idempotency_cache if idempotency_cache is not None else IdempotencyCache()
+        self.metrics = metrics if metrics is not None else NullMetricsRecorder()
+        # Заказы, за которые сейчас идет списание: блокировка заказа на это время не держится
+        self._charging: Set[str] = set()
+        self._charging_lock = threading.Lock()
 
-    def execute(self, order_id: str) -> Dict[str, Any]:
-        order = self.order_repository.get_by_id(order_id)
-        if not order:
-            raise ValueError(f"Заказ {order_id} не найден")
+    def execute(self, order_id: str, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Оплачивает заказ; повтор с тем же idempotency_key возвращает исходный результат"""
+        if idempotency_key is not None:
+            return self.idempotency_cache.run(idempotency_key, order_id, lambda: self._execute(order_id))
+        return self._execute(order_id)
 
-        order.pay()
+    def _execute(self, order_id: str) -> Dict[str, Any]:
+        metrics = self.metrics
+        with metrics.timer("pay_order.execute"):
+            # Отметка "оплачивается" не дает второму потоку списать деньги за тот же заказ,
+            # а блокировка заказа не держится во время обращения к шлюзу
+            self._claim(order_id)
+            try:
+                with metrics.timer("pay_order.get_by_id"):
+                    order = self.order_repository.get_by_id(order_id)
+                if not order:
+                    raise ValueError(f"Заказ {order_id} не найден")
 
-        transaction_id = self.payment_gateway.charge(
-            order_id=order_id,
-            amount=order.total_amount
-        )
+                with metrics.timer("pay_order.pay"):
+                    order.pay()
 
-        self.order_repository.save(order)
+                with metrics.timer("pay_order.charge"):
+                    transaction_id = self.payment_gateway.charge(
+                        order_id=order_id,
+                        amount=order.total_amount
+                    )
+
+                with metrics.timer("pay_order.save"), self.order_repository.lock(order_id):
+                    try:
+                        self.order_repository.save(order)
+                    except ConcurrentModificationError:
+                        # Заказ изменили после загрузки (например, отменили в другом процессе)
+                        self.payment_gateway.refund(transaction_id, order.total_amount)
+                        raise
+            finally:
+                self._release([order_id])
 
         return {
             "success": True,
@@ -30,4 +67,100 @@ class PayOrderUseCase:
             "transaction_id": transaction_id,
             "amount": str(order.total_amount),
             "status": order.status.value
-        }
\ No newline at end of file
+        }
+
+    def execute_many(self, order_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Оплачивает пачку заказов; ошибка одного заказа не прерывает остальные"""
+        order_ids = list(dict.fromkeys(order_ids))
+        results: Dict[str, Dict[str, Any]] = {}
+        with self.metrics.timer("pay_order.execute_many"):
+            claimed = self._claim_many(order_ids)
+            for order_id in order_ids:
+                if order_id not in claimed:
+                    results[order_id] = self._failure(order_id, f"Заказ {order_id} уже оплачивается")
+            try:
+                self._execute_claimed(claimed, results)
+            finally:
+                self._release(claimed)
+
+        return {order_id: results[order_id] for order_id in order_ids}
+
+    def _execute_claimed(self, order_ids: List[str], results: Dict[str, Dict[str, Any]]) -> None:
+        orders = self.order_repository.get_many(order_ids)
+        pending = {}
+
+        for order_id in order_ids:
+            order = orders.get(order_id)
+            if order is None:
+                results[order_id] = self._failure(order_id, f"Заказ {order_id} не найден")
+                continue
+            previous_state = (order.status, order.paid_at)
+            try:
+                order.pay()
+            except ValueError as e:
+                results[order_id] = self._failure(order_id, str(e))
+                continue
+            pending[order_id] = (order, previous_state)
+
+        try:
+            charges = self.payment_gateway.charge_many(
+                (order_id, order.total_amount) for order_id, (order, _) in pending.items()
+            )
+        except ValueError as e:
+            charges = {order_id: e for order_id in pending}
+
+        paid = {}
+        for order_id, (order, previous_state) in pending.items():
+            transaction_id = charges.get(order_id)
+            if not isinstance(transaction_id, str):
+                order.status, order.paid_at = previous_state
+                error = transaction_id or ValueError("Платеж не был выполнен")
+                results[order_id] = self._failure(order_id, str(error))
+                continue
+            paid[order_id] = (order, transaction_id)
+            results[order_id] = {
+                "success": True,
+                "order_id": order_id,
+                "transaction_id": transaction_id,
+                "amount": str(order.total_amount),
+                "status": order.status.value
+            }
+
+        with self.order_repository.lock_many(paid):
+            loaded_versions = {order_id: order.version for order_id, (order, _) in paid.items()}
+            try:
+                self.order_repository.save_many([order for order, _ in paid.values()])
+            except ConcurrentModificationError:
+                # Пачка сохранилась не целиком: оставшиеся заказы сохраняются по одному,
+                # за те, что изменили параллельно, деньги возвращаются
+                for order_id, (order, transaction_id) in paid.items():
+                    if order.version != loaded_versions[order_id]:
+                        continue
+                    try:
+                        self.order_repository.save(order)
+                    except ConcurrentModificationError as e:
+                        self.payment_gateway.refund(transaction_id, order.total_amount)
+                        results[order_id] = self._failure(order_id, str(e))
+
+    def _claim(self, order_id: str) -> None:
+        if not self._claim_many([order_id]):
+            raise ValueError(f"Заказ {order_id} уже оплачивается")
+
+    def _claim_many(self, order_ids: Iterable[str]) -> List[str]:
+        """Отмечает заказы как оплачиваемые; возвращает те, что не оплачиваются другим потоком"""
+        with self._charging_lock:
+            claimed = [order_id for order_id in order_ids if order_id not in self._charging]
+            self._charging.update(claimed)
+        return claimed
+
+    def _release(self, order_ids: Iterable[str]) -> None:
+        with self._charging_lock:
+            self._charging.difference_update(order_ids)
+
+    @staticmethod
+    def _failure(order_id: str, error: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "order_id": order_id,
+            "error": error
+        }
@@ -0,0 +1,174 @@
+from array import array
+from operator import mul
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from .money import Money
+from .order_line import OrderLine
+from .order_lines import OrderLines
+
+_MAX_UNITS = 2 ** 63 - 1
+
+
+class ColumnarOrderLines:
+    """Колоночное хранилище строк заказа для очень больших заказов.
+
+    Товары, количества и цены лежат в параллельных массивах, цены - целыми единицами
+    в общем масштабе колонки. Объекты OrderLine создаются только при обращении.
+    Удаленные строки помечаются нулевым количеством и вычищаются пачкой.
+    """
+
+    __slots__ = (
+        "_index", "_product_ids", "_names", "_quantities",
+        "_price_units", "_price_scales", "_scale", "_currency", "_removed"
+    )
+
+    def __init__(self, lines: Iterable[OrderLine] = ()):
+        self._index: Dict[str, int] = {}
+        self._product_ids: List[Optional[str]] = []
+        self._names: List[str] = []
+        self._quantities = array("q")
+        self._price_units = array("q")
+        self._price_scales = array("b")
+        self._scale = 0
+        self._currency: Optional[str] = None
+        self._removed = 0
+        for line in lines:
+            if line.product_id in self._index:
+                raise ValueError(f"Товар {line.product_id} уже есть в заказе")
+            self.put(line)
+
+    def get(self, product_id: str) -> Optional[OrderLine]:
+        row = self._index.get(product_id)
+        if row is None:
+            return None
+        return self._line_at(row)
+
+    def put(self, line: OrderLine) -> None:
+        """Добавляет строку или заменяет строку того же товара, не меняя ее позицию"""
+        price = line.price
+        if self._currency is None:
+            self._currency = price.currency
+        elif price.currency != self._currency:
+            raise ValueError("Нельзя смешивать валюты в строках заказа")
+
+        units, scale = price.as_units()
+        if scale > self._scale:
+            self._rescale(scale)
+        column_units = units * 10 ** (self._scale - scale)
+        if column_units > _MAX_UNITS:
+            raise ValueError("Цена не помещается в колоночное хранилище")
+
+        row = self._index.get(line.product_id)
+        if row is None:
+            self._quantities.append(line.quantity)
+            self._price_units.append(column_units)
+            self._price_scales.append(scale)
+            self._product_ids.append(line.product_id)
+            self._names.append(line.product_name)
+            self._index[line.product_id] = len(self._product_ids) - 1
+        else:
+            self._quantities[row] = line.quantity
+            self._price_units[row] = column_units
+            self._price_scales[row] = scale
+            self._names[row] = line.product_name
+
+    def pop(self, product_id: str) -> Optional[OrderLine]:
+        row = self._index.pop(product_id, None)
+        if row is None:
+            return None
+        line = self._line_at(row)
+        if not self._index:
+            # Последняя строка удалена: валюта и масштаб колонки больше ничем не заданы
+            self.clear()
+            return line
+        self._product_ids[row] = None
+        self._quantities[row] = 0
+        self._removed += 1
+        if self._removed > 64 and self._removed * 2 > len(self._product_ids):
+            self._compact()
+        return line
+
+    def set_quantities(self, quantities: Dict[str, int]) -> None:
+        """Меняет количество сразу у нескольких товаров: все или ничего"""
+        rows = []
+        for product_id, quantity in quantities.items():
+            row = self._index.get(product_id)
+            if row is None:
+                raise ValueError(f"Товар {product_id} не найден")
+            if quantity <= 0:
+                raise ValueError("Количество должно быть положительным")
+            rows.append((row, quantity))
+        column = self._quantities
+        for row, quantity in rows:
+            column[row] = quantity
+
+    def total(self) -> Money:
+        if not self._index:
+            return Money.zero()
+        units = sum(map(mul, self._quantities, self._price_units))
+        return Money.from_units(units, self._scale, self._currency)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def copy(self) -> "ColumnarOrderLines":
+        copied = ColumnarOrderLines()
+        copied._index = self._index.copy()
+        copied._product_ids = self._product_ids.copy()
+        copied._names = self._names.copy()
+        copied._quantities = array("q", self._quantities)
+        copied._price_units = array("q", self._price_units)
+        copied._price_scales = array("b", self._price_scales)
+        copied._scale = self._scale
+        copied._currency = self._currency
+        copied._removed = self._removed
+        return copied
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[OrderLine]:
+        for row, product_id in enumerate(self._product_ids):
+            if product_id is not None:
+                yield self._line_at(row)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[OrderLine, List[OrderLine]]:
+        """Медленный путь, O(n) на каждое обращение, как у OrderLines"""
+        return list(self)[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ColumnarOrderLines, OrderLines, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ColumnarOrderLines({len(self)} lines)"
+
+    def _line_at(self, row: int) -> OrderLine:
+        scale = self._price_scales[row]
+        units = self._price_units[row] // 10 ** (self._scale - scale)
+        return OrderLine(
+            product_id=self._product_ids[row],
+            product_name=self._names[row],
+            quantity=self._quantities[row],
+            price=Money.from_units(units, scale, self._currency)
+        )
+
+    def _rescale(self, scale: int) -> None:
+        factor = 10 ** (scale - self._scale)
+        if self._price_units and max(self._price_units) * factor > _MAX_UNITS:
+            raise ValueError("Цена не помещается в колоночное хранилище")
+        self._price_units = array("q", (units * factor for units in self._price_units))
+        self._scale = scale
+
+    def _compact(self) -> None:
+        live = [row for row, product_id in enumerate(self._product_ids) if product_id is not None]
+        self._product_ids = [self._product_ids[row] for row in live]
+        self._names = [self._names[row] for row in live]
+        self._quantities = array("q", (self._quantities[row] for row in live))
+        self._price_units = array("q", (self._price_units[row] for row in live))
+        self._price_scales = array("b", (self._price_scales[row] for row in live))
+        self._index = {product_id: row for row, product_id in enumerate(self._product_ids)}
+        self._removed = 0
@@ -1,46 +1,161 @@
-from dataclasses import dataclass
-from decimal import Decimal
-from typing import Self
+import sys
+from dataclasses import FrozenInstanceError
+from decimal import Context, Decimal, MAX_PREC
+from typing import Dict, Self, Tuple
+
+# Контекст без округления: перевод целых единиц в Decimal должен быть точным
+_EXACT = Context(prec=MAX_PREC)
 
 
-@dataclass(frozen=True)
 class Money:
-    """Value Object для денег"""
-    amount: Decimal
-    currency: str = "USD"
+    """Value Object для денег.
+
+    Сумма хранится как целое число единиц и масштаб (число знаков после запятой):
+    Decimal("899.99") -> (89999, 2). Арифметика выполняется над целыми числами,
+    а результаты внутренних операций не проходят повторную валидацию.
+    """
+
+    __slots__ = ("_units", "_scale", "currency")
+
+    _zeros: Dict[str, "Money"] = {}
+
+    def __init__(self, amount: Decimal, currency: str = "USD"):
+        units, scale = _to_units(amount)
+        if units < 0:
+            raise ValueError("Сумма не может быть отрицательной")
+        if not currency:
+            raise ValueError("Валюта обязательна")
+        _set_units(self, units)
+        _set_scale(self, scale)
+        _set_currency(self, sys.intern(currency))
+
+    @classmethod
+    def _from_units(cls, units: int, scale: int, currency: str) -> Self:
+        return _new(units, scale, currency)
 
-    def __post_init__(self):
-        if self.amount < Decimal("0"):
+    @classmethod
+    def from_units(cls, units: int, scale: int, currency: str = "USD") -> Self:
+        """Создает сумму из целого числа единиц: from_units(89999, 2) == 899.99"""
+        if units < 0:
             raise ValueError("Сумма не может быть отрицательной")
-        if not self.currency:
+        if not currency:
             raise ValueError("Валюта обязательна")
+        return cls._from_units(units, scale, sys.intern(currency))
+
+    def as_units(self) -> Tuple[int, int]:
+        return self._units, self._scale
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self._units).scaleb(-self._scale, _EXACT)
 
     def __add__(self, other: Self) -> Self:
-        if self.currency != other.currency:
+        if other.__class__ is not Money:
+            return NotImplemented
+        if self.currency is not other.currency and self.currency != other.currency:
             raise ValueError("Нельзя складывать разные валюты")
-        return Money(self.amount + other.amount, self.currency)
+        units, other_units, scale = _align(self, other)
+        return _new(units + other_units, scale, self.currency)
 
     def __sub__(self, other: Self) -> Self:
-        if self.currency != other.currency:
+        if other.__class__ is not Money:
+            return NotImplemented
+        if self.currency is not other.currency and self.currency != other.currency:
             raise ValueError("Нельзя вычитать разные валюты")
-        return Money(self.amount - other.amount, self.currency)
+        units, other_units, scale = _align(self, other)
+        if units < other_units:
+            raise ValueError("Сумма не может быть отрицательной")
+        return _new(units - other_units, scale, self.currency)
 
     def __mul__(self, multiplier: Decimal | int) -> Self:
-        return Money(self.amount * Decimal(str(multiplier)), self.currency)
+        if multiplier.__class__ is int:
+            units, scale = multiplier, 0
+        elif isinstance(multiplier, Decimal):
+            units, scale = _to_units(multiplier)
+        else:
+            units, scale = _to_units(Decimal(str(multiplier)))
+        if units < 0:
+            raise ValueError("Сумма не может быть отрицательной")
+        return _new(self._units * units, self._scale + scale, self.currency)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not Money:
+            return NotImplemented
+        if self.currency != other.currency:
+            return False
+        units, other_units, _ = _align(self, other)
+        return units == other_units
+
+    def __hash__(self) -> int:
+        return hash((self.amount, self.currency))
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __reduce__(self):
+        return Money._from_units, (self._units, self._scale, self.currency)
+
+    def __repr__(self) -> str:
+        return f"Money(amount={self.amount!r}, currency={self.currency!r})"
 
     def __str__(self) -> str:
         return f"{self.amount} {self.currency}"
 
     @classmethod
     def zero(cls, currency: str = "USD") -> Self:
-        return cls(Decimal("0"), currency)
+        zero = cls._zeros.get(currency)
+        if zero is None:
+            zero = cls(Decimal("0"), currency)
+            cls._zeros[currency] = zero
+        return zero
 
     @classmethod
     def from_int(cls, amount: int, currency: str = "USD") -> Self:
+        if amount.__class__ is int:
+            return cls.from_units(amount, 0, currency)
         return cls(Decimal(str(amount)), currency)
 
     def is_positive(self) -> bool:
-        return self.amount > Decimal("0")
+        return self._units > 0
 
     def is_zero(self) -> bool:
-        return self.amount == Decimal("0")
\ No newline at end of file
+        return self._units == 0
+
+
+_set_units = Money._units.__set__
+_set_scale = Money._scale.__set__
+_set_currency = Money.currency.__set__
+
+
+def _new(units: int, scale: int, currency: str) -> Money:
+    """Создает Money без валидации - только для результатов внутренней арифметики"""
+    money = object.__new__(Money)
+    _set_units(money, units)
+    _set_scale(money, scale)
+    _set_currency(money, currency)
+    return money
+
+
+def _to_units(amount: Decimal | int) -> Tuple[int, int]:
+    if amount.__class__ is int:
+        return amount, 0
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    if not amount.is_finite():
+        raise ValueError("Сумма должна быть конечным числом")
+    sign, digits, exponent = amount.as_tuple()
+    units = int("".join(map(str, digits)))
+    return (-units if sign else units), -exponent
+
+
+def _align(left: Money, right: Money) -> Tuple[int, int, int]:
+    """Приводит две суммы к общему масштабу"""
+    left_scale, right_scale = left._scale, right._scale
+    if left_scale == right_scale:
+        return left._units, right._units, left_scale
+    if left_scale > right_scale:
+        return left._units, right._units * 10 ** (left_scale - right_scale), left_scale
+    return left._units * 10 ** (right_scale - left_scale), right._units, right_scale
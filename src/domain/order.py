@@ -1,44 +1,74 @@
+import copy
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import ClassVar, Dict, Optional, Union
 from decimal import Decimal
-import uuid
 from .money import Money
 from .order_status import OrderStatus
+from .order_summary import OrderSummary
+from .order_id import new_order_id
 from .order_line import OrderLine
+from .order_lines import OrderLines
+from .columnar_order_lines import ColumnarOrderLines
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """Сущность заказа"""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    # Режим отладки: сверять накопленную сумму с полным пересчетом при каждом чтении
+    verify_totals: ClassVar[bool] = False
+
+    id: str = field(default_factory=new_order_id)
     customer_id: str = ""
-    lines: List[OrderLine] = field(default_factory=list)
+    lines: Union[OrderLines, ColumnarOrderLines] = field(default_factory=OrderLines)
     status: OrderStatus = OrderStatus.CREATED
     created_at: datetime = field(default_factory=datetime.now)
     paid_at: Optional[datetime] = None
+    # Версия сохраненного состояния для оптимистичной блокировки
+    version: int = field(default=0, compare=False)
+    _total: Money = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not self.customer_id:
             raise ValueError("ID клиента обязателен")
+        if not isinstance(self.lines, (OrderLines, ColumnarOrderLines)):
+            self.lines = OrderLines(self.lines)
+        self._total = self._compute_total()
 
     @property
     def total_amount(self) -> Money:
-        if not self.lines:
-            return Money.zero()
-        total = Money.zero()
-        for line in self.lines:
-            total = total + line.total()
-        return total
+        if self.verify_totals:
+            expected = self._compute_total()
+            if expected != self._total:
+                raise AssertionError(
+                    f"Накопленная сумма заказа {self.id} ({self._total}) не совпадает с пересчетом ({expected})"
+                )
+        return self._total
+
+    @property
+    def currency(self) -> str:
+        """Валюта заказа - валюта его строк; у пустого заказа валюта по умолчанию"""
+        return self._total.currency
+
+    def _compute_total(self) -> Money:
+        return self.lines.total()
 
     def add_line(self, product_id: str, product_name: str, quantity: int, price: Money) -> None:
         if self.status == OrderStatus.PAID:
             raise ValueError("Нельзя изменять оплаченный заказ")
+        if price.currency != self._total.currency:
+            if self.lines:
+                raise ValueError("Нельзя смешивать валюты в строках заказа")
+            # Валюту пустого заказа задает первая строка
+            self._total = Money.zero(price.currency)
 
-        for i, line in enumerate(self.lines):
-            if line.product_id == product_id:
-                self.lines[i] = line.with_quantity(line.quantity + quantity)
-                return
+        line = self.lines.get(product_id)
+        if line is not None:
+            new_line = line.with_quantity(line.quantity + quantity)
+            total = self._total - line.total() + new_line.total()
+            self.lines.put(new_line)
+            self._total = total
+            return
 
         new_line = OrderLine(
             product_id=product_id,
@@ -46,21 +76,34 @@ class Order:
             quantity=quantity,
             price=price
         )
-        self.lines.append(new_line)
+        total = self._total + new_line.total()
+        self.lines.put(new_line)
+        self._total = total
 
     def remove_line(self, product_id: str) -> None:
         if self.status == OrderStatus.PAID:
             raise ValueError("Нельзя изменять оплаченный заказ")
-        self.lines = [line for line in self.lines if line.product_id != product_id]
+        line = self.lines.pop(product_id)
+        if line is not None:
+            self._total = self._total - line.total() if self.lines else Money.zero()
 
     def update_quantity(self, product_id: str, new_quantity: int) -> None:
         if self.status == OrderStatus.PAID:
             raise ValueError("Нельзя изменять оплаченный заказ")
-        for i, line in enumerate(self.lines):
-            if line.product_id == product_id:
-                self.lines[i] = line.with_quantity(new_quantity)
-                return
-        raise ValueError(f"Товар {product_id} не найден")
+        line = self.lines.get(product_id)
+        if line is None:
+            raise ValueError(f"Товар {product_id} не найден")
+        new_line = line.with_quantity(new_quantity)
+        total = self._total - line.total() + new_line.total()
+        self.lines.put(new_line)
+        self._total = total
+
+    def update_quantities(self, quantities: Dict[str, int]) -> None:
+        """Меняет количество сразу у нескольких товаров и пересчитывает сумму одним проходом"""
+        if self.status == OrderStatus.PAID:
+            raise ValueError("Нельзя изменять оплаченный заказ")
+        self.lines.set_quantities(quantities)
+        self._total = self.lines.total()
 
     def pay(self) -> None:
         if self.status == OrderStatus.PAID:
@@ -84,4 +127,20 @@ class Order:
         return len(self.lines) == 0
 
     def is_paid(self) -> bool:
-        return self.status == OrderStatus.PAID
\ No newline at end of file
+        return self.status == OrderStatus.PAID
+
+    def copy(self) -> "Order":
+        """Независимая копия заказа: строки копируются, неизменяемые значения разделяются"""
+        copied = copy.copy(self)
+        copied.lines = self.lines.copy()
+        return copied
+
+    def summary(self) -> OrderSummary:
+        return OrderSummary(
+            id=self.id,
+            customer_id=self.customer_id,
+            status=self.status,
+            total_amount=self.total_amount,
+            created_at=self.created_at,
+            paid_at=self.paid_at
+        )
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+# Алфавит Crockford base32: без I, L, O, U; лексикографический порядок совпадает с числовым
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {symbol: value for value, symbol in enumerate(_ALPHABET)}
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+_LENGTH = 26
+
+
+class OrderIdGenerator:
+    """Генератор идентификаторов в стиле ULID: 48 бит времени в мс + 80 бит случайности.
+
+    Идентификаторы из 26 символов сортируются как время создания. В пределах
+    одной миллисекунды случайная часть увеличивается на единицу, поэтому
+    идентификаторы одного генератора строго возрастают.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time, random_bits: Callable[[int], bytes] = os.urandom):
+        self._clock = clock
+        self._random_bits = random_bits
+        self._lock = threading.Lock()
+        self._last_millis = -1
+        self._last_random = 0
+
+    def __call__(self) -> str:
+        return self.new_id()
+
+    def new_id(self) -> str:
+        millis = int(self._clock() * 1000)
+        with self._lock:
+            if millis <= self._last_millis:
+                # Часы не сдвинулись или ушли назад: продолжаем последовательность
+                millis = self._last_millis
+                random_part = self._last_random + 1
+                if random_part > _RANDOM_MAX:
+                    millis += 1
+                    random_part = self._random()
+            else:
+                random_part = self._random()
+            self._last_millis = millis
+            self._last_random = random_part
+        return _encode((millis << _RANDOM_BITS) | random_part)
+
+    def _random(self) -> int:
+        # Старший бит обнулен, чтобы инкремент почти никогда не переполнял случайную часть
+        return int.from_bytes(self._random_bits(10), "big") >> 1
+
+
+def created_at(order_id: str) -> datetime:
+    """Время создания из идентификатора (UTC)"""
+    if len(order_id) != _LENGTH:
+        raise ValueError(f"Некорректный идентификатор заказа: {order_id}")
+    value = 0
+    for symbol in order_id[:10]:
+        digit = _DECODE.get(symbol)
+        if digit is None:
+            raise ValueError(f"Некорректный идентификатор заказа: {order_id}")
+        value = value * 32 + digit
+    # 26 символов несут 130 бит: 2 нулевых бита, 48 бит времени и 80 бит случайности,
+    # поэтому первые 10 символов - ровно время в миллисекундах
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def _encode(value: int) -> str:
+    symbols = []
+    for _ in range(_LENGTH):
+        symbols.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(symbols))
+
+
+new_order_id = OrderIdGenerator()
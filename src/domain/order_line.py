@@ -1,9 +1,8 @@
 from dataclasses import dataclass
-from decimal import Decimal
 from .money import Money
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class OrderLine:
     """Строка заказа"""
     product_id: str
@@ -18,7 +17,7 @@ class OrderLine:
             raise ValueError("ID товара обязателен")
 
     def total(self) -> Money:
-        return self.price * Decimal(str(self.quantity))
+        return self.price * self.quantity
 
     def with_quantity(self, new_quantity: int) -> "OrderLine":
         if new_quantity <= 0:
@@ -0,0 +1,80 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from .money import Money
+from .order_line import OrderLine
+
+
+class OrderLines:
+    """Строки заказа с индексом по product_id, порядок добавления сохраняется"""
+
+    __slots__ = ("_lines",)
+
+    def __init__(self, lines: Iterable[OrderLine] = ()):
+        self._lines: Dict[str, OrderLine] = {}
+        for line in lines:
+            if line.product_id in self._lines:
+                raise ValueError(f"Товар {line.product_id} уже есть в заказе")
+            self._lines[line.product_id] = line
+
+    def get(self, product_id: str) -> Optional[OrderLine]:
+        return self._lines.get(product_id)
+
+    def put(self, line: OrderLine) -> None:
+        """Добавляет строку или заменяет строку того же товара, не меняя ее позицию"""
+        self._lines[line.product_id] = line
+
+    def pop(self, product_id: str) -> Optional[OrderLine]:
+        return self._lines.pop(product_id, None)
+
+    def set_quantities(self, quantities: Dict[str, int]) -> None:
+        """Меняет количество сразу у нескольких товаров: все или ничего"""
+        updated = []
+        for product_id, quantity in quantities.items():
+            line = self._lines.get(product_id)
+            if line is None:
+                raise ValueError(f"Товар {product_id} не найден")
+            updated.append(line.with_quantity(quantity))
+        for line in updated:
+            self._lines[line.product_id] = line
+
+    def total(self) -> Money:
+        """Сумма строк в их валюте; пустые строки дают Money.zero()"""
+        lines = iter(self._lines.values())
+        first = next(lines, None)
+        if first is None:
+            return Money.zero()
+        total = first.total()
+        for line in lines:
+            total = total + line.total()
+        return total
+
+    def clear(self) -> None:
+        self._lines.clear()
+
+    def copy(self) -> "OrderLines":
+        copied = OrderLines()
+        copied._lines = self._lines.copy()
+        return copied
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._lines
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __iter__(self) -> Iterator[OrderLine]:
+        return iter(self._lines.values())
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[OrderLine, List[OrderLine]]:
+        """Медленный путь, O(n) на каждое обращение: оставлен для совместимости
+        со списком строк. Строки лучше перебирать или искать по product_id через get()"""
+        return list(self._lines.values())[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, OrderLines):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"OrderLines({list(self)!r})"
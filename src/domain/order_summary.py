@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from .money import Money
+from .order_status import OrderStatus
+
+
+@dataclass(frozen=True)
+class OrderSummary:
+    """Снимок заказа без строк: то, что нужно индексам и отчетам"""
+    id: str
+    customer_id: str
+    status: OrderStatus
+    total_amount: Money
+    created_at: datetime
+    paid_at: Optional[datetime] = None
+
+    def is_paid(self) -> bool:
+        return self.status == OrderStatus.PAID
@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Callable, Optional, Union
+from .money import Money
+from .order import Order
+from .order_lines import OrderLines
+from .columnar_order_lines import ColumnarOrderLines
+from .order_status import OrderStatus
+from .order_summary import OrderSummary
+
+
+class OrderView:
+    """Легкое представление заказа для чтения.
+
+    Статус, клиент и сохраненная сумма берутся из OrderSummary без сборки
+    агрегата; строки и полный Order загружаются через loader при первом
+    обращении и запоминаются. Представление отражает заказ на момент чтения.
+    """
+
+    __slots__ = ("_summary", "_loader", "_order")
+
+    def __init__(self, summary: OrderSummary, loader: Callable[[str], Optional[Order]]):
+        self._summary = summary
+        self._loader = loader
+        self._order: Optional[Order] = None
+
+    @classmethod
+    def of(cls, order: Order) -> "OrderView":
+        """Представление уже загруженного заказа"""
+        view = cls(order.summary(), lambda order_id: order)
+        view._order = order
+        return view
+
+    @property
+    def id(self) -> str:
+        return self._summary.id
+
+    @property
+    def customer_id(self) -> str:
+        return self._summary.customer_id
+
+    @property
+    def status(self) -> OrderStatus:
+        return self._summary.status
+
+    @property
+    def total_amount(self) -> Money:
+        return self._summary.total_amount
+
+    @property
+    def created_at(self) -> datetime:
+        return self._summary.created_at
+
+    @property
+    def paid_at(self) -> Optional[datetime]:
+        return self._summary.paid_at
+
+    @property
+    def summary(self) -> OrderSummary:
+        return self._summary
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._order is not None
+
+    @property
+    def lines(self) -> Union[OrderLines, ColumnarOrderLines]:
+        return self.load().lines
+
+    def is_paid(self) -> bool:
+        return self._summary.status == OrderStatus.PAID
+
+    def load(self) -> Order:
+        """Полный заказ; загружается один раз"""
+        if self._order is None:
+            order = self._loader(self._summary.id)
+            if order is None:
+                raise ValueError(f"Заказ {self._summary.id} не найден")
+            self._order = order
+        return self._order
+
+    def __repr__(self) -> str:
+        return f"OrderView({self._summary!r}, loaded={self.is_loaded})"
@@ -0,0 +1,165 @@
+"""Потоковое чтение и запись заказов в JSONL и CSV.
+
+Читатели - генераторы: в памяти держится только текущий заказ. Некорректная
+запись не прерывает поток, вместо заказа выдается RejectedRecord с номером строки.
+
+JSONL: один заказ на строку, суммы - строки Decimal без потери точности.
+CSV: одна строка файла на строку заказа, строки одного заказа идут подряд;
+заказ без строк записывается одной строкой с пустыми полями товара.
+"""
+import csv
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_line import OrderLine
+from src.domain.order_status import OrderStatus
+
+CSV_FIELDS = (
+    "order_id", "customer_id", "status", "created_at", "paid_at",
+    "product_id", "product_name", "quantity", "price", "currency",
+)
+
+
+@dataclass(frozen=True)
+class RejectedRecord:
+    """Запись, которую не удалось превратить в заказ или сохранить (line=None)"""
+    line: Optional[int]
+    error: str
+    order_id: Optional[str] = None
+
+
+OrderRecord = Union[Order, RejectedRecord]
+
+
+def read_orders_jsonl(file: TextIO) -> Iterator[OrderRecord]:
+    for number, text in enumerate(file, start=1):
+        if not text.strip():
+            continue
+        order_id = None
+        try:
+            # parse_float=Decimal: 19.99 без промежуточного float
+            record = json.loads(text, parse_float=Decimal)
+            if not isinstance(record, dict):
+                raise ValueError("Запись заказа должна быть JSON-объектом")
+            order_id = record.get("id")
+            yield _order_from_record(record, [_line_from_record(line) for line in record.get("lines", ())])
+        except (ValueError, TypeError, KeyError, InvalidOperation) as e:
+            yield RejectedRecord(number, _describe(e), order_id)
+
+
+def write_orders_jsonl(orders: Iterable[Order], file: TextIO) -> int:
+    """Записывает заказы и возвращает их количество"""
+    count = 0
+    for order in orders:
+        record = _order_to_record(order)
+        record["lines"] = [
+            {
+                "product_id": line.product_id,
+                "product_name": line.product_name,
+                "quantity": line.quantity,
+                "price": str(line.price.amount),
+                "currency": line.price.currency,
+            }
+            for line in order.lines
+        ]
+        file.write(json.dumps(record, ensure_ascii=False))
+        file.write("\n")
+        count += 1
+    return count
+
+
+def read_orders_csv(file: TextIO) -> Iterator[OrderRecord]:
+    reader = csv.DictReader(file)
+    missing = set(CSV_FIELDS) - set(reader.fieldnames or ())
+    if missing:
+        yield RejectedRecord(1, f"В заголовке CSV нет колонок: {', '.join(sorted(missing))}")
+        return
+
+    # Номер строки файла с учетом заголовка
+    rows = ((reader.line_num, row) for row in reader)
+    for order_id, group in groupby(rows, key=lambda item: item[1]["order_id"]):
+        group = list(group)
+        first_line, first_row = group[0]
+        try:
+            lines = [_line_from_record(row) for _, row in group if row["product_id"]]
+            yield _order_from_record({**first_row, "id": order_id}, lines)
+        except (ValueError, TypeError, KeyError, InvalidOperation) as e:
+            yield RejectedRecord(first_line, _describe(e), order_id or None)
+
+
+def write_orders_csv(orders: Iterable[Order], file: TextIO) -> int:
+    """Записывает заказы и возвращает их количество"""
+    writer = csv.writer(file)
+    writer.writerow(CSV_FIELDS)
+    count = 0
+    for order in orders:
+        record = _order_to_record(order)
+        head = [record["id"], record["customer_id"], record["status"], record["created_at"], record["paid_at"] or ""]
+        lines = list(order.lines)
+        if not lines:
+            writer.writerow(head + [""] * 5)
+        for line in lines:
+            writer.writerow(head + [
+                line.product_id, line.product_name, line.quantity, str(line.price.amount), line.price.currency
+            ])
+        count += 1
+    return count
+
+
+def _order_from_record(record: Dict[str, Any], lines: List[OrderLine]) -> Order:
+    if not record.get("id"):
+        raise ValueError("ID заказа обязателен")
+    paid_at = record.get("paid_at")
+    return Order(
+        id=record["id"],
+        customer_id=record.get("customer_id") or "",
+        lines=lines,
+        status=OrderStatus(record["status"]),
+        created_at=datetime.fromisoformat(record["created_at"]),
+        paid_at=datetime.fromisoformat(paid_at) if paid_at else None
+    )
+
+
+def _line_from_record(record: Dict[str, Any]) -> OrderLine:
+    return OrderLine(
+        product_id=record["product_id"],
+        product_name=record["product_name"],
+        quantity=_quantity(record["quantity"]),
+        price=Money(Decimal(str(record["price"])), record["currency"])
+    )
+
+
+def _quantity(value: Any) -> int:
+    """Количество - целое число; дробное значение отклоняется, а не усекается"""
+    if isinstance(value, bool):
+        raise ValueError(f"Количество должно быть целым числом: {value!r}")
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Количество должно быть целым числом: {value!r}") from None
+    if not number.is_finite() or number != number.to_integral_value():
+        raise ValueError(f"Количество должно быть целым числом: {value!r}")
+    return int(number)
+
+
+def _order_to_record(order: Order) -> Dict[str, Any]:
+    return {
+        "id": order.id,
+        "customer_id": order.customer_id,
+        "status": order.status.value,
+        "created_at": order.created_at.isoformat(),
+        "paid_at": order.paid_at.isoformat() if order.paid_at else None,
+    }
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, KeyError):
+        return f"Нет обязательного поля {error}"
+    if isinstance(error, InvalidOperation):
+        return "Некорректная сумма"
+    return str(error)
@@ -0,0 +1,65 @@
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Iterable, List, Optional
+from src.domain.order import Order
+from src.application.ports.order_repository import OrderRepository
+from src.infrastructure.bulk.order_formats import OrderRecord, RejectedRecord
+
+
+@dataclass
+class ImportReport:
+    """Итог импорта: сколько заказов сохранено и какие записи отклонены"""
+    imported: int = 0
+    rejected: int = 0
+    errors: List[RejectedRecord] = field(default_factory=list)
+
+
+def import_orders(
+    repository: OrderRepository,
+    records: Iterable[OrderRecord],
+    chunk_size: int = 1000,
+    on_error: Optional[Callable[[RejectedRecord], None]] = None
+) -> ImportReport:
+    """Сохраняет поток заказов пачками по chunk_size через save_many.
+
+    Отклоненные записи передаются в on_error; без него они собираются в отчет.
+    Если пачка не сохранилась целиком, ее несохраненные заказы сохраняются по одному,
+    чтобы отклонить только проблемные.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Размер пачки должен быть положительным")
+    report = ImportReport()
+
+    def reject(record: RejectedRecord) -> None:
+        report.rejected += 1
+        if on_error is not None:
+            on_error(record)
+        else:
+            report.errors.append(record)
+
+    iterator = iter(records)
+    while chunk := list(islice(iterator, chunk_size)):
+        orders: List[Order] = []
+        for record in chunk:
+            if isinstance(record, RejectedRecord):
+                reject(record)
+            else:
+                orders.append(record)
+        if not orders:
+            continue
+        versions = [order.version for order in orders]
+        try:
+            repository.save_many(orders)
+            report.imported += len(orders)
+        except ValueError:
+            for order, version in zip(orders, versions):
+                if order.version != version:
+                    # Часть пачки уже сохранена (например, другим шардом)
+                    report.imported += 1
+                    continue
+                try:
+                    repository.save(order)
+                    report.imported += 1
+                except ValueError as e:
+                    reject(RejectedRecord(None, str(e), order.id))
+    return report
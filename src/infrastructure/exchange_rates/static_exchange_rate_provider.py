@@ -0,0 +1,24 @@
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Mapping
+from src.application.ports.exchange_rate_provider import ExchangeRateProvider, Rate
+
+
+class StaticExchangeRateProvider(ExchangeRateProvider):
+    """Фиксированные курсы относительно базовой валюты: {"EUR": Decimal("0.92")} - 1 USD = 0.92 EUR.
+
+    Кросс-курсы считаются точными дробями, поэтому пересчет A -> B -> A
+    возвращает исходный курс без накопленной ошибки деления.
+    """
+
+    def __init__(self, rates: Mapping[str, Decimal], base: str = "USD"):
+        if any(rate <= 0 for rate in rates.values()):
+            raise ValueError("Курс должен быть положительным")
+        self._rates: Dict[str, Decimal] = {base: Decimal(1), **rates}
+
+    def get_rates(self, target_currency: str) -> Dict[str, Rate]:
+        target_rate = self._rates.get(target_currency)
+        if target_rate is None:
+            raise ValueError(f"Нет курса для валюты {target_currency}")
+        target_rate = Fraction(target_rate)
+        return {currency: target_rate / Fraction(rate) for currency, rate in self._rates.items()}
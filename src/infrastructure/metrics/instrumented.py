@@ -0,0 +1,100 @@
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.domain.order_view import OrderView
+from src.application.ports.metrics_recorder import MetricsRecorder
+from src.application.ports.order_repository import OrderRepository
+from src.application.ports.payment_gateway import PaymentGateway
+
+
+class InstrumentedOrderRepository(OrderRepository):
+    """Замеряет время и ошибки каждого обращения к репозиторию"""
+
+    def __init__(self, repository: OrderRepository, metrics: MetricsRecorder, prefix: str = "order_repository"):
+        self._repository = repository
+        self._metrics = metrics
+        self._prefix = prefix
+
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        with self._metrics.timer(f"{self._prefix}.get_by_id"):
+            return self._repository.get_by_id(order_id)
+
+    def save(self, order: Order) -> None:
+        with self._metrics.timer(f"{self._prefix}.save"):
+            self._repository.save(order)
+
+    def delete(self, order_id: str) -> None:
+        with self._metrics.timer(f"{self._prefix}.delete"):
+            self._repository.delete(order_id)
+
+    def find_by_customer(self, customer_id: str) -> List[Order]:
+        with self._metrics.timer(f"{self._prefix}.find_by_customer"):
+            return self._repository.find_by_customer(customer_id)
+
+    def find_by_status(self, status: OrderStatus) -> List[Order]:
+        with self._metrics.timer(f"{self._prefix}.find_by_status"):
+            return self._repository.find_by_status(status)
+
+    def find_created_between(self, start: datetime, end: datetime) -> List[Order]:
+        with self._metrics.timer(f"{self._prefix}.find_created_between"):
+            return self._repository.find_created_between(start, end)
+
+    def find_paid_between(self, start: datetime, end: datetime) -> List[Order]:
+        with self._metrics.timer(f"{self._prefix}.find_paid_between"):
+            return self._repository.find_paid_between(start, end)
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        with self._metrics.timer(f"{self._prefix}.get_many"):
+            return self._repository.get_many(order_ids)
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        with self._metrics.timer(f"{self._prefix}.save_many"):
+            self._repository.save_many(orders)
+
+    def get_view(self, order_id: str) -> Optional[OrderView]:
+        with self._metrics.timer(f"{self._prefix}.get_view"):
+            return self._repository.get_view(order_id)
+
+    def find_views_by_customer(self, customer_id: str) -> List[OrderView]:
+        with self._metrics.timer(f"{self._prefix}.find_views_by_customer"):
+            return self._repository.find_views_by_customer(customer_id)
+
+    def find_views_by_status(self, status: OrderStatus) -> List[OrderView]:
+        with self._metrics.timer(f"{self._prefix}.find_views_by_status"):
+            return self._repository.find_views_by_status(status)
+
+    def iter_orders(self, batch_size: int = 1000) -> Iterator[Order]:
+        return self._repository.iter_orders(batch_size)
+
+    def iter_ids(self, batch_size: int = 1000) -> Iterator[str]:
+        return self._repository.iter_ids(batch_size)
+
+    def lock(self, order_id: str) -> AbstractContextManager:
+        return self._repository.lock(order_id)
+
+    def lock_many(self, order_ids: Iterable[str]) -> AbstractContextManager:
+        return self._repository.lock_many(order_ids)
+
+
+class InstrumentedPaymentGateway(PaymentGateway):
+    """Замеряет время и ошибки каждого обращения к платежному шлюзу"""
+
+    def __init__(self, gateway: PaymentGateway, metrics: MetricsRecorder, prefix: str = "payment_gateway"):
+        self._gateway = gateway
+        self._metrics = metrics
+        self._prefix = prefix
+
+    def charge(self, order_id: str, amount: Money) -> str:
+        with self._metrics.timer(f"{self._prefix}.charge"):
+            return self._gateway.charge(order_id, amount)
+
+    def refund(self, transaction_id: str, amount: Money) -> None:
+        with self._metrics.timer(f"{self._prefix}.refund"):
+            self._gateway.refund(transaction_id, amount)
+
+    def charge_many(self, payments: Iterable[Tuple[str, Money]]) -> Dict[str, Union[str, Exception]]:
+        with self._metrics.timer(f"{self._prefix}.charge_many"):
+            return self._gateway.charge_many(payments)
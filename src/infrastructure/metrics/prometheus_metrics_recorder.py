@@ -0,0 +1,122 @@
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler
+from typing import Dict, List, Sequence, Type
+from src.application.ports.metrics_recorder import MetricsRecorder
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Histogram:
+
+    __slots__ = ("buckets", "count", "sum", "errors")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * (size + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+
+class PrometheusMetricsRecorder(MetricsRecorder):
+    """Гистограммы задержек, ошибки и счетчики в текстовом формате Prometheus"""
+
+    def __init__(self, namespace: str = "orders", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self._bounds = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, _Histogram] = {}
+        self._counters: Dict[str, float] = {}
+
+    def observe(self, operation: str, seconds: float, error: bool = False) -> None:
+        position = bisect_left(self._bounds, seconds)
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = _Histogram(len(self._bounds))
+            histogram.buckets[position] += 1
+            histogram.count += 1
+            histogram.sum += seconds
+            if error:
+                histogram.errors += 1
+
+    def increment(self, event: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[event] = self._counters.get(event, 0) + value
+
+    def count(self, operation: str) -> int:
+        histogram = self._histograms.get(operation)
+        return histogram.count if histogram else 0
+
+    def errors(self, operation: str) -> int:
+        histogram = self._histograms.get(operation)
+        return histogram.errors if histogram else 0
+
+    def error_rate(self, operation: str) -> float:
+        histogram = self._histograms.get(operation)
+        return histogram.errors / histogram.count if histogram and histogram.count else 0.0
+
+    def render(self) -> str:
+        duration = f"{self.namespace}_operation_duration_seconds"
+        errors = f"{self.namespace}_operation_errors_total"
+        events = f"{self.namespace}_events_total"
+        with self._lock:
+            histograms = {name: (list(h.buckets), h.count, h.sum, h.errors) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines: List[str] = [
+            f"# HELP {duration} Длительность операций в секундах",
+            f"# TYPE {duration} histogram",
+        ]
+        for operation, (buckets, count, total, _) in sorted(histograms.items()):
+            label = f'operation="{_escape(operation)}"'
+            cumulative = 0
+            for bound, bucket in zip(self._bounds, buckets):
+                cumulative += bucket
+                lines.append(f'{duration}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{duration}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"{duration}_sum{{{label}}} {total}")
+            lines.append(f"{duration}_count{{{label}}} {count}")
+
+        lines += [f"# HELP {errors} Число операций, завершившихся ошибкой", f"# TYPE {errors} counter"]
+        for operation, (_, _, _, failed) in sorted(histograms.items()):
+            lines.append(f'{errors}{{operation="{_escape(operation)}"}} {failed}')
+
+        lines += [f"# HELP {events} Счетчики событий", f"# TYPE {events} counter"]
+        for event, value in sorted(counters.items()):
+            lines.append(f'{events}{{event="{_escape(event)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_to(self, path: str) -> None:
+        """Атомарно записывает метрики в файл (например, для textfile collector)"""
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(temporary_path, path)
+
+
+def make_metrics_handler(recorder: PrometheusMetricsRecorder) -> Type[BaseHTTPRequestHandler]:
+    """Обработчик для http.server, отдающий метрики по GET /metrics"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = recorder.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return MetricsHandler
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
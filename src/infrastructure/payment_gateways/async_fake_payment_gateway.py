@@ -0,0 +1,35 @@
+import asyncio
+from typing import Optional
+from src.domain.money import Money
+from src.application.ports.async_payment_gateway import AsyncPaymentGateway
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.payment_gateways.transaction_ledger import TransactionLedger
+
+
+class AsyncFakePaymentGateway(AsyncPaymentGateway):
+    """Фейковый асинхронный шлюз с имитацией сетевой задержки"""
+
+    def __init__(self, latency: float = 0.0, gateway: Optional[FakePaymentGateway] = None):
+        if latency < 0:
+            raise ValueError("Задержка не может быть отрицательной")
+        self.latency = latency
+        self._gateway = gateway if gateway is not None else FakePaymentGateway()
+
+    @property
+    def transactions(self) -> TransactionLedger:
+        return self._gateway.transactions
+
+    async def charge(self, order_id: str, amount: Money) -> str:
+        await self._simulate_latency()
+        return self._gateway.charge(order_id, amount)
+
+    async def refund(self, transaction_id: str, amount: Money) -> None:
+        await self._simulate_latency()
+        self._gateway.refund(transaction_id, amount)
+
+    def set_fail_mode(self, should_fail: bool) -> None:
+        self._gateway.set_fail_mode(should_fail)
+
+    async def _simulate_latency(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
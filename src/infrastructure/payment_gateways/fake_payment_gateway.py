@@ -1,38 +1,88 @@
+import random
+import threading
+import time
 import uuid
-from typing import Dict
+from typing import Dict, Iterable, Optional, Tuple, Union
 from src.domain.money import Money
-from src.application.ports.payment_gateway import PaymentGateway
+from src.application.ports.payment_gateway import PaymentGateway, PaymentGatewayUnavailableError
+from src.infrastructure.payment_gateways.transaction_ledger import TransactionLedger, TransactionRecord
 
 
 class FakePaymentGateway(PaymentGateway):
+    """Фейковый шлюз; транзакции хранятся в TransactionLedger (можно ограничить память архивом).
 
-    def __init__(self):
-        self.transactions: Dict[str, Dict] = {}
+    Каждое обращение (charge, charge_many, refund) - один запрос к шлюзу: оно
+    стоит latency секунд и учитывается в round_trips. max_connections
+    ограничивает число одновременных запросов, как пул соединений эквайера.
+    """
+
+    def __init__(self, ledger: Optional[TransactionLedger] = None, max_connections: Optional[int] = None):
+        if max_connections is not None and max_connections <= 0:
+            raise ValueError("Число соединений должно быть положительным")
+        self.transactions = ledger if ledger is not None else TransactionLedger()
+        self._connections = threading.BoundedSemaphore(max_connections) if max_connections is not None else None
         self.should_fail = False
+        self.failure_rate = 0.0
+        self.latency = 0.0
+        self._random = random.Random()
+        self.round_trips = 0
+        self._round_trips_lock = threading.Lock()
 
     def charge(self, order_id: str, amount: Money) -> str:
-        if self.should_fail:
-            raise ValueError("Платежный шлюз недоступен")
+        self._simulate_request()
+        return self._charge(order_id, amount)
+
+    def charge_many(self, payments: Iterable[Tuple[str, Money]]) -> Dict[str, Union[str, Exception]]:
+        self._simulate_request()
+
+        results: Dict[str, Union[str, Exception]] = {}
+        for order_id, amount in payments:
+            try:
+                results[order_id] = self._charge(order_id, amount)
+            except ValueError as e:
+                results[order_id] = e
+        return results
+
+    def refund(self, transaction_id: str, amount: Money) -> None:
+        self._simulate_request()
+        self.transactions.refund(transaction_id, amount)
+
+    def set_fail_mode(
+        self,
+        should_fail: bool,
+        failure_rate: float = 0.0,
+        latency: float = 0.0,
+        seed: Optional[int] = None
+    ) -> None:
+        """should_fail - отказ на каждый запрос, failure_rate - доля случайных отказов,
+        latency - задержка каждого обращения к шлюзу в секундах"""
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError("Доля отказов должна быть от 0 до 1")
+        if latency < 0:
+            raise ValueError("Задержка не может быть отрицательной")
+        self.should_fail = should_fail
+        self.failure_rate = failure_rate
+        self.latency = latency
+        if seed is not None:
+            self._random.seed(seed)
 
+    def _simulate_request(self) -> None:
+        with self._round_trips_lock:
+            self.round_trips += 1
+        if self.latency:
+            if self._connections is not None:
+                with self._connections:
+                    time.sleep(self.latency)
+            else:
+                time.sleep(self.latency)
+        if self.should_fail or (self.failure_rate and self._random.random() < self.failure_rate):
+            raise PaymentGatewayUnavailableError("Платежный шлюз недоступен")
+
+    def _charge(self, order_id: str, amount: Money) -> str:
         if amount.is_zero() or not amount.is_positive():
             raise ValueError("Сумма платежа должна быть положительной")
 
         transaction_id = str(uuid.uuid4())
-        self.transactions[transaction_id] = {
-            "order_id": order_id,
-            "amount": amount,
-            "status": "completed"
-        }
+        self.transactions.add(TransactionRecord(transaction_id, order_id, amount))
 
         return transaction_id
-
-    def refund(self, transaction_id: str, amount: Money) -> None:
-        if transaction_id not in self.transactions:
-            raise ValueError(f"Транзакция {transaction_id} не найдена")
-
-        transaction = self.transactions[transaction_id]
-        transaction["status"] = "refunded"
-        transaction["refund_amount"] = amount
-
-    def set_fail_mode(self, should_fail: bool) -> None:
-        self.should_fail = should_fail
\ No newline at end of file
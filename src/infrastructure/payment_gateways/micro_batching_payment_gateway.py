@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Tuple, Union
+from src.domain.money import Money
+from src.application.ports.payment_gateway import PaymentGateway
+
+_Charge = Tuple[str, Money, Future]
+
+
+class MicroBatchingPaymentGateway(PaymentGateway):
+    """Собирает одиночные charge из параллельных потоков в пачки для charge_many.
+
+    Пачка отправляется, когда набралось max_batch_size списаний или прошло
+    max_wait секунд с первого списания в пачке. Каждый вызывающий ждет свой
+    результат через Future: транзакцию или ошибку своего платежа. Ошибка всей
+    пачки (например, PaymentGatewayUnavailableError) достается каждому ее участнику.
+    """
+
+    def __init__(self, gateway: PaymentGateway, max_batch_size: int = 100, max_wait: float = 0.002):
+        if max_batch_size <= 0:
+            raise ValueError("Размер пачки должен быть положительным")
+        if max_wait < 0:
+            raise ValueError("Время ожидания не может быть отрицательным")
+        self._gateway = gateway
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[_Charge] = []
+        self._first_pending_at = 0.0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._run, name="payment-micro-batcher", daemon=True)
+        self._flusher.start()
+
+    def charge(self, order_id: str, amount: Money) -> str:
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise ValueError("Шлюз пакетной отправки остановлен")
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending.append((order_id, amount, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+        return future.result()
+
+    def charge_many(self, payments: Iterable[Tuple[str, Money]]) -> Dict[str, Union[str, Exception]]:
+        # Пачка уже собрана вызывающим - отправляем как есть
+        return self._gateway.charge_many(payments)
+
+    def refund(self, transaction_id: str, amount: Money) -> None:
+        self._gateway.refund(transaction_id, amount)
+
+    def close(self) -> None:
+        """Отправляет накопленные списания и останавливает фоновый поток"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._flusher.join()
+
+    def __enter__(self) -> "MicroBatchingPaymentGateway":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        batch: List[_Charge] = []
+        try:
+            while True:
+                with self._condition:
+                    while not self._pending and not self._closed:
+                        self._condition.wait()
+                    if not self._pending:
+                        return
+                    deadline = self._first_pending_at + self.max_wait
+                    while len(self._pending) < self.max_batch_size and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    batch = self._pending[:self.max_batch_size]
+                    del self._pending[:self.max_batch_size]
+                    if self._pending:
+                        self._first_pending_at = time.monotonic()
+                for group in _unique_orders(batch):
+                    self._send(group)
+                batch = []
+        finally:
+            # Поток завершился (штатно или из-за ошибки): новые charge отклоняются сразу,
+            # а ожидающие получают ошибку вместо вечного ожидания
+            with self._condition:
+                self._closed = True
+                stranded = batch + self._pending
+                self._pending = []
+            _fail_pending(stranded, ValueError("Шлюз пакетной отправки остановлен"))
+
+    def _send(self, batch: List[_Charge]) -> None:
+        try:
+            results = self._gateway.charge_many((order_id, amount) for order_id, amount, _ in batch)
+            for order_id, _, future in batch:
+                result = results.get(order_id)
+                if isinstance(result, str):
+                    future.set_result(result)
+                elif isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_exception(ValueError("Платеж не был выполнен"))
+        except ValueError as e:
+            _fail_pending(batch, e)
+        except Exception as e:
+            # Ошибка разбора ответа шлюза: вызывающие получают ее в контракте PaymentGateway
+            error = ValueError(f"Некорректный ответ платежного шлюза: {e!r}")
+            error.__cause__ = e
+            _fail_pending(batch, error)
+        finally:
+            _fail_pending(batch, ValueError("Платеж не был выполнен"))
+
+
+def _fail_pending(charges: List[_Charge], error: BaseException) -> None:
+    for _, _, future in charges:
+        if not future.done():
+            future.set_exception(error)
+
+
+def _unique_orders(batch: List[_Charge]) -> List[List[_Charge]]:
+    """Делит пачку так, чтобы order_id не повторялся: charge_many возвращает результат по order_id"""
+    groups: List[List[_Charge]] = []
+    seen: List[set] = []
+    for charge in batch:
+        for group, order_ids in zip(groups, seen):
+            if charge[0] not in order_ids:
+                group.append(charge)
+                order_ids.add(charge[0])
+                break
+        else:
+            groups.append([charge])
+            seen.append({charge[0]})
+    return groups
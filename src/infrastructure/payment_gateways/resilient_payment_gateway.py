@@ -0,0 +1,199 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, TypeVar, Union
+from src.domain.money import Money
+from src.application.ports.payment_gateway import PaymentGateway, PaymentGatewayUnavailableError
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(PaymentGatewayUnavailableError):
+    """Предохранитель разомкнут: запрос отклонен без обращения к шлюзу"""
+
+
+class PaymentDeadlineExceededError(PaymentGatewayUnavailableError):
+    """Время, отведенное на вызов вместе с повторами, истекло.
+
+    Если истекло во время обращения к шлюзу, исход этого обращения неизвестен:
+    повторять списание безопасно только шлюзу, который дедуплицирует его по order_id.
+    """
+
+
+class CircuitBreaker:
+    """Предохранитель: после серии отказов перестает пропускать запросы.
+
+    closed - запросы идут как обычно; open - запросы сразу отклоняются, пока не
+    пройдет reset_timeout; half_open - пропускается один пробный запрос, успех
+    замыкает предохранитель, отказ снова размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        if failure_threshold <= 0:
+            raise ValueError("Порог отказов должен быть положительным")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._trial_owner: Optional[int] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._trial_in_progress:
+                return False
+            self._trial_in_progress = True
+            self._trial_owner = threading.get_ident()
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def release_trial(self) -> None:
+        """Запрос закончился ни успехом, ни отказом шлюза: пробный слот освобождается, счетчик не меняется"""
+        with self._lock:
+            if self._trial_in_progress and self._trial_owner == threading.get_ident():
+                self._trial_in_progress = False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Повторы с экспоненциальной задержкой и полным джиттером"""
+    max_attempts: int = 3
+    base_delay: float = 0.05
+    max_delay: float = 1.0
+
+    def __post_init__(self):
+        if self.max_attempts <= 0:
+            raise ValueError("Число попыток должно быть положительным")
+
+    def delay(self, attempt: int, rng: Callable[[], float] = random.random) -> float:
+        """Задержка перед повтором после попытки с номером attempt (с 1)"""
+        return rng() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+
+class ResilientPaymentGateway(PaymentGateway):
+    """Обертка над любым PaymentGateway: предохранитель, повторы и дедлайн вызова.
+
+    Повторяются только ошибки PaymentGatewayUnavailableError - платеж точно не
+    прошел. Бизнес-ошибки шлюза (например, неверная сумма) возвращаются сразу и
+    не считаются ни отказом, ни успехом. Дедлайн ограничивает вызов вместе со
+    всеми повторами: повтор, который не успевает, не начинается, а зависшее
+    обращение к шлюзу ждется не дольше оставшегося времени. Прервать его Python
+    не умеет, поэтому при дедлайне обращение выполняется в отдельном потоке и
+    после истечения времени дорабатывает в фоне.
+    """
+
+    def __init__(
+        self,
+        gateway: PaymentGateway,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        deadline: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random
+    ):
+        self._gateway = gateway
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker(clock=clock)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.deadline = deadline
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+
+    def charge(self, order_id: str, amount: Money) -> str:
+        return self._call(lambda: self._gateway.charge(order_id, amount))
+
+    def refund(self, transaction_id: str, amount: Money) -> None:
+        self._call(lambda: self._gateway.refund(transaction_id, amount))
+
+    def charge_many(self, payments: Iterable[Tuple[str, Money]]) -> Dict[str, Union[str, Exception]]:
+        payments = list(payments)
+        return self._call(lambda: self._gateway.charge_many(payments))
+
+    def _call(self, operation: Callable[[], T]) -> T:
+        deadline_at = self._clock() + self.deadline if self.deadline is not None else None
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError("Платежный шлюз временно отключен после серии отказов")
+            attempt += 1
+            try:
+                result = self._attempt(operation, deadline_at)
+            except PaymentDeadlineExceededError:
+                self.circuit_breaker.record_failure()
+                raise
+            except PaymentGatewayUnavailableError as e:
+                self.circuit_breaker.record_failure()
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                delay = self.retry_policy.delay(attempt, self._rng)
+                if deadline_at is not None and self._clock() + delay >= deadline_at:
+                    raise PaymentDeadlineExceededError("Истекло время ожидания платежного шлюза") from e
+                self._sleep(delay)
+                continue
+            except BaseException:
+                # Ошибка самого запроса или KeyboardInterrupt: шлюз ответил, но успехом это не считается
+                self.circuit_breaker.release_trial()
+                raise
+            self.circuit_breaker.record_success()
+            return result
+
+    def _attempt(self, operation: Callable[[], T], deadline_at: Optional[float]) -> T:
+        """Одно обращение к шлюзу, ограниченное оставшимся до дедлайна временем"""
+        if deadline_at is None:
+            return operation()
+        remaining = deadline_at - self._clock()
+        if remaining <= 0:
+            raise PaymentDeadlineExceededError("Истекло время ожидания платежного шлюза")
+
+        done = threading.Event()
+        outcome: Dict[str, Any] = {}
+
+        def run() -> None:
+            try:
+                outcome["result"] = operation()
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=run, name="payment-gateway-call", daemon=True).start()
+        if not done.wait(remaining):
+            raise PaymentDeadlineExceededError("Истекло время ожидания платежного шлюза: исход обращения неизвестен")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
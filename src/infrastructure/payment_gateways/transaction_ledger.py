@@ -0,0 +1,226 @@
+import json
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from src.domain.money import Money
+
+COMPLETED = "completed"
+REFUNDED = "refunded"
+
+
+@dataclass(slots=True)
+class TransactionRecord:
+    """Запись о транзакции шлюза"""
+    transaction_id: str
+    order_id: str
+    amount: Money
+    status: str = COMPLETED
+    refund_amount: Optional[Money] = None
+
+
+class TransactionLedger:
+    """Журнал транзакций с индексами по order_id и статусу.
+
+    Счетчики и суммы по статусам ведутся на лету. Если задан max_active, в
+    памяти остается не больше max_active транзакций, остальные дописываются в
+    архивный файл archive_path (JSON Lines): сначала уже возвращенные, затем
+    самые старые завершенные. Возврат по архивной транзакции дописывает в архив
+    ее новую версию; индекс id -> смещение последней версии позволяет читать
+    архивную транзакцию без просмотра файла.
+    """
+
+    def __init__(self, archive_path: Optional[str] = None, max_active: Optional[int] = None):
+        if max_active is not None:
+            if max_active <= 0:
+                raise ValueError("Лимит транзакций в памяти должен быть положительным")
+            if archive_path is None:
+                raise ValueError("Для лимита транзакций в памяти нужен файл архива")
+        self.archive_path = archive_path
+        self.max_active = max_active
+        self._records: Dict[str, TransactionRecord] = {}
+        self._by_order: Dict[str, List[str]] = {}
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        self._counts: Counter = Counter()
+        self._totals: Dict[Tuple[str, str], Money] = {}
+        self._refunds: Dict[str, Money] = {}
+        # Смещение последней версии каждой архивной транзакции в файле архива
+        self._archive_offsets: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def add(self, record: TransactionRecord) -> None:
+        with self._lock:
+            self._link(record)
+            self._counts[record.status] += 1
+            self._add_total(record.status, record.amount)
+            if self.max_active is not None and len(self._records) > self.max_active:
+                self._archive_oldest()
+
+    def refund(self, transaction_id: str, amount: Money) -> TransactionRecord:
+        with self._lock:
+            record = self._records.get(transaction_id)
+            archived = record is None
+            if archived:
+                record = self._find_archived(transaction_id)
+                if record is None:
+                    raise ValueError(f"Транзакция {transaction_id} не найдена")
+            if record.refund_amount is not None:
+                self._add_refund(record.refund_amount, negative=True)
+            self._set_status(record, REFUNDED)
+            record.refund_amount = amount
+            self._add_refund(amount)
+            if archived:
+                self._append_archive([record])
+            return record
+
+    def get(self, transaction_id: str) -> Optional[TransactionRecord]:
+        """Транзакция из памяти, иначе из архива (чтение файла)"""
+        with self._lock:
+            record = self._records.get(transaction_id)
+            return record if record is not None else self._find_archived(transaction_id)
+
+    def for_order(self, order_id: str) -> List[TransactionRecord]:
+        """Транзакции заказа, которые еще в памяти"""
+        with self._lock:
+            return [self._records[transaction_id] for transaction_id in self._by_order.get(order_id, ())]
+
+    def by_status(self, status: str) -> List[TransactionRecord]:
+        """Транзакции в статусе status, которые еще в памяти"""
+        with self._lock:
+            return [self._records[transaction_id] for transaction_id in self._by_status.get(status, ())]
+
+    def count(self, status: str) -> int:
+        """Число транзакций в статусе, включая архивные"""
+        return self._counts[status]
+
+    def total(self, status: str, currency: str = "USD") -> Money:
+        """Сумма транзакций в статусе, включая архивные"""
+        return self._totals.get((status, currency), Money.zero(currency))
+
+    def refunded_total(self, currency: str = "USD") -> Money:
+        return self._refunds.get(currency, Money.zero(currency))
+
+    @property
+    def active_count(self) -> int:
+        return len(self._records)
+
+    @property
+    def archived_count(self) -> int:
+        return len(self._archive_offsets)
+
+    def archived(self) -> Iterator[TransactionRecord]:
+        """Последние версии архивных транзакций в порядке записи в архив"""
+        if not self._archive_offsets:
+            return
+        with self._lock:
+            latest = set(self._archive_offsets.values())
+        with open(self.archive_path, "rb") as file:
+            offset = file.tell()
+            for text in file:
+                if offset in latest:
+                    yield _decode(text)
+                offset += len(text)
+
+    def __len__(self) -> int:
+        return len(self._records) + len(self._archive_offsets)
+
+    def __contains__(self, transaction_id: object) -> bool:
+        return transaction_id in self._records or transaction_id in self._archive_offsets
+
+    def __iter__(self) -> Iterator[TransactionRecord]:
+        """Архивные транзакции, затем транзакции в памяти"""
+        yield from self.archived()
+        with self._lock:
+            records = list(self._records.values())
+        yield from records
+
+    def _link(self, record: TransactionRecord) -> None:
+        self._records[record.transaction_id] = record
+        self._by_order.setdefault(record.order_id, []).append(record.transaction_id)
+        self._by_status.setdefault(record.status, {})[record.transaction_id] = None
+
+    def _unlink(self, record: TransactionRecord) -> None:
+        del self._records[record.transaction_id]
+        order_transactions = self._by_order[record.order_id]
+        order_transactions.remove(record.transaction_id)
+        if not order_transactions:
+            del self._by_order[record.order_id]
+        del self._by_status[record.status][record.transaction_id]
+
+    def _set_status(self, record: TransactionRecord, status: str) -> None:
+        if record.transaction_id in self._records:
+            del self._by_status[record.status][record.transaction_id]
+            self._by_status.setdefault(status, {})[record.transaction_id] = None
+        self._counts[record.status] -= 1
+        self._counts[status] += 1
+        self._add_total(record.status, record.amount, negative=True)
+        self._add_total(status, record.amount)
+        record.status = status
+
+    def _add_total(self, status: str, amount: Money, negative: bool = False) -> None:
+        key = (status, amount.currency)
+        total = self._totals.get(key, Money.zero(amount.currency))
+        self._totals[key] = total - amount if negative else total + amount
+
+    def _add_refund(self, amount: Money, negative: bool = False) -> None:
+        total = self._refunds.get(amount.currency, Money.zero(amount.currency))
+        self._refunds[amount.currency] = total - amount if negative else total + amount
+
+    def _archive_oldest(self) -> None:
+        # Архивируем с запасом в 10%, чтобы не писать в файл на каждую новую транзакцию.
+        # Сначала уходят возвращенные транзакции, завершенные еще могут понадобиться для возврата
+        count = len(self._records) - self.max_active + self.max_active // 10
+        evicted = dict.fromkeys(islice(self._by_status.get(REFUNDED, {}), count))
+        if len(evicted) < count:
+            oldest = (transaction_id for transaction_id in self._records if transaction_id not in evicted)
+            evicted.update(dict.fromkeys(islice(oldest, count - len(evicted))))
+        records = [self._records[transaction_id] for transaction_id in evicted]
+        self._append_archive(records)
+        for record in records:
+            self._unlink(record)
+
+    def _append_archive(self, records: List[TransactionRecord]) -> None:
+        with open(self.archive_path, "ab") as file:
+            offset = file.tell()
+            for record in records:
+                text = _encode(record).encode("utf-8")
+                file.write(text)
+                self._archive_offsets[record.transaction_id] = offset
+                offset += len(text)
+
+    def _find_archived(self, transaction_id: str) -> Optional[TransactionRecord]:
+        offset = self._archive_offsets.get(transaction_id)
+        if offset is None:
+            return None
+        with open(self.archive_path, "rb") as file:
+            file.seek(offset)
+            return _decode(file.readline())
+
+
+def _encode(record: TransactionRecord) -> str:
+    refund = None
+    if record.refund_amount is not None:
+        refund = [*record.refund_amount.as_units(), record.refund_amount.currency]
+    return json.dumps([
+        record.transaction_id,
+        record.order_id,
+        *record.amount.as_units(),
+        record.amount.currency,
+        record.status,
+        refund,
+    ]) + "\n"
+
+
+def _decode(text: Union[str, bytes]) -> TransactionRecord:
+    transaction_id, order_id, units, scale, currency, status, refund = json.loads(text)
+    refund_amount = None
+    if refund is not None:
+        refund_amount = Money.from_units(*refund)
+    return TransactionRecord(
+        transaction_id=transaction_id,
+        order_id=order_id,
+        amount=Money.from_units(units, scale, currency),
+        status=status,
+        refund_amount=refund_amount
+    )
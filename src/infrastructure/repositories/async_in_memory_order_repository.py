@@ -0,0 +1,19 @@
+from typing import Optional
+from src.domain.order import Order
+from src.application.ports.async_order_repository import AsyncOrderRepository
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+
+
+class AsyncInMemoryOrderRepository(AsyncOrderRepository):
+
+    def __init__(self, repository: Optional[InMemoryOrderRepository] = None):
+        self._repository = repository if repository is not None else InMemoryOrderRepository()
+
+    async def get_by_id(self, order_id: str) -> Optional[Order]:
+        return self._repository.get_by_id(order_id)
+
+    async def save(self, order: Order) -> None:
+        self._repository.save(order)
+
+    async def delete(self, order_id: str) -> None:
+        self._repository.delete(order_id)
@@ -0,0 +1,190 @@
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.domain.order_summary import OrderSummary
+from src.infrastructure.repositories.order_codec import decode_order, encode_order
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cold_orders (
+    id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    paid_at TEXT,
+    version INTEGER NOT NULL,
+    total_units INTEGER NOT NULL,
+    total_scale INTEGER NOT NULL,
+    total_currency TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cold_orders_customer ON cold_orders(customer_id);
+CREATE INDEX IF NOT EXISTS cold_orders_status ON cold_orders(status);
+CREATE INDEX IF NOT EXISTS cold_orders_created_at ON cold_orders(created_at);
+CREATE INDEX IF NOT EXISTS cold_orders_paid_at ON cold_orders(paid_at) WHERE paid_at IS NOT NULL;
+"""
+
+_UPSERT = """
+INSERT INTO cold_orders (id, customer_id, status, created_at, paid_at, version, total_units, total_scale, total_currency, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    customer_id = excluded.customer_id,
+    status = excluded.status,
+    created_at = excluded.created_at,
+    paid_at = excluded.paid_at,
+    version = excluded.version,
+    total_units = excluded.total_units,
+    total_scale = excluded.total_scale,
+    total_currency = excluded.total_currency,
+    data = excluded.data
+"""
+_SELECT_DATA = "SELECT data FROM cold_orders WHERE id IN ({})"
+_SELECT_SUMMARIES = """
+SELECT id, customer_id, status, created_at, paid_at, total_units, total_scale, total_currency FROM cold_orders WHERE {}
+"""
+_SELECT_VERSIONS = "SELECT id, version FROM cold_orders WHERE id IN ({})"
+_DELETE = "DELETE FROM cold_orders WHERE id = ?"
+_IDS_BY_CUSTOMER = "SELECT id FROM cold_orders WHERE customer_id = ?"
+_IDS_BY_STATUS = "SELECT id FROM cold_orders WHERE status = ?"
+_IDS_CREATED_BETWEEN = "SELECT id FROM cold_orders WHERE created_at BETWEEN ? AND ? ORDER BY created_at, id"
+_IDS_PAID_BETWEEN = "SELECT id FROM cold_orders WHERE paid_at BETWEEN ? AND ? ORDER BY paid_at, id"
+_IDS_AFTER = "SELECT id FROM cold_orders WHERE id > ? ORDER BY id LIMIT ?"
+_COUNT = "SELECT COUNT(*) FROM cold_orders"
+
+# Ограничение SQLite на число параметров в одном запросе
+_MAX_PARAMETERS = 500
+
+
+class SqliteColdOrderStore:
+    """Холодное хранилище заказов: SQLite-таблица с заказом, закодированным encode_order (marshal, без сжатия).
+
+    Версии не проверяет - этим занимается репозиторий, который им владеет.
+    Колонки клиента, статуса и времени нужны только для поиска.
+    """
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, order_id: str) -> Optional[Order]:
+        return self.get_many([order_id]).get(order_id)
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        order_ids = list(order_ids)
+        orders: Dict[str, Order] = {}
+        with self._lock:
+            for start in range(0, len(order_ids), _MAX_PARAMETERS):
+                chunk = order_ids[start:start + _MAX_PARAMETERS]
+                query = _SELECT_DATA.format(", ".join("?" * len(chunk)))
+                for data, in self._connection.execute(query, chunk):
+                    order = decode_order(data)
+                    orders[order.id] = order
+        return orders
+
+    def versions(self, order_ids: Iterable[str]) -> Dict[str, int]:
+        """Версии сохраненных заказов; отсутствующие пропускаются"""
+        order_ids = list(order_ids)
+        versions: Dict[str, int] = {}
+        with self._lock:
+            for start in range(0, len(order_ids), _MAX_PARAMETERS):
+                chunk = order_ids[start:start + _MAX_PARAMETERS]
+                query = _SELECT_VERSIONS.format(", ".join("?" * len(chunk)))
+                versions.update(self._connection.execute(query, chunk))
+        return versions
+
+    def put_many(self, orders: Iterable[Order]) -> None:
+        rows = [
+            (
+                order.id,
+                order.customer_id,
+                order.status.value,
+                _timestamp(order.created_at),
+                _timestamp(order.paid_at) if order.paid_at else None,
+                order.version,
+                *order.total_amount.as_units(),
+                order.total_amount.currency,
+                encode_order(order)
+            )
+            for order in orders
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(_UPSERT, rows)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def delete(self, order_id: str) -> None:
+        with self._lock:
+            self._connection.execute(_DELETE, (order_id,))
+
+    def ids_by_customer(self, customer_id: str) -> List[str]:
+        return self._ids(_IDS_BY_CUSTOMER, (customer_id,))
+
+    def ids_by_status(self, status: OrderStatus) -> List[str]:
+        return self._ids(_IDS_BY_STATUS, (status.value,))
+
+    def ids_created_between(self, start: datetime, end: datetime) -> List[str]:
+        return self._ids(_IDS_CREATED_BETWEEN, (_timestamp(start), _timestamp(end)))
+
+    def ids_paid_between(self, start: datetime, end: datetime) -> List[str]:
+        return self._ids(_IDS_PAID_BETWEEN, (_timestamp(start), _timestamp(end)))
+
+    def summary(self, order_id: str) -> Optional[OrderSummary]:
+        """Сводка заказа без чтения самого заказа"""
+        summaries = self._summaries("id = ?", (order_id,))
+        return summaries[0] if summaries else None
+
+    def summaries_by_customer(self, customer_id: str) -> List[OrderSummary]:
+        return self._summaries("customer_id = ?", (customer_id,))
+
+    def summaries_by_status(self, status: OrderStatus) -> List[OrderSummary]:
+        return self._summaries("status = ?", (status.value,))
+
+    def iter_ids(self, batch_size: int = 1000) -> Iterator[str]:
+        last_id = ""
+        while order_ids := self._ids(_IDS_AFTER, (last_id, batch_size)):
+            yield from order_ids
+            last_id = order_ids[-1]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(_COUNT).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _summaries(self, condition: str, parameters: tuple) -> List[OrderSummary]:
+        with self._lock:
+            rows = self._connection.execute(_SELECT_SUMMARIES.format(condition), parameters).fetchall()
+        return [
+            OrderSummary(
+                id=order_id,
+                customer_id=customer_id,
+                status=OrderStatus(status),
+                total_amount=Money.from_units(units, scale, currency),
+                created_at=datetime.fromisoformat(created_at),
+                paid_at=datetime.fromisoformat(paid_at) if paid_at else None
+            )
+            for order_id, customer_id, status, created_at, paid_at, units, scale, currency in rows
+        ]
+
+    def _ids(self, query: str, parameters: tuple) -> List[str]:
+        with self._lock:
+            return [order_id for order_id, in self._connection.execute(query, parameters)]
+
+
+def _timestamp(moment: datetime) -> str:
+    # Фиксированная точность: строки сортируются так же, как моменты времени
+    return moment.isoformat(timespec="microseconds")
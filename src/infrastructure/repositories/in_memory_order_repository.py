@@ -1,22 +1,208 @@
-from typing import Dict, Optional
+import threading
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
 from src.domain.order import Order
-from src.application.ports.order_repository import OrderRepository
+from src.domain.order_status import OrderStatus
+from src.domain.order_summary import OrderSummary
+from src.domain.order_view import OrderView
+from src.application.ports.order_repository import ConcurrentModificationError, OrderRepository, check_unique_orders
+from src.application.ports.order_change_listener import OrderChangeListener
+from src.infrastructure.repositories.order_index import OrderIndex
+from src.infrastructure.repositories.order_journal import DELETE, OrderJournal
+from src.infrastructure.repositories.striped_lock import StripedLock
 
 
 class InMemoryOrderRepository(OrderRepository):
+    """Потокобезопасный in-memory репозиторий.
 
-    def __init__(self):
+    Наружу отдаются копии заказов, сохранение проверяет версию. Заказы защищены
+    блокировками с разбиением по order_id; общая блокировка держится только на
+    время обновления индексов, журнала и подписчиков.
+    """
+
+    def __init__(self, journal: Optional[OrderJournal] = None, lock_stripes: int = 64):
         self._orders: Dict[str, Order] = {}
+        self._index = OrderIndex()
+        self._journal = journal
+        self._listeners: List[OrderChangeListener] = []
+        self._locks = StripedLock(lock_stripes)
+        self._shared_lock = threading.Lock()
+        if journal is not None:
+            for operation, payload in journal.replay():
+                if operation == DELETE:
+                    self._delete(payload)
+                else:
+                    self._store(payload)
 
     def get_by_id(self, order_id: str) -> Optional[Order]:
-        return self._orders.get(order_id)
+        order = self._orders.get(order_id)
+        return order.copy() if order is not None else None
 
     def save(self, order: Order) -> None:
-        self._orders[order.id] = order
+        with self._locks.lock(order.id):
+            stored = self._orders.get(order.id)
+            if stored is not None and stored.version != order.version:
+                raise ConcurrentModificationError(order.id)
+            saved = order.copy()
+            saved.version = order.version + 1
+            with self._shared_lock:
+                # Сначала журнал: если запись в него не удалась, память не меняется
+                if self._journal is not None:
+                    self._journal.append_save(saved)
+                self._store(saved)
+                if self._journal is not None:
+                    self._snapshot_if_needed()
+            order.version = saved.version
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        """Сохраняет пачку целиком или ничего: версии проверяются до первой записи,
+        индексы и журнал обновляются под одним захватом общей блокировки"""
+        orders = check_unique_orders(orders)
+        with self._locks.lock_many(order.id for order in orders):
+            for order in orders:
+                stored = self._orders.get(order.id)
+                if stored is not None and stored.version != order.version:
+                    raise ConcurrentModificationError(order.id)
+            saved = []
+            for order in orders:
+                copy = order.copy()
+                copy.version = order.version + 1
+                saved.append(copy)
+            with self._shared_lock:
+                if self._journal is not None:
+                    self._journal.append_saves(saved)
+                for order in saved:
+                    self._store(order)
+                if self._journal is not None:
+                    self._snapshot_if_needed()
+            for order in orders:
+                order.version += 1
 
     def delete(self, order_id: str) -> None:
-        if order_id in self._orders:
-            del self._orders[order_id]
+        with self._locks.lock(order_id), self._shared_lock:
+            if order_id not in self._orders:
+                return
+            if self._journal is not None:
+                self._journal.append_delete(order_id)
+            self._delete(order_id)
+            if self._journal is not None:
+                self._snapshot_if_needed()
+
+    def find_by_customer(self, customer_id: str) -> List[Order]:
+        with self._shared_lock:
+            order_ids = self._index.ids_by_customer(customer_id)
+        return self._resolve(order_ids)
+
+    def find_by_status(self, status: OrderStatus) -> List[Order]:
+        with self._shared_lock:
+            order_ids = self._index.ids_by_status(status)
+        return self._resolve(order_ids)
+
+    def find_created_between(self, start: datetime, end: datetime) -> List[Order]:
+        with self._shared_lock:
+            order_ids = self._index.ids_created_between(start, end)
+        return self._resolve(order_ids)
+
+    def find_paid_between(self, start: datetime, end: datetime) -> List[Order]:
+        with self._shared_lock:
+            order_ids = self._index.ids_paid_between(start, end)
+        return self._resolve(order_ids)
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        orders = self._orders
+        return {
+            order_id: order.copy()
+            for order_id in order_ids
+            if (order := orders.get(order_id)) is not None
+        }
+
+    def get_view(self, order_id: str) -> Optional[OrderView]:
+        summary = self._index.get(order_id)
+        return OrderView(summary, self.get_by_id) if summary is not None else None
+
+    def find_views_by_customer(self, customer_id: str) -> List[OrderView]:
+        with self._shared_lock:
+            return self._views(self._index.ids_by_customer(customer_id))
+
+    def find_views_by_status(self, status: OrderStatus) -> List[OrderView]:
+        with self._shared_lock:
+            return self._views(self._index.ids_by_status(status))
+
+    def iter_orders(self, batch_size: int = 1000) -> Iterator[Order]:
+        # Копируются только id; сами заказы копируются по мере перебора
+        with self._shared_lock:
+            order_ids = list(self._orders)
+        orders = self._orders
+        for order_id in order_ids:
+            order = orders.get(order_id)
+            if order is not None:
+                yield order.copy()
+
+    def iter_ids(self, batch_size: int = 1000) -> Iterator[str]:
+        with self._shared_lock:
+            order_ids = list(self._orders)
+        return iter(order_ids)
+
+    def lock(self, order_id: str) -> AbstractContextManager:
+        return self._locks.lock(order_id)
+
+    def lock_many(self, order_ids: Iterable[str]) -> AbstractContextManager:
+        return self._locks.lock_many(order_ids)
+
+    def add_listener(self, listener: OrderChangeListener) -> None:
+        """Подписывает на изменения; текущие заказы передаются подписчику как новые"""
+        with self._shared_lock:
+            for summary in self._index.summaries():
+                listener.on_order_changed(None, summary)
+            self._listeners.append(listener)
 
     def clear(self) -> None:
-        self._orders.clear()
\ No newline at end of file
+        with self._shared_lock:
+            if self._journal is not None:
+                self._journal.write_snapshot([])
+            for summary in self._index.summaries():
+                self._notify(summary, None)
+            self._orders.clear()
+            self._index.clear()
+
+    def snapshot(self) -> None:
+        """Записывает снимок всех заказов и обрезает журнал"""
+        if self._journal is not None:
+            with self._shared_lock:
+                self._journal.write_snapshot(list(self._orders.values()))
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+
+    def _store(self, order: Order) -> None:
+        self._orders[order.id] = order
+        summary = order.summary()
+        previous = self._index.put(summary)
+        if previous != summary:
+            self._notify(previous, summary)
+
+    def _delete(self, order_id: str) -> bool:
+        if order_id not in self._orders:
+            return False
+        del self._orders[order_id]
+        self._notify(self._index.remove(order_id), None)
+        return True
+
+    def _notify(self, before: Optional[OrderSummary], after: Optional[OrderSummary]) -> None:
+        for listener in self._listeners:
+            listener.on_order_changed(before, after)
+
+    def _snapshot_if_needed(self) -> None:
+        # Под общей блокировкой только копируется список заказов, снимок пишется в фоне
+        if self._journal.needs_snapshot:
+            self._journal.start_snapshot(list(self._orders.values()))
+
+    def _views(self, order_ids: List[str]) -> List[OrderView]:
+        index = self._index
+        return [OrderView(summary, self.get_by_id) for order_id in order_ids if (summary := index.get(order_id)) is not None]
+
+    def _resolve(self, order_ids: List[str]) -> List[Order]:
+        orders = self._orders
+        return [order.copy() for order_id in order_ids if (order := orders.get(order_id)) is not None]
@@ -0,0 +1,47 @@
+import marshal
+from datetime import datetime
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_line import OrderLine
+from src.domain.order_lines import OrderLines
+from src.domain.columnar_order_lines import ColumnarOrderLines
+from src.domain.order_status import OrderStatus
+
+
+def encode_order(order: Order) -> bytes:
+    """Компактное бинарное представление заказа (marshal кортежа примитивов)"""
+    return marshal.dumps((
+        order.id,
+        order.customer_id,
+        order.status.value,
+        order.created_at.isoformat(),
+        order.paid_at.isoformat() if order.paid_at else None,
+        isinstance(order.lines, ColumnarOrderLines),
+        [
+            (line.product_id, line.product_name, line.quantity) + line.price.as_units() + (line.price.currency,)
+            for line in order.lines
+        ],
+        order.version
+    ))
+
+
+def decode_order(data: bytes) -> Order:
+    order_id, customer_id, status, created_at, paid_at, columnar, rows, version = marshal.loads(data)
+    lines = (
+        OrderLine(
+            product_id=product_id,
+            product_name=product_name,
+            quantity=quantity,
+            price=Money.from_units(units, scale, currency)
+        )
+        for product_id, product_name, quantity, units, scale, currency in rows
+    )
+    return Order(
+        id=order_id,
+        customer_id=customer_id,
+        lines=ColumnarOrderLines(lines) if columnar else OrderLines(lines),
+        status=OrderStatus(status),
+        created_at=datetime.fromisoformat(created_at),
+        paid_at=datetime.fromisoformat(paid_at) if paid_at else None,
+        version=version
+    )
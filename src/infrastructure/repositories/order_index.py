@@ -0,0 +1,168 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Hashable, List, Optional, Tuple
+from src.domain.order_status import OrderStatus
+from src.domain.order_summary import OrderSummary
+
+_timestamp = itemgetter(0)
+# Блок упорядоченного индекса делится пополам, когда превышает 2 * _LOAD записей
+_LOAD = 512
+
+Entry = Tuple[datetime, str]
+
+
+class OrderIndex:
+    """Вторичные индексы заказов: по клиенту, статусу и времени создания/оплаты.
+
+    Индекс хранит снимок каждого заказа на момент сохранения, поэтому при
+    повторном сохранении старые ключи удаляются, даже если сам объект заказа
+    уже изменен вызывающим кодом. Обновляются только изменившиеся ключи: смена
+    статуса не трогает индекс по времени создания.
+    """
+
+    def __init__(self):
+        self._summaries: Dict[str, OrderSummary] = {}
+        self._by_customer: Dict[str, Dict[str, None]] = {}
+        self._by_status: Dict[OrderStatus, Dict[str, None]] = {}
+        self._created = _TimeIndex()
+        self._paid = _TimeIndex()
+
+    def get(self, order_id: str) -> Optional[OrderSummary]:
+        return self._summaries.get(order_id)
+
+    def summaries(self) -> List[OrderSummary]:
+        return list(self._summaries.values())
+
+    def put(self, summary: OrderSummary) -> Optional[OrderSummary]:
+        """Индексирует снимок заказа и возвращает предыдущий"""
+        previous = self._summaries.get(summary.id)
+        if previous == summary:
+            return previous
+        self._summaries[summary.id] = summary
+        customer_id, status, created_at, paid_at = (
+            (previous.customer_id, previous.status, previous.created_at, previous.paid_at)
+            if previous is not None else (None, None, None, None)
+        )
+        _move(self._by_customer, customer_id, summary.customer_id, summary.id)
+        _move(self._by_status, status, summary.status, summary.id)
+        self._created.move(created_at, summary.created_at, summary.id)
+        self._paid.move(paid_at, summary.paid_at, summary.id)
+        return previous
+
+    def remove(self, order_id: str) -> Optional[OrderSummary]:
+        previous = self._summaries.pop(order_id, None)
+        if previous is not None:
+            self._unlink(previous)
+        return previous
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def ids_by_customer(self, customer_id: str) -> List[str]:
+        return list(self._by_customer.get(customer_id, ()))
+
+    def ids_by_status(self, status: OrderStatus) -> List[str]:
+        return list(self._by_status.get(status, ()))
+
+    def ids_created_between(self, start: datetime, end: datetime) -> List[str]:
+        return self._created.between(start, end)
+
+    def ids_paid_between(self, start: datetime, end: datetime) -> List[str]:
+        return self._paid.between(start, end)
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def _unlink(self, summary: OrderSummary) -> None:
+        _discard(self._by_customer, summary.customer_id, summary.id)
+        _discard(self._by_status, summary.status, summary.id)
+        self._created.move(summary.created_at, None, summary.id)
+        self._paid.move(summary.paid_at, None, summary.id)
+
+
+class _TimeIndex:
+    """Пары (время, id) по возрастанию, разбитые на блоки не длиннее 2 * _LOAD.
+
+    В одном списке вставка и удаление в середине стоят O(n); здесь - бинарный
+    поиск блока и сдвиг внутри него, O(log n + _LOAD).
+    """
+
+    __slots__ = ("_blocks", "_maxes")
+
+    def __init__(self):
+        self._blocks: List[List[Entry]] = []
+        self._maxes: List[Entry] = []
+
+    def move(self, before: Optional[datetime], after: Optional[datetime], order_id: str) -> None:
+        if before == after:
+            return
+        if before is not None:
+            self._discard((before, order_id))
+        if after is not None:
+            self._add((after, order_id))
+
+    def between(self, start: datetime, end: datetime) -> List[str]:
+        """Заказы с меткой времени в интервале [start, end]"""
+        found = []
+        number = bisect_left(self._maxes, start, key=_timestamp)
+        for block in islice(self._blocks, number, None):
+            if block[0][0] > end:
+                break
+            low = bisect_left(block, start, key=_timestamp)
+            high = bisect_right(block, end, key=_timestamp)
+            found.extend(order_id for _, order_id in block[low:high])
+            if high < len(block):
+                break
+        return found
+
+    def _add(self, entry: Entry) -> None:
+        if not self._blocks:
+            self._blocks.append([entry])
+            self._maxes.append(entry)
+            return
+        number = bisect_left(self._maxes, entry)
+        if number == len(self._maxes):
+            # Самая поздняя метка - обычный случай для новых заказов и оплат
+            number -= 1
+            self._blocks[number].append(entry)
+            self._maxes[number] = entry
+        else:
+            insort(self._blocks[number], entry)
+        block = self._blocks[number]
+        if len(block) > 2 * _LOAD:
+            self._blocks.insert(number + 1, block[_LOAD:])
+            del block[_LOAD:]
+            self._maxes.insert(number, block[-1])
+
+    def _discard(self, entry: Entry) -> None:
+        number = bisect_left(self._maxes, entry)
+        if number == len(self._maxes):
+            return
+        block = self._blocks[number]
+        position = bisect_left(block, entry)
+        if position == len(block) or block[position] != entry:
+            return
+        del block[position]
+        if not block:
+            del self._blocks[number]
+            del self._maxes[number]
+        elif position == len(block):
+            self._maxes[number] = block[-1]
+
+
+def _discard(index: Dict, key, order_id: str) -> None:
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(order_id, None)
+        if not bucket:
+            del index[key]
+
+
+def _move(index: Dict, before: Optional[Hashable], after: Hashable, order_id: str) -> None:
+    if before == after:
+        return
+    if before is not None:
+        _discard(index, before, order_id)
+    index.setdefault(after, {})[order_id] = None
@@ -0,0 +1,247 @@
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+from src.domain.order import Order
+from src.infrastructure.repositories.order_codec import decode_order, encode_order
+
+SAVE = 1
+DELETE = 2
+
+_SNAPSHOT_MAGIC = b"ORDSNAP2"
+_JOURNAL_MAGIC = b"ORDLOG02"
+# Операция, длина и CRC32 операции, длины и данных
+_HEADER = struct.Struct("<BII")
+_PREFIX = struct.Struct("<BI")
+
+
+class OrderJournal:
+    """Журнал изменений заказов со снимками.
+
+    Каждое сохранение и удаление дописывается в journal.log кадром с CRC32.
+    Когда накопилось snapshot_every записей, журнал запечатывается (переименовывается
+    в journal.log.N), новые записи идут в свежий journal.log, а снимок snapshot.bin
+    пишется в фоновом потоке; после записи снимка запечатанные сегменты удаляются.
+    При запуске читается снимок (через mmap), запечатанные сегменты и хвост журнала;
+    чтение останавливается на первом поврежденном кадре, всё после него отбрасывается.
+    """
+
+    def __init__(self, directory: str, snapshot_every: int = 100_000, sync: bool = False):
+        if snapshot_every <= 0:
+            raise ValueError("Интервал снимков должен быть положительным")
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.sync = sync
+        self.records_since_snapshot = 0
+        self._snapshot_path = os.path.join(directory, "snapshot.bin")
+        self._journal_path = os.path.join(directory, "journal.log")
+        self._journal: Optional[BinaryIO] = None
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_error: Optional[BaseException] = None
+
+    @property
+    def needs_snapshot(self) -> bool:
+        return self.records_since_snapshot >= self.snapshot_every and not self.snapshot_in_progress
+
+    @property
+    def snapshot_in_progress(self) -> bool:
+        return self._snapshot_thread is not None and self._snapshot_thread.is_alive()
+
+    def replay(self) -> Iterator[Tuple[int, Union[Order, str]]]:
+        """Восстанавливает состояние: сначала записи снимка, затем сегменты журнала"""
+        valid_length = len(_SNAPSHOT_MAGIC)
+        for operation, payload, valid_length in self._read_frames(self._snapshot_path, _SNAPSHOT_MAGIC):
+            yield operation, payload
+        if os.path.exists(self._snapshot_path) and valid_length < os.path.getsize(self._snapshot_path):
+            raise ValueError(f"Снимок {self._snapshot_path} поврежден")
+
+        segments = [*self._sealed_paths(), self._journal_path]
+        for number, path in enumerate(segments):
+            valid_length = len(_JOURNAL_MAGIC)
+            for operation, payload, valid_length in self._read_frames(path, _JOURNAL_MAGIC):
+                self.records_since_snapshot += 1
+                yield operation, payload
+            if os.path.exists(path) and valid_length < os.path.getsize(path):
+                # Недописанный или поврежденный кадр: записи после него нельзя применять поверх пропуска
+                with open(path, "r+b") as file:
+                    file.truncate(valid_length)
+                self._remove(segments[number + 1:])
+                break
+        self._open_journal(None)
+
+    def append_save(self, order: Order) -> None:
+        self._append([_frame(SAVE, encode_order(order))])
+
+    def append_saves(self, orders: List[Order]) -> None:
+        """Дописывает сохранения пачки одной записью в файл"""
+        self._append([_frame(SAVE, encode_order(order)) for order in orders])
+
+    def append_delete(self, order_id: str) -> None:
+        self._append([_frame(DELETE, order_id.encode("utf-8"))])
+
+    def start_snapshot(self, orders: List[Order]) -> None:
+        """Запечатывает журнал и пишет снимок orders в фоне.
+
+        Вызывающий держит блокировку записи, пока журнал запечатывается; сами заказы
+        после сохранения не изменяются, поэтому поток кодирует их без блокировки.
+        """
+        if self.snapshot_in_progress:
+            return
+        sealed = self._seal()
+        self._open_journal(None)
+        self.records_since_snapshot = 0
+        thread = threading.Thread(
+            target=self._snapshot_in_background, args=(orders, sealed), name="order-journal-snapshot", daemon=True
+        )
+        self._snapshot_thread = thread
+        thread.start()
+
+    def write_snapshot(self, orders: Iterable[Order]) -> None:
+        """Пишет снимок сразу и очищает журнал; ошибку прошлого фонового снимка он заменяет"""
+        self._join_snapshot()
+        self._snapshot_error = None
+        self._write_snapshot_file(orders)
+        # Если процесс упадет до очистки журнала, его повторное применение безопасно:
+        # сохранение и удаление идемпотентны
+        self._remove(self._sealed_paths())
+        self._open_journal(0)
+        self.records_since_snapshot = 0
+
+    def wait_for_snapshot(self) -> None:
+        """Дожидается фонового снимка; ошибку его записи пробрасывает"""
+        self._join_snapshot()
+        error, self._snapshot_error = self._snapshot_error, None
+        if error is not None:
+            raise ValueError(f"Не удалось записать снимок заказов: {error}") from error
+
+    def close(self) -> None:
+        try:
+            self.wait_for_snapshot()
+        finally:
+            self._close_journal()
+
+    def _append(self, frames: List[bytes]) -> None:
+        """Дописывает кадры; при ошибке ввода-вывода журнал обрезается до прежней длины,
+        чтобы в нем не осталось записей, которых нет в памяти"""
+        if self._journal is None:
+            self._open_journal(None)
+        journal = self._journal
+        position = journal.tell()
+        try:
+            journal.write(b"".join(frames))
+            journal.flush()
+            if self.sync:
+                os.fsync(journal.fileno())
+        except BaseException:
+            try:
+                self._open_journal(position)
+            except OSError:
+                # Журнал переоткроется при следующей записи
+                self._journal = None
+            raise
+        self.records_since_snapshot += len(frames)
+
+    def _snapshot_in_background(self, orders: List[Order], sealed: List[str]) -> None:
+        try:
+            self._write_snapshot_file(orders)
+            self._remove(sealed)
+        except BaseException as error:
+            # Запечатанные сегменты остаются на диске и будут удалены следующим снимком
+            self._snapshot_error = error
+
+    def _write_snapshot_file(self, orders: Iterable[Order]) -> None:
+        temporary_path = self._snapshot_path + ".tmp"
+        with open(temporary_path, "wb") as snapshot:
+            snapshot.write(_SNAPSHOT_MAGIC)
+            for order in orders:
+                snapshot.write(_frame(SAVE, encode_order(order)))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary_path, self._snapshot_path)
+
+    def _join_snapshot(self) -> None:
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+            self._snapshot_thread = None
+
+    def _seal(self) -> List[str]:
+        """Переименовывает текущий журнал в очередной сегмент; возвращает все запечатанные"""
+        self._close_journal()
+        sealed = self._sealed_paths()
+        if os.path.exists(self._journal_path):
+            number = int(sealed[-1].rsplit(".", 1)[1]) + 1 if sealed else 1
+            path = f"{self._journal_path}.{number}"
+            os.replace(self._journal_path, path)
+            sealed.append(path)
+        return sealed
+
+    def _sealed_paths(self) -> List[str]:
+        directory, name = os.path.split(self._journal_path)
+        numbers = [
+            int(suffix) for entry in os.listdir(directory)
+            if entry.startswith(name + ".") and (suffix := entry[len(name) + 1:]).isdigit()
+        ]
+        return [f"{self._journal_path}.{number}" for number in sorted(numbers)]
+
+    @staticmethod
+    def _remove(paths: List[str]) -> None:
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _close_journal(self) -> None:
+        journal, self._journal = self._journal, None
+        if journal is not None:
+            journal.close()
+
+    def _open_journal(self, valid_length: Optional[int]) -> None:
+        """Открывает журнал на дозапись с длины valid_length (None - с конца файла)"""
+        self._close_journal()
+        exists = os.path.exists(self._journal_path)
+        if valid_length is None:
+            valid_length = os.path.getsize(self._journal_path) if exists else 0
+        if not exists or valid_length < len(_JOURNAL_MAGIC):
+            journal = open(self._journal_path, "wb")
+            journal.write(_JOURNAL_MAGIC)
+        else:
+            journal = open(self._journal_path, "r+b")
+            journal.truncate(valid_length)
+            journal.seek(valid_length)
+        journal.flush()
+        self._journal = journal
+
+    @staticmethod
+    def _read_frames(path: str, magic: bytes) -> Iterator[Tuple[int, Union[Order, str], int]]:
+        """Кадры файла с концом каждого; чтение останавливается на первом поврежденном кадре"""
+        if not os.path.exists(path) or os.path.getsize(path) <= len(magic):
+            return
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(magic)] != magic:
+                raise ValueError(f"Файл {path} не является журналом заказов")
+            position = len(magic)
+            size = len(data)
+            while position + _HEADER.size <= size:
+                operation, length, checksum = _HEADER.unpack_from(data, position)
+                start = position + _HEADER.size
+                end = start + length
+                if end > size or operation not in (SAVE, DELETE):
+                    break
+                payload = data[start:end]
+                if _checksum(operation, payload) != checksum:
+                    break
+                if operation == SAVE:
+                    yield operation, decode_order(payload), end
+                else:
+                    yield operation, payload.decode("utf-8"), end
+                position = end
+
+
+def _frame(operation: int, payload: bytes) -> bytes:
+    return _HEADER.pack(operation, len(payload), _checksum(operation, payload)) + payload
+
+
+def _checksum(operation: int, payload: bytes) -> int:
+    return zlib.crc32(payload, zlib.crc32(_PREFIX.pack(operation, len(payload))))
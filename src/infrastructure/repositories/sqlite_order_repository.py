@@ -0,0 +1,335 @@
+import queue
+import sqlite3
+from contextlib import AbstractContextManager, contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_line import OrderLine
+from src.domain.order_lines import OrderLines
+from src.domain.order_status import OrderStatus
+from src.domain.order_summary import OrderSummary
+from src.domain.order_view import OrderView
+from src.application.ports.order_repository import ConcurrentModificationError, OrderRepository, check_unique_orders
+from src.infrastructure.repositories.striped_lock import StripedLock
+
+_CREATE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        id TEXT PRIMARY KEY,
+        customer_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        paid_at TEXT,
+        version INTEGER NOT NULL,
+        total_units INTEGER NOT NULL,
+        total_scale INTEGER NOT NULL,
+        total_currency TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS order_lines (
+        order_id TEXT NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        product_id TEXT NOT NULL,
+        product_name TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        price_units INTEGER NOT NULL,
+        price_scale INTEGER NOT NULL,
+        currency TEXT NOT NULL,
+        PRIMARY KEY (order_id, position)
+    ) WITHOUT ROWID
+    """,
+)
+_CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS orders_customer ON orders(customer_id)",
+    "CREATE INDEX IF NOT EXISTS orders_status ON orders(status)",
+    "CREATE INDEX IF NOT EXISTS orders_created_at ON orders(created_at)",
+    "CREATE INDEX IF NOT EXISTS orders_paid_at ON orders(paid_at) WHERE paid_at IS NOT NULL",
+)
+
+_UPSERT_ORDER = """
+INSERT INTO orders (id, customer_id, status, created_at, paid_at, version, total_units, total_scale, total_currency)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    customer_id = excluded.customer_id,
+    status = excluded.status,
+    created_at = excluded.created_at,
+    paid_at = excluded.paid_at,
+    version = excluded.version,
+    total_units = excluded.total_units,
+    total_scale = excluded.total_scale,
+    total_currency = excluded.total_currency
+"""
+_SELECT_VERSIONS = "SELECT id, version FROM orders WHERE id IN ({})"
+_DELETE_LINES = "DELETE FROM order_lines WHERE order_id = ?"
+_INSERT_LINE = """
+INSERT INTO order_lines (order_id, position, product_id, product_name, quantity, price_units, price_scale, currency)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_DELETE_ORDER = "DELETE FROM orders WHERE id = ?"
+_FIND_BY_CUSTOMER = "SELECT id FROM orders WHERE customer_id = ?"
+_FIND_BY_STATUS = "SELECT id FROM orders WHERE status = ?"
+_FIND_CREATED_BETWEEN = "SELECT id FROM orders WHERE created_at BETWEEN ? AND ? ORDER BY created_at, id"
+_FIND_PAID_BETWEEN = "SELECT id FROM orders WHERE paid_at BETWEEN ? AND ? ORDER BY paid_at, id"
+_SELECT_SUMMARIES = """
+SELECT id, customer_id, status, created_at, paid_at, total_units, total_scale, total_currency FROM orders WHERE {}
+"""
+_SELECT_IDS_AFTER = "SELECT id FROM orders WHERE id > ? ORDER BY id LIMIT ?"
+_SELECT_ORDERS = "SELECT id, customer_id, status, created_at, paid_at, version FROM orders WHERE id IN ({})"
+_SELECT_LINES = """
+SELECT order_id, product_id, product_name, quantity, price_units, price_scale, currency
+FROM order_lines WHERE order_id IN ({}) ORDER BY order_id, position
+"""
+
+# Ограничение SQLite на число параметров в одном запросе
+_MAX_PARAMETERS = 500
+# Версия схемы в PRAGMA user_version
+_SCHEMA_VERSION = 1
+
+
+class SqliteOrderRepository(OrderRepository):
+    """Репозиторий заказов поверх SQLite в режиме WAL"""
+
+    def __init__(self, path: str, pool_size: int = 4, batch_size: int = 1000):
+        if pool_size <= 0:
+            raise ValueError("Размер пула должен быть положительным")
+        if batch_size <= 0:
+            raise ValueError("Размер пачки должен быть положительным")
+        self._path = path
+        self._batch_size = batch_size
+        self._locks = StripedLock()
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._connections: List[sqlite3.Connection] = []
+        for _ in range(pool_size):
+            connection = self._connect()
+            self._connections.append(connection)
+            self._pool.put(connection)
+        try:
+            self._create_schema()
+        except BaseException:
+            self.close()
+            raise
+
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        return self.get_many([order_id]).get(order_id)
+
+    def save(self, order: Order) -> None:
+        self.save_many([order])
+
+    def delete(self, order_id: str) -> None:
+        with self._transaction() as connection:
+            connection.execute(_DELETE_ORDER, (order_id,))
+
+    def find_by_customer(self, customer_id: str) -> List[Order]:
+        return self._find(_FIND_BY_CUSTOMER, (customer_id,))
+
+    def find_by_status(self, status: OrderStatus) -> List[Order]:
+        return self._find(_FIND_BY_STATUS, (status.value,))
+
+    def find_created_between(self, start: datetime, end: datetime) -> List[Order]:
+        return self._find(_FIND_CREATED_BETWEEN, (_timestamp(start), _timestamp(end)))
+
+    def find_paid_between(self, start: datetime, end: datetime) -> List[Order]:
+        return self._find(_FIND_PAID_BETWEEN, (_timestamp(start), _timestamp(end)))
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        orders: Dict[str, Order] = {}
+        # Соединения работают в autocommit: без общей транзакции строки orders и
+        # order_lines могли бы прочитаться из разных версий базы
+        with self._transaction("BEGIN") as connection:
+            for chunk in _chunks(order_ids, _MAX_PARAMETERS):
+                orders.update(self._read(connection, chunk))
+        return orders
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        """Сохраняет пачками по batch_size в одной транзакции; конфликт версии откатывает пачку"""
+        for batch in _chunks(check_unique_orders(orders), self._batch_size):
+            with self._transaction() as connection:
+                self._write(connection, batch)
+            for order in batch:
+                order.version += 1
+
+    def get_view(self, order_id: str) -> Optional[OrderView]:
+        views = self._find_views("id = ?", (order_id,))
+        return views[0] if views else None
+
+    def find_views_by_customer(self, customer_id: str) -> List[OrderView]:
+        return self._find_views("customer_id = ?", (customer_id,))
+
+    def find_views_by_status(self, status: OrderStatus) -> List[OrderView]:
+        return self._find_views("status = ?", (status.value,))
+
+    def iter_orders(self, batch_size: int = 1000) -> Iterator[Order]:
+        """Перебирает заказы по возрастанию id, читая по batch_size за запрос"""
+        for order_ids in _chunks(self.iter_ids(batch_size), batch_size):
+            orders = self.get_many(order_ids)
+            for order_id in order_ids:
+                if order_id in orders:
+                    yield orders[order_id]
+
+    def iter_ids(self, batch_size: int = 1000) -> Iterator[str]:
+        last_id = ""
+        while True:
+            with self._connection() as connection:
+                order_ids = [order_id for order_id, in connection.execute(_SELECT_IDS_AFTER, (last_id, batch_size))]
+            if not order_ids:
+                return
+            yield from order_ids
+            last_id = order_ids[-1]
+
+    def lock(self, order_id: str) -> AbstractContextManager:
+        return self._locks.lock(order_id)
+
+    def lock_many(self, order_ids: Iterable[str]) -> AbstractContextManager:
+        return self._locks.lock_many(order_ids)
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.close()
+        self._connections.clear()
+
+    def _find(self, query: str, parameters: tuple) -> List[Order]:
+        with self._connection() as connection:
+            order_ids = [order_id for order_id, in connection.execute(query, parameters)]
+        orders = self.get_many(order_ids)
+        return [orders[order_id] for order_id in order_ids if order_id in orders]
+
+    def _find_views(self, condition: str, parameters: tuple) -> List[OrderView]:
+        """Представления из строк orders по сохраненной сумме, без чтения order_lines"""
+        with self._connection() as connection:
+            rows = connection.execute(_SELECT_SUMMARIES.format(condition), parameters).fetchall()
+        return [
+            OrderView(
+                OrderSummary(
+                    id=order_id,
+                    customer_id=customer_id,
+                    status=OrderStatus(status),
+                    total_amount=Money.from_units(units, scale, currency),
+                    created_at=datetime.fromisoformat(created_at),
+                    paid_at=datetime.fromisoformat(paid_at) if paid_at else None
+                ),
+                self.get_by_id
+            )
+            for order_id, customer_id, status, created_at, paid_at, units, scale, currency in rows
+        ]
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self._path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    def _create_schema(self) -> None:
+        """Создает таблицы и индексы, если их еще нет, и проверяет версию схемы"""
+        with self._transaction() as connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version > _SCHEMA_VERSION:
+                raise ValueError(f"Версия схемы базы {version} новее поддерживаемой {_SCHEMA_VERSION}")
+            for statement in _CREATE_TABLES + _CREATE_INDEXES:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    @contextmanager
+    def _transaction(self, begin: str = "BEGIN IMMEDIATE") -> Iterator[sqlite3.Connection]:
+        """Транзакция на соединении из пула; отложенный BEGIN дает чтениям один снимок WAL"""
+        with self._connection() as connection:
+            connection.execute(begin)
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    @staticmethod
+    def _write(connection: sqlite3.Connection, orders: List[Order]) -> None:
+        # BEGIN IMMEDIATE уже держит блокировку записи: между проверкой версий
+        # и записью никто другой изменить заказы не может
+        versions = {}
+        for chunk in _chunks((order.id for order in orders), _MAX_PARAMETERS):
+            placeholders = ", ".join("?" * len(chunk))
+            versions.update(connection.execute(_SELECT_VERSIONS.format(placeholders), chunk))
+        for order in orders:
+            if order.id in versions and versions[order.id] != order.version:
+                raise ConcurrentModificationError(order.id)
+
+        connection.executemany(_UPSERT_ORDER, (
+            (
+                order.id,
+                order.customer_id,
+                order.status.value,
+                _timestamp(order.created_at),
+                _timestamp(order.paid_at) if order.paid_at else None,
+                order.version + 1
+            )
+            + order.total_amount.as_units()
+            + (order.total_amount.currency,)
+            for order in orders
+        ))
+        connection.executemany(_DELETE_LINES, ((order.id,) for order in orders))
+        connection.executemany(_INSERT_LINE, (
+            (order.id, position, line.product_id, line.product_name, line.quantity)
+            + line.price.as_units()
+            + (line.price.currency,)
+            for order in orders
+            for position, line in enumerate(order.lines)
+        ))
+
+    @staticmethod
+    def _read(connection: sqlite3.Connection, order_ids: List[str]) -> Dict[str, Order]:
+        placeholders = ", ".join("?" * len(order_ids))
+        rows = connection.execute(_SELECT_ORDERS.format(placeholders), order_ids).fetchall()
+        if not rows:
+            return {}
+
+        lines: Dict[str, List[OrderLine]] = {}
+        for order_id, product_id, product_name, quantity, units, scale, currency in connection.execute(
+            _SELECT_LINES.format(placeholders), order_ids
+        ):
+            lines.setdefault(order_id, []).append(OrderLine(
+                product_id=product_id,
+                product_name=product_name,
+                quantity=quantity,
+                price=Money.from_units(units, scale, currency)
+            ))
+
+        return {
+            order_id: Order(
+                id=order_id,
+                customer_id=customer_id,
+                lines=OrderLines(lines.get(order_id, ())),
+                status=OrderStatus(status),
+                created_at=datetime.fromisoformat(created_at),
+                paid_at=datetime.fromisoformat(paid_at) if paid_at else None,
+                version=version
+            )
+            for order_id, customer_id, status, created_at, paid_at, version in rows
+        }
+
+
+def _timestamp(moment: datetime) -> str:
+    # Фиксированная точность: строки сортируются так же, как моменты времени
+    return moment.isoformat(timespec="microseconds")
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
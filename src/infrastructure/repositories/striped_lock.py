@@ -0,0 +1,28 @@
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Iterable, Iterator
+
+
+class StripedLock:
+    """Набор блокировок, между которыми распределяются ключи по хешу.
+
+    Потоки, работающие с разными заказами, почти никогда не ждут друг друга,
+    а число объектов блокировок не растет вместе с числом заказов.
+    """
+
+    def __init__(self, stripes: int = 64):
+        if stripes <= 0:
+            raise ValueError("Число блокировок должно быть положительным")
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def lock(self, key: str) -> threading.RLock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def lock_many(self, keys: Iterable[str]) -> Iterator[None]:
+        # Захват в порядке номеров исключает взаимную блокировку двух пачек
+        stripes = sorted({hash(key) % len(self._locks) for key in keys})
+        with ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self._locks[stripe])
+            yield
@@ -0,0 +1,337 @@
+import heapq
+import threading
+from collections import OrderedDict
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.domain.order_summary import OrderSummary
+from src.domain.order_view import OrderView
+from src.application.ports.order_repository import ConcurrentModificationError, OrderRepository, check_unique_orders
+from src.infrastructure.repositories.cold_order_store import SqliteColdOrderStore
+from src.infrastructure.repositories.order_index import OrderIndex
+from src.infrastructure.repositories.striped_lock import StripedLock
+
+
+@dataclass(frozen=True)
+class TierStats:
+    """Статистика горячего уровня"""
+    hits: int
+    misses: int
+    evictions: int
+    demotions: int
+    promotions: int
+    hot_size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TieredOrderRepository(OrderRepository):
+    """Двухуровневый репозиторий: горячий LRU в памяти и холодное хранилище на диске.
+
+    В памяти держатся только недавно использованные заказы в статусе CREATED,
+    не больше hot_capacity; оплаченные и отмененные заказы при сохранении
+    уходят из памяти. get_by_id при промахе читает холодное хранилище и
+    поднимает CREATED-заказ в память.
+
+    По умолчанию (write_through=True) каждое сохранение сразу пишется в
+    холодное хранилище, и репозиторий переживает падение процесса так же,
+    как SqliteOrderRepository; горячий уровень ускоряет только чтение. С
+    write_through=False измененные CREATED-заказы пишутся на диск только при
+    вытеснении, flush() или close() - это быстрее, но при падении процесса
+    такие изменения теряются.
+
+    Заказ, который есть в памяти, важнее своей копии на диске. Проверка
+    версии, запись в холодное хранилище и подъем заказа идут под блокировкой
+    этого заказа; общая блокировка берется только на изменение памяти и
+    индекса, поэтому чтения из памяти не ждут транзакций SQLite. Пока заказ
+    сохраняется, вытеснение его пропускает и не может записать на диск его
+    старую версию поверх новой.
+    """
+
+    def __init__(
+        self,
+        cold: SqliteColdOrderStore,
+        hot_capacity: int = 100_000,
+        lock_stripes: int = 64,
+        write_through: bool = True
+    ):
+        if hot_capacity <= 0:
+            raise ValueError("Размер горячего уровня должен быть положительным")
+        self._cold = cold
+        self.hot_capacity = hot_capacity
+        self.write_through = write_through
+        self._hot: "OrderedDict[str, Order]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        # Заказы, которые сейчас пишутся в холодное хранилище: вытеснение их не трогает
+        self._saving: Set[str] = set()
+        self._index = OrderIndex()
+        self._locks = StripedLock(lock_stripes)
+        self._shared_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._demotions = 0
+        self._promotions = 0
+
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        with self._shared_lock:
+            order = self._hot.get(order_id)
+            if order is not None:
+                self._hot.move_to_end(order_id)
+                self._hits += 1
+                return order.copy()
+            self._misses += 1
+        with self._locks.lock(order_id):
+            order = self._cold.get(order_id)
+            if order is not None:
+                self._promote([order])
+        return order
+
+    def save(self, order: Order) -> None:
+        self.save_many([order])
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        orders = check_unique_orders(orders)
+        with self._locks.lock_many(order.id for order in orders):
+            versions = self._versions([order.id for order in orders])
+            for order in orders:
+                current = versions.get(order.id)
+                if current is not None and current != order.version:
+                    raise ConcurrentModificationError(order.id)
+            saved = []
+            for order in orders:
+                copy = order.copy()
+                copy.version = order.version + 1
+                saved.append(copy)
+
+            write_through = self.write_through
+            finished = [order for order in saved if order.status != OrderStatus.CREATED]
+            order_ids = [order.id for order in saved]
+            with self._shared_lock:
+                self._saving.update(order_ids)
+            try:
+                # Одна транзакция на пачку вне общей блокировки: в режиме write_through на диск идут все заказы
+                self._cold.put_many(saved if write_through else finished)
+            except BaseException:
+                with self._shared_lock:
+                    self._saving.difference_update(order_ids)
+                raise
+            with self._shared_lock:
+                self._saving.difference_update(order_ids)
+                for order in finished:
+                    if self._remove_hot(order.id):
+                        self._demotions += 1
+                for order in saved:
+                    if order.status == OrderStatus.CREATED:
+                        self._put_hot(order, dirty=not write_through)
+                self._evict_if_needed()
+
+            for order in orders:
+                order.version += 1
+
+    def delete(self, order_id: str) -> None:
+        with self._locks.lock(order_id):
+            with self._shared_lock:
+                self._remove_hot(order_id)
+            # Подъем с диска ждет блокировки заказа, поэтому удаленный заказ не вернется в память
+            self._cold.delete(order_id)
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        order_ids = list(order_ids)
+        found: Dict[str, Order] = {}
+        missing = []
+        with self._shared_lock:
+            for order_id in order_ids:
+                order = self._hot.get(order_id)
+                if order is not None:
+                    self._hot.move_to_end(order_id)
+                    found[order_id] = order.copy()
+                else:
+                    missing.append(order_id)
+            self._hits += len(found)
+            self._misses += len(missing)
+        if missing:
+            with self._locks.lock_many(missing):
+                loaded = self._cold.get_many(missing)
+                self._promote(loaded.values())
+            found.update(loaded)
+        return {order_id: found[order_id] for order_id in order_ids if order_id in found}
+
+    def find_by_customer(self, customer_id: str) -> List[Order]:
+        return self._find(
+            lambda: self._index.ids_by_customer(customer_id),
+            lambda: self._cold.ids_by_customer(customer_id)
+        )
+
+    def find_by_status(self, status: OrderStatus) -> List[Order]:
+        return self._find(lambda: self._index.ids_by_status(status), lambda: self._cold.ids_by_status(status))
+
+    def find_created_between(self, start: datetime, end: datetime) -> List[Order]:
+        orders = self._find(
+            lambda: self._index.ids_created_between(start, end),
+            lambda: self._cold.ids_created_between(start, end),
+            merge=True
+        )
+        return list(heapq.merge(*orders, key=lambda order: order.created_at))
+
+    def find_paid_between(self, start: datetime, end: datetime) -> List[Order]:
+        orders = self._find(
+            lambda: self._index.ids_paid_between(start, end),
+            lambda: self._cold.ids_paid_between(start, end),
+            merge=True
+        )
+        return list(heapq.merge(*orders, key=lambda order: order.paid_at))
+
+    def get_view(self, order_id: str) -> Optional[OrderView]:
+        summary = self._index.get(order_id)
+        if summary is None:
+            summary = self._cold.summary(order_id)
+        return OrderView(summary, self.get_by_id) if summary is not None else None
+
+    def find_views_by_customer(self, customer_id: str) -> List[OrderView]:
+        return self._find_views(
+            lambda: self._index.ids_by_customer(customer_id),
+            lambda: self._cold.summaries_by_customer(customer_id)
+        )
+
+    def find_views_by_status(self, status: OrderStatus) -> List[OrderView]:
+        return self._find_views(lambda: self._index.ids_by_status(status), lambda: self._cold.summaries_by_status(status))
+
+    def iter_orders(self, batch_size: int = 1000) -> Iterator[Order]:
+        with self._shared_lock:
+            hot = [order.copy() for order in self._hot.values()]
+        yield from hot
+        hot_ids = {order.id for order in hot}
+        batch = []
+        for order_id in self._cold.iter_ids(batch_size):
+            if order_id not in hot_ids:
+                batch.append(order_id)
+            if len(batch) >= batch_size:
+                yield from self._cold_orders(batch)
+                batch = []
+        yield from self._cold_orders(batch)
+
+    def iter_ids(self, batch_size: int = 1000) -> Iterator[str]:
+        with self._shared_lock:
+            hot_ids = list(self._hot)
+        yield from hot_ids
+        hot = set(hot_ids)
+        for order_id in self._cold.iter_ids(batch_size):
+            if order_id not in hot:
+                yield order_id
+
+    def lock(self, order_id: str) -> AbstractContextManager:
+        return self._locks.lock(order_id)
+
+    def lock_many(self, order_ids: Iterable[str]) -> AbstractContextManager:
+        return self._locks.lock_many(order_ids)
+
+    def stats(self) -> TierStats:
+        with self._shared_lock:
+            return TierStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                demotions=self._demotions,
+                promotions=self._promotions,
+                hot_size=len(self._hot)
+            )
+
+    def flush(self) -> None:
+        """Записывает измененные заказы горячего уровня в холодное хранилище"""
+        with self._shared_lock:
+            self._cold.put_many(self._hot[order_id] for order_id in self._dirty)
+            self._dirty.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._cold.close()
+
+    def _versions(self, order_ids: List[str]) -> Dict[str, int]:
+        """Текущие версии: из памяти, остальные одним запросом к холодному хранилищу"""
+        versions: Dict[str, int] = {}
+        missing = []
+        with self._shared_lock:
+            for order_id in order_ids:
+                order = self._hot.get(order_id)
+                if order is not None:
+                    versions[order_id] = order.version
+                else:
+                    missing.append(order_id)
+        if missing:
+            versions.update(self._cold.versions(missing))
+        return versions
+
+    def _promote(self, orders: Iterable[Order]) -> None:
+        # Вызывается под блокировками этих заказов: версия на диске не может устареть
+        with self._shared_lock:
+            for order in orders:
+                if order.status == OrderStatus.CREATED and order.id not in self._hot:
+                    self._put_hot(order.copy(), dirty=False)
+                    self._promotions += 1
+            self._evict_if_needed()
+
+    def _put_hot(self, order: Order, dirty: bool) -> None:
+        self._hot[order.id] = order
+        self._hot.move_to_end(order.id)
+        self._index.put(order.summary())
+        if dirty:
+            self._dirty.add(order.id)
+
+    def _remove_hot(self, order_id: str) -> bool:
+        if self._hot.pop(order_id, None) is None:
+            return False
+        self._index.remove(order_id)
+        self._dirty.discard(order_id)
+        return True
+
+    def _evict_if_needed(self) -> None:
+        overflow = len(self._hot) - self.hot_capacity
+        if overflow <= 0:
+            return
+        victims = []
+        skipped = 0
+        while len(victims) < overflow and skipped < len(self._hot):
+            order_id, order = self._hot.popitem(last=False)
+            if order_id in self._saving:
+                self._hot[order_id] = order
+                skipped += 1
+            else:
+                victims.append(order)
+        # Измененные заказы сначала пишутся на диск и только потом исчезают из памяти.
+        # Это бывает только в режиме write_through=False: в нем вытеснение пишет на диск под общей блокировкой
+        self._cold.put_many(order for order in victims if order.id in self._dirty)
+        for order in victims:
+            self._index.remove(order.id)
+            self._dirty.discard(order.id)
+        self._evictions += len(victims)
+
+    def _find(self, hot_ids: Callable[[], List[str]], cold_ids: Callable[[], List[str]], merge: bool = False):
+        with self._shared_lock:
+            hot = [self._hot[order_id].copy() for order_id in hot_ids()]
+            # Копия на диске устарела, если заказ сейчас в памяти
+            cold = [order_id for order_id in cold_ids() if order_id not in self._hot]
+        cold_orders = self._cold_orders(cold)
+        return (hot, cold_orders) if merge else hot + cold_orders
+
+    def _find_views(
+        self,
+        hot_ids: Callable[[], List[str]],
+        cold_summaries: Callable[[], List[OrderSummary]]
+    ) -> List[OrderView]:
+        with self._shared_lock:
+            summaries: List[Optional[OrderSummary]] = [self._index.get(order_id) for order_id in hot_ids()]
+            summaries += [summary for summary in cold_summaries() if summary.id not in self._hot]
+        return [OrderView(summary, self.get_by_id) for summary in summaries if summary is not None]
+
+    def _cold_orders(self, order_ids: List[str]) -> List[Order]:
+        if not order_ids:
+            return []
+        orders = self._cold.get_many(order_ids)
+        return [orders[order_id] for order_id in order_ids if order_id in orders]
@@ -0,0 +1,85 @@
+import heapq
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.application.ports.order_repository import OrderRepository
+from src.infrastructure.sharding.sharded_payment_runner import ShardedPaymentRunner
+
+
+class ShardedOrderRepository(OrderRepository):
+    """Репозиторий поверх шардов ShardedPaymentRunner.
+
+    Операции с одним заказом уходят в его шард, поиск выполняется во всех шардах
+    параллельно и результаты объединяются. Блокировки не нужны: шард выполняет
+    запросы по одному, а save проверяет версию внутри шарда.
+    """
+
+    def __init__(self, runner: ShardedPaymentRunner):
+        self._runner = runner
+
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        return self._runner.call(self._runner.shard_for(order_id), "get_by_id", order_id)
+
+    def save(self, order: Order) -> None:
+        order.version = self._runner.call(self._runner.shard_for(order.id), "save", order)
+
+    def delete(self, order_id: str) -> None:
+        self._runner.call(self._runner.shard_for(order_id), "delete", order_id)
+
+    def find_by_customer(self, customer_id: str) -> List[Order]:
+        return [order for orders in self._runner.broadcast("find_by_customer", customer_id) for order in orders]
+
+    def find_by_status(self, status: OrderStatus) -> List[Order]:
+        return [order for orders in self._runner.broadcast("find_by_status", status) for order in orders]
+
+    def find_created_between(self, start: datetime, end: datetime) -> List[Order]:
+        shards = self._runner.broadcast("find_created_between", start, end)
+        return list(heapq.merge(*shards, key=lambda order: order.created_at))
+
+    def find_paid_between(self, start: datetime, end: datetime) -> List[Order]:
+        shards = self._runner.broadcast("find_paid_between", start, end)
+        return list(heapq.merge(*shards, key=lambda order: order.paid_at))
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        order_ids = list(order_ids)
+        replies = self._runner.call_many({
+            shard: ("get_many", (shard_ids,))
+            for shard, shard_ids in self._runner.partition(order_ids).items()
+        })
+        found: Dict[str, Order] = {}
+        for orders in replies.values():
+            found.update(orders)
+        return {order_id: found[order_id] for order_id in order_ids if order_id in found}
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        groups: Dict[int, List[Order]] = {}
+        for order in orders:
+            groups.setdefault(self._runner.shard_for(order.id), []).append(order)
+        replies = self._runner.call_many_replies({shard: ("save_many", (group,)) for shard, group in groups.items()})
+        # Шарды сохраняют свои пачки независимо: версии успешных шардов записываются
+        # в заказы вызывающего до того, как пробрасывается ошибка отклонившего шарда
+        errors = []
+        for shard, (ok, value) in replies.items():
+            if not ok:
+                errors.append(value)
+                continue
+            for order, version in zip(groups[shard], value):
+                order.version = version
+        if errors:
+            raise errors[0]
+
+    def iter_ids(self, batch_size: int = 1000) -> Iterator[str]:
+        for shard in range(self._runner.shards):
+            yield from self._runner.call(shard, "order_ids")
+
+    def iter_orders(self, batch_size: int = 1000) -> Iterator[Order]:
+        """Перебирает шарды по очереди: из шарда приходят только id, заказы читаются пачками"""
+        for shard in range(self._runner.shards):
+            order_ids = self._runner.call(shard, "order_ids")
+            for start in range(0, len(order_ids), batch_size):
+                batch = order_ids[start:start + batch_size]
+                orders = self._runner.call(shard, "get_many", batch)
+                for order_id in batch:
+                    if order_id in orders:
+                        yield orders[order_id]
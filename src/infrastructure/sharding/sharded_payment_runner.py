@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import threading
+import zlib
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.application.ports.order_repository import OrderRepository
+from src.application.ports.payment_gateway import PaymentGateway
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+
+Call = Tuple[str, tuple]
+
+# Методы репозитория, которые можно вызвать в процессе шарда
+_REPOSITORY_METHODS = frozenset({
+    "get_by_id", "get_many", "delete",
+    "find_by_customer", "find_by_status", "find_created_between", "find_paid_between",
+})
+
+
+def shard_for(order_id: str, shards: int) -> int:
+    """Номер шарда заказа; crc32 не зависит от PYTHONHASHSEED и одинаков во всех процессах"""
+    return zlib.crc32(order_id.encode("utf-8")) % shards
+
+
+class ShardedPaymentRunner:
+    """Раскладывает заказы по процессам-шардам по хэшу order_id.
+
+    Каждый процесс владеет своим репозиторием и PayOrderUseCase и обрабатывает
+    запросы своего шарда последовательно, поэтому оплата масштабируется на все
+    ядра без общего GIL. Фабрики репозитория и шлюза вызываются внутри процесса
+    шарда; при контексте spawn они должны быть импортируемыми функциями или классами.
+    """
+
+    def __init__(
+        self,
+        shards: Optional[int] = None,
+        repository_factory: Callable[[], OrderRepository] = InMemoryOrderRepository,
+        gateway_factory: Callable[[], PaymentGateway] = FakePaymentGateway,
+        context: Optional[multiprocessing.context.BaseContext] = None
+    ):
+        shards = shards if shards is not None else os.cpu_count() or 1
+        if shards <= 0:
+            raise ValueError("Число шардов должно быть положительным")
+        context = context if context is not None else multiprocessing.get_context()
+        self.shards = shards
+        self._connections = []
+        self._processes = []
+        self._locks = [threading.Lock() for _ in range(shards)]
+        for shard in range(shards):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_serve_shard,
+                args=(child, repository_factory, gateway_factory),
+                name=f"order-shard-{shard}",
+                daemon=True
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        self._broken = [False] * shards
+        self._closed = False
+
+    def shard_for(self, order_id: str) -> int:
+        return shard_for(order_id, self.shards)
+
+    def execute(self, order_id: str, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        return self.call(self.shard_for(order_id), "execute", order_id, idempotency_key)
+
+    def execute_many(self, order_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Оплачивает пачку заказов: каждый шард оплачивает свою часть параллельно с остальными"""
+        order_ids = list(dict.fromkeys(order_ids))
+        replies = self.call_many({
+            shard: ("execute_many", (shard_ids,))
+            for shard, shard_ids in self.partition(order_ids).items()
+        })
+        results = {}
+        for shard_results in replies.values():
+            results.update(shard_results)
+        return {order_id: results[order_id] for order_id in order_ids}
+
+    def partition(self, order_ids: Iterable[str]) -> Dict[int, List[str]]:
+        """Группирует order_id по шардам"""
+        groups: Dict[int, List[str]] = {}
+        for order_id in order_ids:
+            groups.setdefault(self.shard_for(order_id), []).append(order_id)
+        return groups
+
+    def call(self, shard: int, method: str, *args) -> Any:
+        return self.call_many({shard: (method, args)})[shard]
+
+    def broadcast(self, method: str, *args) -> List[Any]:
+        """Вызывает метод во всех шардах; результаты по порядку шардов"""
+        replies = self.call_many({shard: (method, args) for shard in range(self.shards)})
+        return [replies[shard] for shard in range(self.shards)]
+
+    def call_many(self, calls: Dict[int, Call]) -> Dict[int, Any]:
+        """Отправляет запросы сразу во все нужные шарды и затем собирает ответы;
+        ошибка первого по порядку шарда пробрасывается после получения всех ответов"""
+        results = {}
+        for shard, (ok, value) in self.call_many_replies(calls).items():
+            if not ok:
+                raise value
+            results[shard] = value
+        return results
+
+    def call_many_replies(self, calls: Dict[int, Call]) -> Dict[int, Tuple[bool, Any]]:
+        """Как call_many, но возвращает ответ каждого шарда парой (успех, значение или исключение)"""
+        if self._closed:
+            raise ValueError("Обработчик шардов уже остановлен")
+        shards = sorted(calls)
+        # Сериализуем заранее: ошибка сериализации не должна оставить часть шардов с отправленным запросом
+        payloads = {shard: bytes(ForkingPickler.dumps(calls[shard])) for shard in shards}
+        # Блокировки шардов берутся в одном порядке, чтобы параллельные пачки не ждали друг друга по кругу
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            for shard in shards:
+                if self._broken[shard]:
+                    raise ValueError(f"Соединение с шардом {shard} повреждено")
+            sent = []
+            try:
+                for shard in shards:
+                    try:
+                        self._connections[shard].send_bytes(payloads[shard])
+                    except BaseException:
+                        # Запрос мог уйти частично: поток шарда больше не синхронизирован
+                        self._broken[shard] = True
+                        raise
+                    sent.append(shard)
+            finally:
+                # Ответы всех шардов, получивших запрос, вычитываются всегда,
+                # иначе следующий вызов прочитает ответ на этот
+                replies = {shard: self._receive(shard) for shard in sent}
+        finally:
+            for shard in reversed(shards):
+                self._locks[shard].release()
+        return replies
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for shard, connection in enumerate(self._connections):
+            with self._locks[shard]:
+                try:
+                    connection.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                connection.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    def __enter__(self) -> "ShardedPaymentRunner":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def _receive(self, shard: int) -> Tuple[bool, Any]:
+        try:
+            payload = self._connections[shard].recv_bytes()
+        except EOFError:
+            self._broken[shard] = True
+            return False, ValueError(f"Процесс шарда {shard} завершился")
+        except BaseException as e:
+            # Ответ мог быть прочитан частично: соединение больше не используется
+            self._broken[shard] = True
+            return False, e
+        try:
+            return ForkingPickler.loads(payload)
+        except Exception as e:
+            return False, e
+
+
+def _serve_shard(connection, repository_factory: Callable[[], OrderRepository], gateway_factory: Callable[[], PaymentGateway]) -> None:
+    """Цикл процесса шарда: выполняет запросы по одному, пока не придет None"""
+    repository = repository_factory()
+    use_case = PayOrderUseCase(repository, gateway_factory())
+
+    def save(order):
+        repository.save(order)
+        return order.version
+
+    def save_many(orders):
+        repository.save_many(orders)
+        return [order.version for order in orders]
+
+    def order_ids():
+        return list(repository.iter_ids())
+
+    handlers = {
+        "execute": use_case.execute,
+        "execute_many": use_case.execute_many,
+        "save": save,
+        "save_many": save_many,
+        "order_ids": order_ids,
+    }
+    for method in _REPOSITORY_METHODS:
+        handlers[method] = getattr(repository, method)
+
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            method, args = message
+            handler = handlers.get(method)
+            try:
+                if handler is None:
+                    raise ValueError(f"Неизвестный метод шарда: {method}")
+                reply = (True, handler(*args))
+            except Exception as e:
+                reply = (False, e)
+            try:
+                connection.send(reply)
+            except Exception as e:
+                # Ответ или исключение не удалось сериализовать
+                connection.send((False, ValueError(str(e))))
+    finally:
+        close = getattr(repository, "close", None)
+        if close is not None:
+            close()
+        connection.close()
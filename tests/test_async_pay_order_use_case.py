@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.application.ports.order_repository import ConcurrentModificationError
+from src.application.use_cases.async_pay_order_use_case import AsyncPayOrderUseCase
+from src.infrastructure.repositories.async_in_memory_order_repository import AsyncInMemoryOrderRepository
+from src.infrastructure.payment_gateways.async_fake_payment_gateway import AsyncFakePaymentGateway
+
+
+class CountingGateway(AsyncFakePaymentGateway):
+
+    def __init__(self, latency: float):
+        super().__init__(latency)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def charge(self, order_id: str, amount: Money) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await super().charge(order_id, amount)
+        finally:
+            self.in_flight -= 1
+
+
+class TestAsyncPayOrderUseCase:
+
+    def setup_method(self):
+        self.order_repository = AsyncInMemoryOrderRepository()
+        self.payment_gateway = CountingGateway(latency=0.01)
+        self.use_case = AsyncPayOrderUseCase(self.order_repository, self.payment_gateway, max_concurrency=3)
+
+    async def _create_order(self) -> Order:
+        order = Order(customer_id="customer_123")
+        order.add_line("prod_1", "Товар 1", 2, Money(Decimal("100"), "USD"))
+        await self.order_repository.save(order)
+        return order
+
+    def test_successful_payment(self):
+        async def scenario():
+            order = await self._create_order()
+            result = await self.use_case.execute(order.id)
+            saved_order = await self.order_repository.get_by_id(order.id)
+            return result, saved_order
+
+        result, saved_order = asyncio.run(scenario())
+
+        assert result["success"] is True
+        assert result["amount"] == "200 USD"
+        assert saved_order.is_paid()
+
+    def test_execute_many_respects_concurrency_limit(self):
+        async def scenario():
+            orders = [await self._create_order() for _ in range(10)]
+            return await self.use_case.execute_many([order.id for order in orders])
+
+        results = asyncio.run(scenario())
+
+        assert all(result["success"] for result in results)
+        assert len(self.payment_gateway.transactions) == 10
+        assert self.payment_gateway.max_in_flight == 3
+
+    def test_execute_many_returns_errors_in_place(self):
+        async def scenario():
+            order = await self._create_order()
+            return await self.use_case.execute_many([order.id, "missing"])
+
+        results = asyncio.run(scenario())
+
+        assert results[0]["success"] is True
+        assert isinstance(results[1], ValueError)
+
+    def test_invalid_concurrency_limit(self):
+        with pytest.raises(ValueError):
+            AsyncPayOrderUseCase(self.order_repository, self.payment_gateway, max_concurrency=0)
+
+    def test_concurrent_duplicates_charge_once(self):
+        async def scenario():
+            order = await self._create_order()
+            return await self.use_case.execute_many([order.id] * 3)
+
+        results = asyncio.run(scenario())
+
+        assert sum(1 for result in results if isinstance(result, dict)) == 1
+        assert len(self.payment_gateway.transactions) == 1
+
+    def test_order_changed_during_charge_is_refunded(self):
+        repository = self.order_repository
+
+        class CancellingGateway(AsyncFakePaymentGateway):
+
+            async def charge(self, order_id: str, amount: Money) -> str:
+                cancelled = await repository.get_by_id(order_id)
+                cancelled.cancel()
+                await repository.save(cancelled)
+                return await super().charge(order_id, amount)
+
+        gateway = CancellingGateway()
+        use_case = AsyncPayOrderUseCase(repository, gateway)
+
+        async def scenario():
+            order = await self._create_order()
+            with pytest.raises(ConcurrentModificationError):
+                await use_case.execute(order.id)
+            return order, await repository.get_by_id(order.id)
+
+        order, saved_order = asyncio.run(scenario())
+
+        [transaction] = gateway.transactions.for_order(order.id)
+        assert transaction.refund_amount == transaction.amount
+        assert saved_order.status.value == "cancelled"
@@ -0,0 +1,54 @@
+import json
+import pytest
+from benchmarks.run import BaselineMismatchError, find_regressions, main
+from benchmarks.suite import run_suite
+
+
+def report(**values):
+    return {"metrics": {name: {"value": value, "unit": "ns/op"} for name, value in values.items()}}
+
+
+class TestBenchmarkComparison:
+
+    def test_regression_past_threshold_is_reported(self):
+        regressions = find_regressions(report(a=130.0, b=110.0), report(a=100.0, b=100.0), threshold=0.2)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("a:")
+
+    def test_per_metric_threshold(self):
+        regressions = find_regressions(report(a=130.0), report(a=100.0), threshold=0.2, thresholds={"a": 0.5})
+
+        assert regressions == []
+
+    def test_metrics_missing_from_baseline_are_reported(self):
+        assert find_regressions(report(a=1000.0), report(), threshold=0.2) == ["a: нет в базовой линии"]
+
+    def test_different_scale_is_refused(self):
+        results = {**report(a=1.0), "scale": 0.01}
+        baseline = {**report(a=1.0), "scale": 1.0}
+
+        with pytest.raises(BaselineMismatchError, match="scale"):
+            find_regressions(results, baseline, threshold=0.2)
+
+
+class TestBenchmarkSuite:
+
+    def test_suite_runs_at_small_scale(self):
+        metrics = run_suite(scale=0.001)
+
+        assert "money.add_mul" in metrics
+        assert any(name.startswith("repository.memory_per_order") for name in metrics)
+        assert all(value >= 0 for value, _ in metrics.values())
+
+    def test_cli_fails_on_regression(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        assert main(["--scale", "0.001", "--only", "money", "--baseline", str(baseline), "--save-baseline"]) == 0
+
+        data = json.loads(baseline.read_text(encoding="utf-8"))
+        for metric in data["metrics"].values():
+            metric["value"] /= 100
+        baseline.write_text(json.dumps(data), encoding="utf-8")
+
+        assert main(["--scale", "0.001", "--only", "money", "--baseline", str(baseline)]) == 1
+        assert main(["--scale", "0.002", "--only", "money", "--baseline", str(baseline)]) == 2
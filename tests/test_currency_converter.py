@@ -0,0 +1,107 @@
+import pytest
+from decimal import Decimal
+from fractions import Fraction
+from src.domain.money import Money
+from src.application.read_models.currency_converter import CurrencyConverter
+from src.infrastructure.exchange_rates.static_exchange_rate_provider import StaticExchangeRateProvider
+
+RATES = {"EUR": Decimal("0.8"), "RUB": Decimal("90")}
+
+
+class CountingProvider(StaticExchangeRateProvider):
+
+    def __init__(self):
+        super().__init__(RATES)
+        self.calls = 0
+
+    def get_rates(self, target_currency):
+        self.calls += 1
+        return super().get_rates(target_currency)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def money(amount: str, currency: str) -> Money:
+    return Money(Decimal(amount), currency)
+
+
+class TestStaticExchangeRateProvider:
+
+    def test_cross_rates(self):
+        rates = StaticExchangeRateProvider(RATES).get_rates("EUR")
+        assert rates == {"USD": Decimal("0.8"), "EUR": Decimal("1"), "RUB": Fraction(8, 900)}
+
+    def test_cross_rates_round_trip_exactly(self):
+        provider = StaticExchangeRateProvider({"EUR": Decimal("0.92"), "JPY": Decimal("151.37")})
+
+        eur_to_jpy = provider.get_rates("JPY")["EUR"]
+        jpy_to_eur = provider.get_rates("EUR")["JPY"]
+
+        assert eur_to_jpy * jpy_to_eur == 1
+
+    def test_unknown_target(self):
+        with pytest.raises(ValueError):
+            StaticExchangeRateProvider(RATES).get_rates("GBP")
+
+
+class TestCurrencyConverter:
+
+    def test_convert_rounds_half_even(self):
+        converter = CurrencyConverter(StaticExchangeRateProvider({"EUR": Decimal("0.5")}))
+
+        assert converter.convert(money("10.01", "USD"), "EUR") == money("5.00", "EUR")
+        assert converter.convert(money("10.03", "USD"), "EUR") == money("5.02", "EUR")
+        assert converter.convert(money("3", "EUR"), "USD") == money("6.00", "USD")
+        assert converter.convert(money("1.234", "USD"), "USD") == money("1.234", "USD")
+
+    def test_negative_scale_converts_exactly(self):
+        converter = CurrencyConverter(StaticExchangeRateProvider({"EUR": Decimal("0.5")}))
+
+        converted = converter.convert(Money(Decimal("1E+2"), "USD"), "EUR")
+        large = converter.convert(Money(Decimal("12345678901234567891E+3"), "USD"), "EUR")
+
+        assert converted == money("50.00", "EUR")
+        assert all(isinstance(part, int) for part in converted.as_units())
+        assert large.amount == Decimal("6172839450617283945500.00")
+
+    def test_convert_many_keeps_order_and_fetches_table_once(self):
+        provider = CountingProvider()
+        converter = CurrencyConverter(provider)
+        amounts = [money("8", "EUR"), money("900", "RUB"), money("1", "USD")] * 1000
+
+        converted = converter.convert_many(amounts, "USD")
+
+        assert converted[:3] == [money("10", "USD"), money("10", "USD"), money("1", "USD")]
+        assert len(converted) == 3000
+        assert provider.calls == 1
+
+    def test_total_converts_once_per_currency(self):
+        converter = CurrencyConverter(StaticExchangeRateProvider({"RUB": Decimal("3")}))
+        amounts = [money("1", "RUB")] * 3 + [money("2.50", "USD")]
+
+        # По отдельности каждая сумма округлилась бы до 0.33
+        assert converter.total(amounts, "USD") == money("3.50", "USD")
+
+    def test_rates_are_cached_until_ttl(self):
+        provider = CountingProvider()
+        clock = FakeClock()
+        converter = CurrencyConverter(provider, ttl=60, clock=clock)
+
+        converter.rate("EUR", "USD")
+        converter.rate("RUB", "USD")
+        clock.now = 61
+        assert converter.rate("EUR", "USD") == Decimal("1.25")
+
+        assert provider.calls == 2
+
+    def test_missing_rate(self):
+        converter = CurrencyConverter(StaticExchangeRateProvider(RATES))
+        with pytest.raises(ValueError, match="Нет курса"):
+            converter.convert(money("1", "GBP"), "USD")
@@ -1,8 +1,16 @@
+import pickle
+from datetime import datetime, timezone
 import pytest
+from dataclasses import FrozenInstanceError
 from decimal import Decimal
 from src.domain.money import Money
 from src.domain.order import Order
 from src.domain.order_status import OrderStatus
+from src.domain.order_line import OrderLine
+from src.domain.order_lines import OrderLines
+from src.domain.columnar_order_lines import ColumnarOrderLines
+from src.domain.order_view import OrderView
+from src.domain.order_id import OrderIdGenerator, created_at
 
 
 class TestMoney:
@@ -38,6 +46,32 @@ class TestMoney:
         assert zero.currency == "USD"
         assert zero.is_zero()
 
+    def test_arithmetic_keeps_decimal_exponent(self):
+        result = Money(Decimal("100"), "USD") + Money(Decimal("29.99"), "USD") * 2
+        assert result.amount == Decimal("159.98")
+        assert str(result) == "159.98 USD"
+        assert str(Money(Decimal("0.1"), "USD") * Decimal("0.25")) == "0.025 USD"
+
+    def test_subtraction_below_zero_raises_error(self):
+        with pytest.raises(ValueError, match="Сумма не может быть отрицательной"):
+            Money(Decimal("10"), "USD") - Money(Decimal("10.01"), "USD")
+
+    def test_equal_amounts_with_different_scale(self):
+        assert Money(Decimal("100"), "USD") == Money(Decimal("100.00"), "USD")
+        assert hash(Money(Decimal("100"), "USD")) == hash(Money(Decimal("100.00"), "USD"))
+        assert Money(Decimal("100"), "USD") != Money(Decimal("100"), "EUR")
+
+    def test_money_is_immutable(self):
+        money = Money(Decimal("100"), "USD")
+        with pytest.raises(FrozenInstanceError):
+            money.amount = Decimal("1")
+
+    def test_units_round_trip(self):
+        money = Money.from_units(89999, 2, "USD")
+        assert money.amount == Decimal("899.99")
+        assert money.as_units() == (89999, 2)
+        assert pickle.loads(pickle.dumps(money)) == money
+
 
 class TestOrder:
 
@@ -83,4 +117,240 @@ class TestOrder:
         order.pay()
 
         with pytest.raises(ValueError, match="Заказ уже оплачен"):
-            order.pay()
\ No newline at end of file
+            order.pay()
+
+
+class TestOrderCurrency:
+
+    def test_total_uses_currency_of_lines(self):
+        order = Order(customer_id="customer")
+        order.add_line("prod_1", "Товар 1", 2, Money(Decimal("5.50"), "EUR"))
+
+        assert order.currency == "EUR"
+        assert order.total_amount == Money(Decimal("11.00"), "EUR")
+        order.pay()
+        assert order.is_paid()
+
+    def test_lines_of_one_order_share_currency(self):
+        order = Order(customer_id="customer")
+        order.add_line("prod_1", "Товар 1", 1, Money(Decimal("100"), "RUB"))
+
+        with pytest.raises(ValueError, match="валюты"):
+            order.add_line("prod_2", "Товар 2", 1, Money(Decimal("1"), "USD"))
+
+    def test_empty_order_takes_currency_of_next_line(self):
+        order = Order(customer_id="customer")
+        order.add_line("prod_1", "Товар 1", 1, Money(Decimal("100"), "RUB"))
+        order.remove_line("prod_1")
+        order.add_line("prod_2", "Товар 2", 1, Money(Decimal("3"), "EUR"))
+
+        assert order.total_amount == Money(Decimal("3"), "EUR")
+
+    def test_order_built_from_foreign_lines(self):
+        order = Order(customer_id="customer", lines=[
+            OrderLine("prod_1", "Товар 1", 1, Money(Decimal("3"), "EUR")),
+            OrderLine("prod_2", "Товар 2", 2, Money(Decimal("1"), "EUR")),
+        ])
+        assert order.total_amount == Money(Decimal("5"), "EUR")
+
+
+class TestOrderRunningTotal:
+
+    def setup_method(self):
+        Order.verify_totals = True
+
+    def teardown_method(self):
+        Order.verify_totals = False
+
+    def test_total_follows_line_changes(self):
+        order = Order(customer_id="customer_123")
+        order.add_line("prod_1", "Товар 1", 2, Money(Decimal("10.50"), "USD"))
+        order.add_line("prod_2", "Товар 2", 1, Money(Decimal("5"), "USD"))
+        order.add_line("prod_1", "Товар 1", 1, Money(Decimal("10.50"), "USD"))
+        assert order.total_amount.amount == Decimal("36.50")
+
+        order.update_quantity("prod_2", 4)
+        assert order.total_amount.amount == Decimal("51.50")
+
+        order.remove_line("prod_1")
+        assert order.total_amount.amount == Decimal("20")
+
+    def test_total_of_lines_passed_to_constructor(self):
+        source = Order(customer_id="customer_123")
+        source.add_line("prod_1", "Товар 1", 3, Money(Decimal("100"), "USD"))
+
+        order = Order(customer_id="customer_456", lines=list(source.lines))
+
+        assert order.total_amount.amount == Decimal("300")
+
+    def test_debug_mode_detects_stale_total(self):
+        order = Order(customer_id="customer_123")
+        order.add_line("prod_1", "Товар 1", 1, Money(Decimal("100"), "USD"))
+        order.lines.clear()
+
+        with pytest.raises(AssertionError):
+            order.total_amount
+
+
+class TestOrderLinesIndex:
+
+    def test_merge_and_removal_keep_line_order(self):
+        order = Order(customer_id="customer_123")
+        price = Money(Decimal("10"), "USD")
+        for product_id in ("a", "b", "c"):
+            order.add_line(product_id, product_id.upper(), 1, price)
+
+        order.add_line("a", "A", 2, price)
+        order.update_quantity("c", 5)
+        order.remove_line("b")
+
+        assert [line.product_id for line in order.lines] == ["a", "c"]
+        assert [line.quantity for line in order.lines] == [3, 5]
+        assert "a" in order.lines and "b" not in order.lines
+
+    def test_update_unknown_product_raises_error(self):
+        order = Order(customer_id="customer_123")
+
+        with pytest.raises(ValueError, match="Товар prod_1 не найден"):
+            order.update_quantity("prod_1", 2)
+
+    def test_duplicate_lines_in_constructor_raise_error(self):
+        source = Order(customer_id="customer_123")
+        source.add_line("prod_1", "Товар 1", 1, Money(Decimal("10"), "USD"))
+        line = source.lines.get("prod_1")
+
+        with pytest.raises(ValueError):
+            Order(customer_id="customer_123", lines=[line, line])
+
+
+class TestColumnarOrderLines:
+
+    def _build(self, lines) -> Order:
+        order = Order(customer_id="customer_123", lines=lines)
+        order.add_line("prod_1", "Товар 1", 2, Money(Decimal("10"), "USD"))
+        order.add_line("prod_2", "Товар 2", 1, Money(Decimal("0.99"), "USD"))
+        order.add_line("prod_3", "Товар 3", 3, Money(Decimal("5.5"), "USD"))
+        return order
+
+    def test_behaves_like_default_storage(self):
+        columnar = self._build(ColumnarOrderLines())
+        regular = self._build(OrderLines())
+
+        columnar.remove_line("prod_2")
+        regular.remove_line("prod_2")
+
+        assert list(columnar.lines) == list(regular.lines)
+        assert columnar.lines == regular.lines
+        assert columnar.lines.get("prod_3").price == Money(Decimal("5.5"), "USD")
+        assert str(columnar.lines.get("prod_3").price) == "5.5 USD"
+        assert columnar.total_amount == regular.total_amount
+
+    def test_bulk_quantity_update(self):
+        order = self._build(ColumnarOrderLines())
+
+        order.update_quantities({"prod_1": 1, "prod_2": 10})
+
+        assert order.total_amount.amount == Decimal("36.40")
+        assert order.lines.total().amount == Decimal("36.40")
+
+    def test_bulk_update_is_atomic(self):
+        order = self._build(ColumnarOrderLines())
+
+        with pytest.raises(ValueError):
+            order.update_quantities({"prod_1": 5, "missing": 1})
+
+        assert order.lines.get("prod_1").quantity == 2
+
+    def test_mixed_currencies_raise_error(self):
+        order = self._build(ColumnarOrderLines())
+
+        with pytest.raises(ValueError):
+            order.add_line("prod_4", "Товар 4", 1, Money(Decimal("1"), "EUR"))
+
+    def test_emptied_order_accepts_another_currency(self):
+        order = self._build(ColumnarOrderLines())
+        for product_id in ("prod_1", "prod_2", "prod_3"):
+            order.remove_line(product_id)
+
+        order.add_line("prod_4", "Товар 4", 2, Money(Decimal("7"), "EUR"))
+
+        assert order.total_amount == Money(Decimal("14"), "EUR")
+        assert order.lines.get("prod_4").price == Money(Decimal("7"), "EUR")
+
+    def test_removal_compacts_storage(self):
+        order = Order(customer_id="customer_123", lines=ColumnarOrderLines())
+        for i in range(200):
+            order.add_line(f"prod_{i}", "Товар", 1, Money(Decimal("1"), "USD"))
+        for i in range(150):
+            order.remove_line(f"prod_{i}")
+
+        assert len(order.lines) == 50
+        assert next(iter(order.lines)).product_id == "prod_150"
+        assert order.total_amount.amount == Decimal("50")
+
+
+class TestOrderView:
+
+    def make_order(self) -> Order:
+        order = Order(customer_id="customer")
+        order.add_line("prod_1", "Товар 1", 3, Money(Decimal("2.50"), "USD"))
+        return order
+
+    def test_summary_fields_do_not_call_loader(self):
+        order = self.make_order()
+        calls = []
+        view = OrderView(order.summary(), lambda order_id: calls.append(order_id) or order)
+
+        assert (view.customer_id, view.status, view.is_paid()) == ("customer", OrderStatus.CREATED, False)
+        assert view.total_amount == Money(Decimal("7.50"), "USD")
+        assert calls == [] and not view.is_loaded
+
+        assert len(view.lines) == 1
+        assert view.load() is order
+        assert calls == [order.id]
+
+    def test_missing_order_on_load(self):
+        view = OrderView(self.make_order().summary(), lambda order_id: None)
+        with pytest.raises(ValueError, match="не найден"):
+            view.load()
+
+    def test_of_loaded_order(self):
+        order = self.make_order()
+        view = OrderView.of(order)
+        assert view.is_loaded and view.load() is order
+
+
+class TestOrderId:
+
+    def test_ids_are_sortable_by_time_and_monotonic(self):
+        clock = [1_700_000_000.0]
+        generator = OrderIdGenerator(clock=lambda: clock[0])
+        same_millisecond = [generator() for _ in range(100)]
+        clock[0] += 0.001
+        later = generator()
+        clock[0] -= 10
+        after_clock_jump_back = generator()
+
+        ids = same_millisecond + [later, after_clock_jump_back]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        assert all(len(order_id) == 26 for order_id in ids)
+
+    def test_created_at(self):
+        moment = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        order_id = OrderIdGenerator(clock=moment.timestamp)()
+
+        assert created_at(order_id) == moment
+
+    def test_invalid_id(self):
+        with pytest.raises(ValueError):
+            created_at("not-an-order-id")
+
+    def test_domain_objects_are_slotted(self):
+        order = Order(customer_id="customer")
+        order.add_line("prod_1", "Товар 1", 1, Money(Decimal("1"), "USD"))
+
+        assert not hasattr(order, "__dict__")
+        assert not hasattr(order.lines.get("prod_1"), "__dict__")
+        assert len(order.id) == 26
+        assert pickle.loads(pickle.dumps(order)) == order
@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.application.use_cases.idempotency_cache import IdempotencyCache
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestIdempotencyCache:
+
+    def test_returns_cached_result(self):
+        cache = IdempotencyCache()
+        calls = []
+
+        first = cache.run("key", "order-1", lambda: calls.append(1) or {"value": 1})
+        second = cache.run("key", "order-1", lambda: calls.append(1) or {"value": 2})
+
+        assert first == second == {"value": 1}
+        assert len(calls) == 1
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = IdempotencyCache(ttl=10, clock=clock)
+        cache.run("key", "order-1", lambda: {"value": 1})
+
+        clock.now = 11
+
+        assert cache.run("key", "order-1", lambda: {"value": 2}) == {"value": 2}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = IdempotencyCache(max_size=2)
+        cache.run("a", "order-1", lambda: {"value": "a"})
+        cache.run("b", "order-1", lambda: {"value": "b"})
+        cache.run("a", "order-1", lambda: {"value": "stale"})
+        cache.run("c", "order-1", lambda: {"value": "c"})
+
+        assert cache.run("a", "order-1", lambda: {"value": "new"}) == {"value": "a"}
+        assert cache.run("b", "order-1", lambda: {"value": "new"}) == {"value": "new"}
+
+    def test_errors_are_not_cached(self):
+        cache = IdempotencyCache()
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            cache.run("key", "order-1", fail)
+        assert cache.run("key", "order-1", lambda: {"value": 1}) == {"value": 1}
+
+    def test_key_reuse_for_another_order_is_rejected(self):
+        cache = IdempotencyCache()
+        cache.run("key", "order-1", lambda: {"value": 1})
+
+        with pytest.raises(ValueError, match="уже использован"):
+            cache.run("key", "order-2", lambda: {"value": 2})
+
+    def test_concurrent_duplicates_are_coalesced(self):
+        cache = IdempotencyCache()
+        started = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return {"value": 1}
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            first = pool.submit(cache.run, "key", "order-1", slow)
+            started.wait()
+            duplicates = [pool.submit(cache.run, "key", "order-1", slow) for _ in range(3)]
+            results = [first.result()] + [future.result() for future in duplicates]
+
+        assert len(calls) == 1
+        assert all(result == {"value": 1} for result in results)
+
+
+class TestPayOrderIdempotency:
+
+    def test_retry_returns_original_transaction(self):
+        repository = InMemoryOrderRepository()
+        gateway = FakePaymentGateway()
+        use_case = PayOrderUseCase(repository, gateway)
+        order = Order(customer_id="customer_123")
+        order.add_line("prod_1", "Товар 1", 1, Money(Decimal("100"), "USD"))
+        repository.save(order)
+
+        first = use_case.execute(order.id, idempotency_key="request-1")
+        retry = use_case.execute(order.id, idempotency_key="request-1")
+
+        assert retry["transaction_id"] == first["transaction_id"]
+        assert len(gateway.transactions) == 1
+
+        with pytest.raises(ValueError, match="Заказ уже оплачен"):
+            use_case.execute(order.id, idempotency_key="request-2")
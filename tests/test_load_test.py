@@ -0,0 +1,99 @@
+import json
+import pytest
+from benchmarks.load_test import (
+    FAILED, OK, REJECTED, UNEXPECTED, LoadTestConfig, LoadTestReport, UnexpectedOutcomeError, _handlers, main, run_load_test
+)
+from src.application.ports.order_repository import ConcurrentModificationError
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from benchmarks.workload import CANCEL, EMPTY, PAY, WorkloadConfig, WorkloadGenerator, line_counts, parse_mix
+
+
+class TestWorkloadGenerator:
+
+    def test_same_seed_gives_same_workload(self):
+        config = WorkloadConfig(orders=50, seed=7)
+        first = [(operation, order.customer_id, order.total_amount) for operation, order in WorkloadGenerator(config).operations()]
+        second = [(operation, order.customer_id, order.total_amount) for operation, order in WorkloadGenerator(config).operations()]
+
+        assert first == second
+
+    def test_mix_and_line_distribution(self):
+        config = WorkloadConfig(orders=2_000, mix={PAY: 0.5, EMPTY: 0.5}, mean_lines=3)
+        operations = list(WorkloadGenerator(config).operations())
+
+        kinds = [operation for operation, _ in operations]
+        assert 800 < kinds.count(EMPTY) < 1200
+        assert all(order.is_empty() for operation, order in operations if operation == EMPTY)
+        counts = line_counts([order for operation, order in operations if operation == PAY])
+        mean = sum(lines * count for lines, count in counts.items()) / sum(counts.values())
+        assert 2.5 < mean < 3.5
+        assert counts[1] > counts.get(5, 0)
+
+    def test_parse_mix(self):
+        assert parse_mix("pay=0.9, cancel=0.1") == {PAY: 0.9, CANCEL: 0.1}
+        with pytest.raises(ValueError):
+            WorkloadConfig(mix={"refund": 1.0})
+
+
+class TestLoadTest:
+
+    def test_percentiles_use_nearest_rank(self):
+        report = LoadTestReport(latencies={PAY: [i / 1000 for i in range(1, 101)]})
+
+        assert report.percentiles() == {50: 0.05, 95: 0.095, 99: 0.099}
+
+    def test_run_reports_outcomes_for_every_operation(self):
+        config = LoadTestConfig(
+            workload=WorkloadConfig(orders=300, mix={PAY: 0.7, CANCEL: 0.1, EMPTY: 0.1, "duplicate_pay": 0.1}),
+            threads=4,
+            failure_rate=0.1
+        )
+
+        report = run_load_test(config)
+
+        assert report.operations == 300
+        assert report.outcomes[OK] > 0 and report.outcomes[REJECTED] > 0 and report.outcomes[FAILED] > 0
+        assert report.outcomes[UNEXPECTED] == 0
+        for operation in (CANCEL, EMPTY):
+            counts = report.operation_outcomes[operation]
+            assert counts[REJECTED] == sum(counts.values())
+        assert report.operation_outcomes[PAY][REJECTED] == 0
+        assert set(report.latencies) == {PAY, CANCEL, EMPTY, "duplicate_pay"}
+        assert report.throughput > 0
+
+    def test_conflicts_and_missing_orders_are_unexpected(self):
+        repository = InMemoryOrderRepository()
+
+        class ConflictingUseCase:
+            def execute(self, order_id, idempotency_key=None):
+                raise ConcurrentModificationError(f"Заказ {order_id} изменен другим процессом")
+
+        handlers = _handlers(ConflictingUseCase(), repository)
+
+        with pytest.raises(UnexpectedOutcomeError):
+            handlers[CANCEL]("missing")
+        with pytest.raises(ConcurrentModificationError):
+            handlers[EMPTY]("order")
+
+    def test_success_where_rejection_expected_is_unexpected(self):
+        repository = InMemoryOrderRepository()
+        _, order = next(WorkloadGenerator(WorkloadConfig(orders=1, mix={PAY: 1.0})).operations())
+        repository.save(order)
+        handlers = _handlers(PayOrderUseCase(repository, FakePaymentGateway()), repository)
+
+        with pytest.raises(UnexpectedOutcomeError):
+            handlers[EMPTY](order.id)
+
+    @pytest.mark.parametrize("repository, gateway", [("sqlite", "resilient"), ("memory", "micro_batching"), ("tiered", "fake")])
+    def test_cli_with_adapters(self, tmp_path, capsys, repository, gateway):
+        output = tmp_path / "report.json"
+
+        assert main([
+            "--orders", "100", "--threads", "4", "--repository", repository, "--gateway", gateway,
+            "--output", str(output),
+        ]) == 0
+
+        assert "p99" in capsys.readouterr().out
+        assert json.loads(output.read_text(encoding="utf-8"))["operations"] == 100
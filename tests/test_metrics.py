@@ -0,0 +1,106 @@
+import threading
+import urllib.request
+from decimal import Decimal
+from http.server import HTTPServer
+import pytest
+from src.domain.money import Money
+from src.domain.order import Order
+from src.application.ports.metrics_recorder import NullMetricsRecorder
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.metrics.instrumented import InstrumentedOrderRepository, InstrumentedPaymentGateway
+from src.infrastructure.metrics.prometheus_metrics_recorder import PrometheusMetricsRecorder, make_metrics_handler
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+
+
+def make_order() -> Order:
+    order = Order(customer_id="customer-1")
+    order.add_line("product-1", "Товар", 2, Money(Decimal("10.00"), "USD"))
+    return order
+
+
+class TestPrometheusMetricsRecorder:
+
+    def test_observe_fills_cumulative_buckets(self):
+        recorder = PrometheusMetricsRecorder(buckets=(0.01, 0.1))
+        recorder.observe("op", 0.005)
+        recorder.observe("op", 0.05)
+        recorder.observe("op", 5.0, error=True)
+
+        text = recorder.render()
+        assert 'orders_operation_duration_seconds_bucket{operation="op",le="0.01"} 1' in text
+        assert 'orders_operation_duration_seconds_bucket{operation="op",le="0.1"} 2' in text
+        assert 'orders_operation_duration_seconds_bucket{operation="op",le="+Inf"} 3' in text
+        assert 'orders_operation_duration_seconds_count{operation="op"} 3' in text
+        assert 'orders_operation_errors_total{operation="op"} 1' in text
+        assert recorder.error_rate("op") == pytest.approx(1 / 3)
+
+    def test_timer_records_error_and_reraises(self):
+        recorder = PrometheusMetricsRecorder()
+        with pytest.raises(ValueError):
+            with recorder.timer("op"):
+                raise ValueError("boom")
+        assert recorder.count("op") == 1
+        assert recorder.errors("op") == 1
+
+    def test_increment_and_write_to_file(self, tmp_path):
+        recorder = PrometheusMetricsRecorder()
+        recorder.increment("orders_paid", 2)
+        path = str(tmp_path / "metrics.prom")
+        recorder.write_to(path)
+
+        with open(path, encoding="utf-8") as file:
+            assert 'orders_events_total{event="orders_paid"} 2' in file.read()
+
+    def test_http_handler_serves_metrics(self):
+        recorder = PrometheusMetricsRecorder()
+        recorder.observe("op", 0.001)
+        server = HTTPServer(("127.0.0.1", 0), make_metrics_handler(recorder))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/metrics"
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'orders_operation_duration_seconds_count{operation="op"} 1' in body
+
+
+class TestInstrumentation:
+
+    def test_pay_order_phases_and_port_calls_are_timed(self):
+        recorder = PrometheusMetricsRecorder()
+        repository = InstrumentedOrderRepository(InMemoryOrderRepository(), recorder)
+        gateway = InstrumentedPaymentGateway(FakePaymentGateway(), recorder)
+        order = make_order()
+        repository.save(order)
+
+        PayOrderUseCase(repository, gateway, metrics=recorder).execute(order.id)
+
+        for operation in (
+            "pay_order.execute", "pay_order.get_by_id", "pay_order.pay", "pay_order.charge", "pay_order.save",
+            "order_repository.get_by_id", "payment_gateway.charge",
+        ):
+            assert recorder.count(operation) == 1, operation
+        assert recorder.count("order_repository.save") == 2
+
+    def test_failed_phase_is_counted_as_error(self):
+        recorder = PrometheusMetricsRecorder()
+        repository = InMemoryOrderRepository()
+        order = make_order()
+        order.pay()
+        repository.save(order)
+
+        with pytest.raises(ValueError):
+            PayOrderUseCase(repository, FakePaymentGateway(), metrics=recorder).execute(order.id)
+
+        assert recorder.errors("pay_order.pay") == 1
+        assert recorder.errors("pay_order.execute") == 1
+        assert recorder.count("pay_order.charge") == 0
+
+    def test_null_recorder_is_default(self):
+        use_case = PayOrderUseCase(InMemoryOrderRepository(), FakePaymentGateway())
+        assert isinstance(use_case.metrics, NullMetricsRecorder)
+        assert use_case.metrics.timer("a") is use_case.metrics.timer("b")
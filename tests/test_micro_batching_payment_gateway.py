@@ -0,0 +1,113 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.application.ports.payment_gateway import PaymentGatewayUnavailableError
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.payment_gateways.micro_batching_payment_gateway import MicroBatchingPaymentGateway
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+
+AMOUNT = Money(Decimal("10"), "USD")
+
+
+def charge_concurrently(gateway, payments):
+    def charge(payment):
+        try:
+            return gateway.charge(*payment)
+        except ValueError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(payments)) as pool:
+        return list(pool.map(charge, payments))
+
+
+class TestMicroBatchingPaymentGateway:
+
+    def test_concurrent_charges_share_round_trips(self):
+        inner = FakePaymentGateway()
+        inner.set_fail_mode(False, latency=0.01)
+        with MicroBatchingPaymentGateway(inner, max_batch_size=50, max_wait=0.02) as gateway:
+            results = charge_concurrently(gateway, [(f"order-{i}", AMOUNT) for i in range(20)])
+
+        assert len(set(results)) == 20
+        assert all(result in inner.transactions for result in results)
+        assert inner.round_trips < 20
+
+    def test_each_caller_gets_its_own_error(self):
+        inner = FakePaymentGateway()
+        with MicroBatchingPaymentGateway(inner, max_wait=0.01) as gateway:
+            results = charge_concurrently(gateway, [("good", AMOUNT), ("bad", Money.zero())])
+
+        assert isinstance(results[0], str)
+        assert isinstance(results[1], ValueError) and "положительной" in str(results[1])
+
+    def test_batch_failure_reaches_every_caller(self):
+        inner = FakePaymentGateway()
+        inner.set_fail_mode(True)
+        with MicroBatchingPaymentGateway(inner, max_wait=0.01) as gateway:
+            results = charge_concurrently(gateway, [("a", AMOUNT), ("b", AMOUNT)])
+
+        assert all(isinstance(result, PaymentGatewayUnavailableError) for result in results)
+
+    def test_duplicate_order_ids_in_one_batch(self):
+        inner = FakePaymentGateway()
+        with MicroBatchingPaymentGateway(inner, max_wait=0.02) as gateway:
+            results = charge_concurrently(gateway, [("same", AMOUNT)] * 3)
+
+        assert len(set(results)) == 3
+
+    def test_malformed_gateway_reply_does_not_kill_flusher(self):
+        class ListReplyGateway(FakePaymentGateway):
+
+            def charge_many(self, payments):
+                return [self.charge(order_id, amount) for order_id, amount in payments]
+
+        with MicroBatchingPaymentGateway(ListReplyGateway(), max_wait=0.01) as gateway:
+            results = charge_concurrently(gateway, [("a", AMOUNT), ("b", AMOUNT)])
+            assert all(isinstance(result, ValueError) for result in results)
+
+            with pytest.raises(ValueError):
+                gateway.charge("c", AMOUNT)
+            assert gateway._flusher.is_alive()
+
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_charges_fail_fast_once_flusher_is_gone(self):
+        class ExitingGateway(FakePaymentGateway):
+
+            def charge_many(self, payments):
+                raise SystemExit
+
+        gateway = MicroBatchingPaymentGateway(ExitingGateway(), max_wait=0)
+
+        with pytest.raises(ValueError, match="не был выполнен"):
+            gateway.charge("a", AMOUNT)
+        gateway._flusher.join(1)
+        with pytest.raises(ValueError, match="остановлен"):
+            gateway.charge("b", AMOUNT)
+        gateway.close()
+
+    def test_closed_gateway_rejects_charges(self):
+        gateway = MicroBatchingPaymentGateway(FakePaymentGateway())
+        gateway.close()
+        with pytest.raises(ValueError):
+            gateway.charge("order", AMOUNT)
+
+    def test_transparent_for_pay_order_use_case(self):
+        repository = InMemoryOrderRepository()
+        orders = []
+        for _ in range(10):
+            order = Order(customer_id="customer")
+            order.add_line("prod_1", "Товар 1", 1, AMOUNT)
+            orders.append(order)
+        repository.save_many(orders)
+        inner = FakePaymentGateway()
+
+        with MicroBatchingPaymentGateway(inner, max_wait=0.02) as gateway:
+            use_case = PayOrderUseCase(repository, gateway)
+            with ThreadPoolExecutor(max_workers=10) as pool:
+                results = list(pool.map(lambda order: use_case.execute(order.id), orders))
+
+        assert all(result["success"] for result in results)
+        assert len(inner.transactions) == 10
@@ -0,0 +1,73 @@
+from datetime import datetime
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.application.read_models.order_aggregates import OrderAggregates
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class TestOrderAggregates:
+
+    def setup_method(self):
+        self.repository = InMemoryOrderRepository()
+        self.aggregates = OrderAggregates()
+        self.repository.add_listener(self.aggregates)
+        self.use_case = PayOrderUseCase(self.repository, FakePaymentGateway())
+
+    def _create_order(self, customer_id: str, amount: str, currency: str = "USD") -> Order:
+        order = Order(customer_id=customer_id)
+        order.add_line("prod_1", "Товар 1", 1, Money(Decimal(amount), currency))
+        self.repository.save(order)
+        return order
+
+    def test_counts_follow_status_transitions(self):
+        first = self._create_order("alice", "10")
+        second = self._create_order("bob", "20")
+        assert self.aggregates.count(OrderStatus.CREATED) == 2
+
+        self.use_case.execute(first.id)
+        second.cancel()
+        self.repository.save(second)
+
+        assert self.aggregates.count(OrderStatus.CREATED) == 0
+        assert self.aggregates.count(OrderStatus.PAID) == 1
+        assert self.aggregates.count(OrderStatus.CANCELLED) == 1
+        assert self.aggregates.total_orders == 2
+
+    def test_revenue_per_currency_customer_and_day(self):
+        first = self._create_order("alice", "10.50")
+        second = self._create_order("alice", "4.50")
+        euro = self._create_order("bob", "7", "EUR")
+        for order in (first, second, euro):
+            self.use_case.execute(order.id)
+
+        today = datetime.now().date()
+        assert self.aggregates.revenue("USD").amount == Decimal("15.00")
+        assert self.aggregates.revenue("EUR").amount == Decimal("7")
+        assert self.aggregates.customer_revenue("bob", "EUR").amount == Decimal("7")
+        assert set(self.aggregates.revenue_by_currency()) == {"USD", "EUR"}
+        assert self.aggregates.customer_revenue("alice").amount == Decimal("15.00")
+        assert self.aggregates.customer_revenue("bob").is_zero()
+        assert self.aggregates.daily_revenue(today).amount == Decimal("15.00")
+
+    def test_delete_removes_contribution(self):
+        order = self._create_order("alice", "10")
+        self.use_case.execute(order.id)
+
+        self.repository.delete(order.id)
+
+        assert self.aggregates.revenue("USD").is_zero()
+        assert self.aggregates.total_orders == 0
+
+    def test_late_listener_is_seeded_with_existing_orders(self):
+        order = self._create_order("alice", "10")
+        self.use_case.execute(order.id)
+        late = OrderAggregates()
+
+        self.repository.add_listener(late)
+
+        assert late.count(OrderStatus.PAID) == 1
+        assert late.revenue("USD").amount == Decimal("10")
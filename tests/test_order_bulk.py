@@ -0,0 +1,156 @@
+import io
+from datetime import datetime
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.infrastructure.bulk.order_formats import (
+    RejectedRecord,
+    read_orders_csv,
+    read_orders_jsonl,
+    write_orders_csv,
+    write_orders_jsonl,
+)
+from src.infrastructure.bulk.order_import import import_orders
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+
+
+def make_orders():
+    paid = Order(id="order-1", customer_id="alice", created_at=datetime(2024, 1, 1, 12, 0))
+    paid.add_line("prod_1", "Товар, с запятой", 2, Money(Decimal("10.25"), "USD"))
+    paid.add_line("prod_2", "Товар 2", 1, Money(Decimal("0.10"), "USD"))
+    paid.pay()
+    empty = Order(id="order-2", customer_id="bob", created_at=datetime(2024, 1, 2, 8, 30))
+    return [paid, empty]
+
+
+def assert_same_orders(loaded, expected):
+    assert [order.id for order in loaded] == [order.id for order in expected]
+    for order, original in zip(loaded, expected):
+        assert order == original
+        assert order.total_amount == original.total_amount
+
+
+class TestOrderFormats:
+
+    def test_jsonl_round_trip(self):
+        orders = make_orders()
+        buffer = io.StringIO()
+        assert write_orders_jsonl(orders, buffer) == 2
+
+        buffer.seek(0)
+        assert_same_orders(list(read_orders_jsonl(buffer)), orders)
+
+    def test_csv_round_trip(self):
+        orders = make_orders()
+        buffer = io.StringIO()
+        assert write_orders_csv(orders, buffer) == 2
+
+        buffer.seek(0)
+        assert_same_orders(list(read_orders_csv(buffer)), orders)
+
+    def test_malformed_jsonl_rows_are_reported_and_stream_continues(self):
+        buffer = io.StringIO()
+        write_orders_jsonl(make_orders(), buffer)
+        rows = buffer.getvalue().splitlines()
+        text = "\n".join([
+            "{not json",
+            rows[0],
+            '{"id": "bad", "customer_id": "c", "status": "created", "created_at": "2024-01-01T00:00:00",'
+            ' "lines": [{"product_id": "p", "product_name": "n", "quantity": 1, "price": "abc", "currency": "USD"}]}',
+            '{"id": "no-status", "customer_id": "c", "created_at": "2024-01-01T00:00:00"}',
+            rows[1],
+        ])
+
+        records = list(read_orders_jsonl(io.StringIO(text)))
+
+        assert [type(record) for record in records] == [RejectedRecord, Order, RejectedRecord, RejectedRecord, Order]
+        assert records[0].line == 1
+        assert records[2].order_id == "bad"
+        assert "status" in records[3].error
+
+    def test_malformed_csv_order_is_rejected_as_a_whole(self):
+        text = (
+            "order_id,customer_id,status,created_at,paid_at,product_id,product_name,quantity,price,currency\n"
+            "o1,alice,created,2024-01-01T00:00:00,,p1,Товар,1,10,USD\n"
+            "o1,alice,created,2024-01-01T00:00:00,,p2,Товар,0,10,USD\n"
+            "o2,bob,created,2024-01-01T00:00:00,,p1,Товар,3,1.5,USD\n"
+        )
+
+        records = list(read_orders_csv(io.StringIO(text)))
+
+        assert isinstance(records[0], RejectedRecord)
+        assert (records[0].line, records[0].order_id) == (2, "o1")
+        assert records[1].total_amount == Money(Decimal("4.5"), "USD")
+
+    def test_jsonl_numeric_price_keeps_exact_decimal(self):
+        order = Order(id="order-3", customer_id="carol", created_at=datetime(2024, 1, 3))
+        order.add_line("prod_1", "Товар", 3, Money(Decimal("19.99"), "USD"))
+        text = (
+            '{"id": "order-3", "customer_id": "carol", "status": "created", "created_at": "2024-01-03T00:00:00",'
+            ' "paid_at": null, "lines": [{"product_id": "prod_1", "product_name": "Товар", "quantity": 3,'
+            ' "price": 19.99, "currency": "USD"}]}'
+        )
+
+        loaded = list(read_orders_jsonl(io.StringIO(text)))
+        assert_same_orders(loaded, [order])
+        assert loaded[0].total_amount == Money(Decimal("59.97"), "USD")
+
+        buffer = io.StringIO()
+        write_orders_jsonl(loaded, buffer)
+        buffer.seek(0)
+        assert_same_orders(list(read_orders_jsonl(buffer)), [order])
+
+    def test_fractional_quantity_is_rejected(self):
+        line = '{"product_id": "p", "product_name": "n", "quantity": %s, "price": "1", "currency": "USD"}'
+        head = '{"id": "%s", "customer_id": "c", "status": "created", "created_at": "2024-01-01T00:00:00", "lines": [%s]}'
+        text = "\n".join([head % ("frac", line % "1.7"), head % ("whole", line % "2.0")])
+
+        records = list(read_orders_jsonl(io.StringIO(text)))
+
+        assert isinstance(records[0], RejectedRecord)
+        assert "целым" in records[0].error
+        assert records[1].lines.get("p").quantity == 2
+
+    def test_csv_without_required_columns(self):
+        records = list(read_orders_csv(io.StringIO("order_id,customer_id\no1,alice\n")))
+        assert len(records) == 1 and "status" in records[0].error
+
+
+class TestImportOrders:
+
+    def test_import_in_chunks_and_export_back(self):
+        repository = InMemoryOrderRepository()
+        buffer = io.StringIO()
+        write_orders_jsonl(make_orders(), buffer)
+        buffer.seek(0)
+
+        report = import_orders(repository, read_orders_jsonl(buffer), chunk_size=1)
+
+        assert (report.imported, report.rejected) == (2, 0)
+        assert repository.get_by_id("order-1").status == OrderStatus.PAID
+        exported = io.StringIO()
+        assert write_orders_jsonl(repository.iter_orders(), exported) == 2
+
+    def test_rejected_records_go_to_callback(self):
+        repository = InMemoryOrderRepository()
+        rejected = []
+        records = [RejectedRecord(1, "Ошибка"), *make_orders()]
+
+        report = import_orders(repository, records, on_error=rejected.append)
+
+        assert (report.imported, report.rejected, report.errors) == (2, 1, [])
+        assert rejected == [RejectedRecord(1, "Ошибка")]
+
+    def test_failed_chunk_is_retried_order_by_order(self):
+        repository = InMemoryOrderRepository()
+        existing = make_orders()[0]
+        repository.save(existing)
+        repository.save(existing)
+
+        report = import_orders(repository, make_orders(), chunk_size=10)
+
+        assert (report.imported, report.rejected) == (1, 1)
+        assert report.errors[0].order_id == "order-1"
+        assert report.errors[0].line is None
+        assert repository.get_by_id("order-2") is not None
@@ -0,0 +1,163 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.application.ports.order_repository import ConcurrentModificationError
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.sqlite_order_repository import SqliteOrderRepository
+from src.infrastructure.repositories.cold_order_store import SqliteColdOrderStore
+from src.infrastructure.repositories.tiered_order_repository import TieredOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class SlowPaymentGateway(FakePaymentGateway):
+
+    def charge(self, order_id: str, amount: Money) -> str:
+        time.sleep(0.01)
+        return super().charge(order_id, amount)
+
+
+@pytest.fixture(params=["memory", "sqlite", "tiered"])
+def repository(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryOrderRepository()
+        return
+    if request.param == "sqlite":
+        repository = SqliteOrderRepository(str(tmp_path / "orders.db"))
+    else:
+        # Маленький горячий уровень: запросы проверяются на обоих уровнях
+        repository = TieredOrderRepository(SqliteColdOrderStore(str(tmp_path / "cold.db")), hot_capacity=2)
+    yield repository
+    repository.close()
+
+
+def make_order() -> Order:
+    order = Order(customer_id="customer_123")
+    order.add_line("prod_1", "Товар 1", 1, Money(Decimal("100"), "USD"))
+    return order
+
+
+class TestOptimisticVersioning:
+
+    def test_save_increments_version(self, repository):
+        order = make_order()
+        repository.save(order)
+        assert order.version == 1
+        assert repository.get_by_id(order.id).version == 1
+
+    def test_stale_save_is_rejected(self, repository):
+        order = make_order()
+        repository.save(order)
+        first = repository.get_by_id(order.id)
+        second = repository.get_by_id(order.id)
+
+        first.cancel()
+        repository.save(first)
+        second.pay()
+
+        with pytest.raises(ConcurrentModificationError):
+            repository.save(second)
+        assert repository.get_by_id(order.id).status.value == "cancelled"
+
+    def test_stale_order_rejects_the_whole_batch(self, repository):
+        stale = make_order()
+        repository.save(stale)
+        repository.save(repository.get_by_id(stale.id))
+        fresh = make_order()
+
+        with pytest.raises(ConcurrentModificationError):
+            repository.save_many([fresh, stale])
+
+        assert fresh.version == 0
+        assert repository.get_by_id(fresh.id) is None
+
+    def test_loaded_orders_are_isolated(self):
+        repository = InMemoryOrderRepository()
+        order = make_order()
+        repository.save(order)
+
+        loaded = repository.get_by_id(order.id)
+        loaded.add_line("prod_2", "Товар 2", 1, Money(Decimal("1"), "USD"))
+
+        assert len(repository.get_by_id(order.id).lines) == 1
+
+
+class TestParallelPayments:
+
+    def test_same_order_is_charged_once(self, repository):
+        gateway = SlowPaymentGateway()
+        use_case = PayOrderUseCase(repository, gateway)
+        order = make_order()
+        repository.save(order)
+        barrier = threading.Barrier(8)
+
+        def pay():
+            barrier.wait()
+            try:
+                return use_case.execute(order.id)
+            except ValueError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: pay(), range(8)))
+
+        assert sum(1 for result in results if isinstance(result, dict)) == 1
+        assert len(gateway.transactions) == 1
+
+    def test_different_orders_are_paid_in_parallel(self, repository):
+        use_case = PayOrderUseCase(repository, SlowPaymentGateway())
+        orders = [make_order() for _ in range(16)]
+        repository.save_many(orders)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda order: use_case.execute(order.id), orders))
+
+        assert all(result["success"] for result in results)
+        assert all(repository.get_by_id(order.id).is_paid() for order in orders)
+
+    def test_order_lock_is_not_held_during_charge(self, repository):
+        order = make_order()
+        repository.save(order)
+        acquired = []
+
+        class ProbingGateway(FakePaymentGateway):
+
+            def charge(self, order_id: str, amount: Money) -> str:
+                # Другой поток должен получить блокировку заказа, пока идет списание
+                def probe():
+                    lock = repository.lock(order_id)
+                    acquired.append(lock.acquire(timeout=1))
+                    if acquired[-1]:
+                        lock.release()
+                thread = threading.Thread(target=probe)
+                thread.start()
+                thread.join()
+                return super().charge(order_id, amount)
+
+        PayOrderUseCase(repository, ProbingGateway()).execute(order.id)
+
+        assert acquired == [True]
+
+    def test_order_changed_during_charge_is_refunded(self, repository):
+        order = make_order()
+        repository.save(order)
+
+        class CancellingGateway(FakePaymentGateway):
+
+            def charge(self, order_id: str, amount: Money) -> str:
+                cancelled = repository.get_by_id(order_id)
+                cancelled.cancel()
+                repository.save(cancelled)
+                return super().charge(order_id, amount)
+
+        gateway = CancellingGateway()
+        with pytest.raises(ConcurrentModificationError):
+            PayOrderUseCase(repository, gateway).execute(order.id)
+
+        [transaction] = gateway.transactions.for_order(order.id)
+        assert transaction.refund_amount == transaction.amount
+        assert repository.get_by_id(order.id).status.value == "cancelled"
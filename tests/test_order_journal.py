@@ -0,0 +1,157 @@
+import os
+import pytest
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.columnar_order_lines import ColumnarOrderLines
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.order_journal import OrderJournal
+
+
+def make_order(customer_id: str = "customer_123") -> Order:
+    order = Order(customer_id=customer_id)
+    order.add_line("prod_1", "Товар 1", 2, Money(Decimal("10.50"), "USD"))
+    return order
+
+
+class TestDurableInMemoryOrderRepository:
+
+    def _open(self, directory, snapshot_every: int = 1000) -> InMemoryOrderRepository:
+        return InMemoryOrderRepository(OrderJournal(str(directory), snapshot_every=snapshot_every))
+
+    def test_state_survives_restart(self, tmp_path):
+        repository = self._open(tmp_path)
+        kept, paid, deleted = make_order(), make_order(), make_order()
+        repository.save_many([kept, paid, deleted])
+        paid.pay()
+        repository.save(paid)
+        repository.delete(deleted.id)
+        repository.close()
+
+        restored = self._open(tmp_path)
+
+        assert restored.get_by_id(kept.id) == kept
+        assert restored.get_by_id(paid.id).is_paid()
+        assert restored.get_by_id(deleted.id) is None
+        assert [order.id for order in restored.find_by_customer("customer_123")] == [kept.id, paid.id]
+
+    def test_snapshot_truncates_journal(self, tmp_path):
+        repository = self._open(tmp_path, snapshot_every=3)
+        orders = [make_order(f"customer_{i}") for i in range(4)]
+        repository.save_many(orders[:3])
+        repository.save(orders[3])
+        repository.close()
+
+        assert os.path.exists(tmp_path / "snapshot.bin")
+        journal = OrderJournal(str(tmp_path), snapshot_every=3)
+        restored = InMemoryOrderRepository(journal)
+        assert all(restored.get_by_id(order.id) == order for order in orders)
+        assert journal.records_since_snapshot == 1
+
+    def test_torn_tail_record_is_discarded(self, tmp_path):
+        repository = self._open(tmp_path)
+        order = make_order()
+        repository.save(order)
+        repository.close()
+        with open(tmp_path / "journal.log", "ab") as journal:
+            journal.write(b"\x01\xff\x00")
+
+        restored = self._open(tmp_path)
+        second = make_order("customer_456")
+        restored.save(second)
+        restored.close()
+
+        reopened = self._open(tmp_path)
+        assert reopened.get_by_id(order.id) == order
+        assert reopened.get_by_id(second.id) == second
+
+    def test_columnar_orders_keep_storage(self, tmp_path):
+        repository = self._open(tmp_path)
+        order = Order(customer_id="customer_123", lines=ColumnarOrderLines())
+        order.add_line("prod_1", "Товар 1", 3, Money(Decimal("1.25"), "USD"))
+        repository.save(order)
+        repository.close()
+
+        restored = self._open(tmp_path).get_by_id(order.id)
+
+        assert isinstance(restored.lines, ColumnarOrderLines)
+        assert restored.total_amount.amount == Decimal("3.75")
+
+    def test_replay_stops_at_first_corrupted_frame(self, tmp_path):
+        repository = self._open(tmp_path)
+        first, second, third = (make_order(f"customer_{i}") for i in range(3))
+        for order in (first, second, third):
+            repository.save(order)
+        repository.close()
+        path = tmp_path / "journal.log"
+        data = bytearray(path.read_bytes())
+        # Длина кадра цела, испорчен байт данных второй записи
+        frame_length = (len(data) - 8) // 3
+        data[8 + frame_length + 20] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        restored = self._open(tmp_path)
+
+        assert restored.get_by_id(first.id) == first
+        assert restored.get_by_id(second.id) is None
+        assert restored.get_by_id(third.id) is None
+        assert path.stat().st_size == 8 + frame_length
+
+    def test_failed_background_snapshot_keeps_sealed_journal(self, tmp_path, monkeypatch):
+        journal = OrderJournal(str(tmp_path), snapshot_every=2)
+        repository = InMemoryOrderRepository(journal)
+
+        def fail(orders):
+            raise OSError("диск заполнен")
+
+        monkeypatch.setattr(journal, "_write_snapshot_file", fail)
+        orders = [make_order(f"customer_{i}") for i in range(3)]
+        for order in orders:
+            repository.save(order)
+
+        with pytest.raises(ValueError, match="снимок"):
+            repository.close()
+        assert os.path.exists(tmp_path / "journal.log.1")
+        assert not os.path.exists(tmp_path / "snapshot.bin")
+
+        restored = self._open(tmp_path, snapshot_every=2)
+        assert all(restored.get_by_id(order.id) == order for order in orders)
+        restored.save(make_order())
+        restored.close()
+        assert not os.path.exists(tmp_path / "journal.log.1")
+
+    def test_failed_append_leaves_memory_and_journal_unchanged(self, tmp_path):
+        journal = OrderJournal(str(tmp_path))
+        repository = InMemoryOrderRepository(journal)
+        kept = make_order()
+        repository.save(kept)
+
+        class FailingFile:
+            def __init__(self, file):
+                self._file = file
+
+            def tell(self):
+                return self._file.tell()
+
+            def write(self, data):
+                # Кадр успевает записаться частично
+                self._file.write(data[:5])
+                self._file.flush()
+                raise OSError("диск заполнен")
+
+            def close(self):
+                self._file.close()
+
+        journal._journal = FailingFile(journal._journal)
+        lost = make_order("customer_456")
+        with pytest.raises(OSError):
+            repository.save(lost)
+
+        assert repository.get_by_id(lost.id) is None
+        assert lost.version == 0
+        repository.save(lost)
+        repository.close()
+
+        restored = self._open(tmp_path)
+        assert restored.get_by_id(kept.id) == kept
+        assert restored.get_by_id(lost.id).version == lost.version == 1
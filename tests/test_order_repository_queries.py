@@ -0,0 +1,153 @@
+import pytest
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.domain.order_summary import OrderSummary
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.order_index import OrderIndex
+from src.infrastructure.repositories.sqlite_order_repository import SqliteOrderRepository
+from src.infrastructure.repositories.cold_order_store import SqliteColdOrderStore
+from src.infrastructure.repositories.tiered_order_repository import TieredOrderRepository
+
+START = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture(params=["memory", "sqlite", "tiered"])
+def repository(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryOrderRepository()
+        return
+    if request.param == "sqlite":
+        repository = SqliteOrderRepository(str(tmp_path / "orders.db"))
+    else:
+        # Маленький горячий уровень: запросы проверяются на обоих уровнях
+        repository = TieredOrderRepository(SqliteColdOrderStore(str(tmp_path / "cold.db")), hot_capacity=2)
+    yield repository
+    repository.close()
+
+
+def make_order(customer_id: str, minutes: int) -> Order:
+    order = Order(customer_id=customer_id, created_at=START + timedelta(minutes=minutes))
+    order.add_line("prod_1", "Товар 1", 1, Money(Decimal("10"), "USD"))
+    return order
+
+
+def ids(orders):
+    return [order.id for order in orders]
+
+
+class TestOrderRepositoryQueries:
+
+    def test_find_by_customer(self, repository):
+        first, second, other = make_order("alice", 0), make_order("alice", 1), make_order("bob", 2)
+        repository.save_many([first, second, other])
+
+        assert sorted(ids(repository.find_by_customer("alice"))) == sorted([first.id, second.id])
+        assert repository.find_by_customer("nobody") == []
+
+    def test_status_index_follows_saves(self, repository):
+        order = make_order("alice", 0)
+        repository.save(order)
+        assert ids(repository.find_by_status(OrderStatus.CREATED)) == [order.id]
+
+        order.pay()
+        repository.save(order)
+
+        assert repository.find_by_status(OrderStatus.CREATED) == []
+        assert ids(repository.find_by_status(OrderStatus.PAID)) == [order.id]
+
+    def test_find_created_between_is_ordered_and_inclusive(self, repository):
+        orders = [make_order("alice", minutes) for minutes in (30, 0, 10, 20)]
+        repository.save_many(orders)
+
+        found = repository.find_created_between(START + timedelta(minutes=10), START + timedelta(minutes=20))
+
+        assert [order.created_at for order in found] == [
+            START + timedelta(minutes=10),
+            START + timedelta(minutes=20)
+        ]
+
+    def test_find_paid_between(self, repository):
+        paid, unpaid = make_order("alice", 0), make_order("alice", 1)
+        paid.pay()
+        repository.save_many([paid, unpaid])
+
+        found = repository.find_paid_between(paid.paid_at - timedelta(seconds=1), paid.paid_at)
+
+        assert ids(found) == [paid.id]
+
+    def test_delete_removes_from_indexes(self, repository):
+        order = make_order("alice", 0)
+        order.pay()
+        repository.save(order)
+
+        repository.delete(order.id)
+
+        assert repository.find_by_customer("alice") == []
+        assert repository.find_by_status(OrderStatus.PAID) == []
+        assert repository.find_paid_between(START, datetime.max) == []
+
+    def test_iter_orders_returns_every_order_in_batches(self, repository):
+        orders = [make_order("alice", minutes) for minutes in range(7)]
+        repository.save_many(orders)
+
+        assert sorted(ids(repository.iter_orders(batch_size=3))) == sorted(ids(orders))
+        assert sorted(repository.iter_ids(batch_size=3)) == sorted(ids(orders))
+
+    def test_views_use_stored_total_and_load_lines_lazily(self, repository):
+        order = make_order("alice", 0)
+        order.add_line("prod_2", "Товар 2", 3, Money(Decimal("0.25"), "USD"))
+        repository.save(order)
+
+        view = repository.get_view(order.id)
+
+        assert not view.is_loaded
+        assert (view.customer_id, view.status, view.total_amount) == ("alice", OrderStatus.CREATED, order.total_amount)
+        assert [line.product_id for line in view.lines] == ["prod_1", "prod_2"]
+        assert view.is_loaded
+        assert repository.get_view("missing") is None
+
+    def test_find_views(self, repository):
+        first, second = make_order("alice", 0), make_order("bob", 1)
+        first.pay()
+        repository.save_many([first, second])
+
+        assert [view.id for view in repository.find_views_by_customer("alice")] == [first.id]
+        assert [view.id for view in repository.find_views_by_status(OrderStatus.PAID)] == [first.id]
+        assert all(view.is_paid() for view in repository.find_views_by_status(OrderStatus.PAID))
+
+
+class TestOrderIndex:
+
+    def test_time_ranges_match_a_full_scan_across_blocks(self):
+        rng = random.Random(7)
+        index = OrderIndex()
+        created = {}
+        for step in range(5000):
+            order_id = f"order-{rng.randrange(2000)}"
+            if rng.random() < 0.2:
+                index.remove(order_id)
+                created.pop(order_id, None)
+                continue
+            created[order_id] = START + timedelta(minutes=rng.randrange(300))
+            index.put(OrderSummary(order_id, "customer", OrderStatus.CREATED, Money.zero(), created[order_id]))
+
+        for _ in range(50):
+            start = START + timedelta(minutes=rng.randrange(300))
+            end = start + timedelta(minutes=rng.randrange(60))
+            expected = sorted((moment, order_id) for order_id, moment in created.items() if start <= moment <= end)
+            assert index.ids_created_between(start, end) == [order_id for _, order_id in expected]
+
+    def test_status_change_keeps_time_entries(self):
+        index = OrderIndex()
+        summary = OrderSummary("order-1", "customer", OrderStatus.CREATED, Money.zero(), START)
+        index.put(summary)
+        index.put(OrderSummary("order-1", "customer", OrderStatus.PAID, Money.zero(), START, START))
+
+        assert index.ids_created_between(START, START) == ["order-1"]
+        assert index.ids_paid_between(START, START) == ["order-1"]
+        assert index.ids_by_status(OrderStatus.CREATED) == []
+        assert index.ids_by_status(OrderStatus.PAID) == ["order-1"]
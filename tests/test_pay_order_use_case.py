@@ -56,4 +56,48 @@ class TestPayOrderUseCase:
         saved_order = self.order_repository.get_by_id(order.id)
 
         with pytest.raises(ValueError, match="Нельзя изменять оплаченный заказ"):
-            saved_order.add_line("prod_2", "Товар 2", 1, Money(Decimal("50"), "USD"))
\ No newline at end of file
+            saved_order.add_line("prod_2", "Товар 2", 1, Money(Decimal("50"), "USD"))
+
+
+class TestPayOrderUseCaseBatch:
+
+    def setup_method(self):
+        self.order_repository = InMemoryOrderRepository()
+        self.payment_gateway = FakePaymentGateway()
+        self.use_case = PayOrderUseCase(self.order_repository, self.payment_gateway)
+
+    def _create_order(self) -> Order:
+        order = Order(customer_id="customer_123")
+        order.add_line("prod_1", "Товар 1", 1, Money(Decimal("100"), "USD"))
+        self.order_repository.save(order)
+        return order
+
+    def test_pays_all_orders(self):
+        orders = [self._create_order() for _ in range(3)]
+
+        results = self.use_case.execute_many([order.id for order in orders])
+
+        assert all(result["success"] for result in results.values())
+        assert len(self.payment_gateway.transactions) == 3
+        assert all(self.order_repository.get_by_id(order.id).is_paid() for order in orders)
+
+    def test_failing_order_does_not_abort_others(self):
+        good = self._create_order()
+        empty = Order(customer_id="customer_123")
+        self.order_repository.save(empty)
+
+        results = self.use_case.execute_many([good.id, empty.id, "missing"])
+
+        assert list(results) == [good.id, empty.id, "missing"]
+        assert results[good.id]["success"] is True
+        assert results[empty.id]["error"] == "Нельзя оплатить пустой заказ"
+        assert results["missing"]["error"] == "Заказ missing не найден"
+
+    def test_gateway_failure_keeps_orders_unpaid(self):
+        order = self._create_order()
+        self.payment_gateway.set_fail_mode(True)
+
+        results = self.use_case.execute_many([order.id])
+
+        assert results[order.id]["success"] is False
+        assert not self.order_repository.get_by_id(order.id).is_paid()
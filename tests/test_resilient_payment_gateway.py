@@ -0,0 +1,213 @@
+import threading
+import time
+import pytest
+from decimal import Decimal
+from src.domain.money import Money
+from src.application.ports.payment_gateway import PaymentGatewayUnavailableError
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.payment_gateways.resilient_payment_gateway import (
+    CircuitBreaker,
+    CircuitOpenError,
+    PaymentDeadlineExceededError,
+    ResilientPaymentGateway,
+    RetryPolicy,
+)
+
+AMOUNT = Money(Decimal("100"), "USD")
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FlakyGateway(FakePaymentGateway):
+    """Отказывает первые failures вызовов"""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+        self.calls = 0
+
+    def charge(self, order_id: str, amount: Money) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise PaymentGatewayUnavailableError("Платежный шлюз недоступен")
+        return super().charge(order_id, amount)
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_recovers(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+
+        clock.now = 10
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert not breaker.allow_request()
+
+    def test_release_trial_keeps_state_and_failures(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+
+        assert breaker.allow_request()
+        breaker.release_trial()
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+
+
+class HangingGateway(FakePaymentGateway):
+    """charge ждет, пока тест не отпустит release"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def charge(self, order_id: str, amount: Money) -> str:
+        self.release.wait(5)
+        return super().charge(order_id, amount)
+
+
+class InterruptingGateway(FakePaymentGateway):
+
+    def charge(self, order_id: str, amount: Money) -> str:
+        raise KeyboardInterrupt
+
+
+class TestResilientPaymentGateway:
+
+    def _wrap(self, gateway, **kwargs) -> ResilientPaymentGateway:
+        self.clock = FakeClock()
+        kwargs.setdefault("retry_policy", RetryPolicy(max_attempts=3, base_delay=0.1))
+        return ResilientPaymentGateway(gateway, clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_retries_transient_errors(self):
+        inner = FlakyGateway(failures=2)
+        gateway = self._wrap(inner)
+
+        transaction_id = gateway.charge("order-1", AMOUNT)
+
+        assert transaction_id in inner.transactions
+        assert inner.calls == 3
+
+    def test_gives_up_after_max_attempts(self):
+        inner = FlakyGateway(failures=5)
+        gateway = self._wrap(inner)
+
+        with pytest.raises(PaymentGatewayUnavailableError):
+            gateway.charge("order-1", AMOUNT)
+        assert inner.calls == 3
+
+    def test_business_errors_are_not_retried(self):
+        inner = FlakyGateway(failures=0)
+        gateway = self._wrap(inner)
+
+        with pytest.raises(ValueError, match="Сумма платежа должна быть положительной"):
+            gateway.charge("order-1", Money.zero())
+        assert inner.calls == 1
+        assert gateway.circuit_breaker.state == CircuitBreaker.CLOSED
+
+    def test_open_circuit_fails_fast(self):
+        inner = FlakyGateway(failures=100)
+        gateway = self._wrap(
+            inner,
+            circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+            retry_policy=RetryPolicy(max_attempts=1)
+        )
+        for _ in range(2):
+            with pytest.raises(PaymentGatewayUnavailableError):
+                gateway.charge("order-1", AMOUNT)
+
+        with pytest.raises(CircuitOpenError):
+            gateway.charge("order-1", AMOUNT)
+        assert inner.calls == 2
+
+    def test_deadline_stops_retries(self):
+        inner = FlakyGateway(failures=100)
+        gateway = self._wrap(
+            inner,
+            retry_policy=RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=1.0),
+            deadline=0.5,
+            rng=lambda: 1.0
+        )
+
+        with pytest.raises(PaymentDeadlineExceededError):
+            gateway.charge("order-1", AMOUNT)
+        assert inner.calls == 1
+
+    def test_deadline_bounds_a_hung_call(self):
+        inner = HangingGateway()
+        gateway = ResilientPaymentGateway(inner, deadline=0.05)
+
+        started = time.monotonic()
+        with pytest.raises(PaymentDeadlineExceededError, match="исход"):
+            gateway.charge("order-1", AMOUNT)
+        inner.release.set()
+
+        assert time.monotonic() - started < 1
+        assert gateway.circuit_breaker.state == CircuitBreaker.CLOSED
+
+    def test_interrupted_trial_does_not_wedge_half_open_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        gateway = self._wrap(InterruptingGateway(), circuit_breaker=breaker)
+
+        with pytest.raises(KeyboardInterrupt):
+            gateway.charge("order-1", AMOUNT)
+
+        assert breaker.allow_request()
+
+    def test_business_error_does_not_close_half_open_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0)
+        for _ in range(3):
+            breaker.record_failure()
+        gateway = self._wrap(FlakyGateway(failures=0), circuit_breaker=breaker)
+
+        with pytest.raises(ValueError, match="Сумма платежа должна быть положительной"):
+            gateway.charge("order-1", Money.zero())
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        gateway.charge("order-1", AMOUNT)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_fake_gateway_failure_rate(self):
+        inner = FakePaymentGateway()
+        inner.set_fail_mode(False, failure_rate=0.5, seed=42)
+        outcomes = []
+        for _ in range(50):
+            try:
+                inner.charge("order-1", AMOUNT)
+                outcomes.append(True)
+            except PaymentGatewayUnavailableError:
+                outcomes.append(False)
+
+        assert 0 < sum(outcomes) < 50
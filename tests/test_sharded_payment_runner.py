@@ -0,0 +1,175 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.application.ports.order_repository import ConcurrentModificationError
+from src.infrastructure.bulk.order_import import import_orders
+from src.infrastructure.sharding.sharded_order_repository import ShardedOrderRepository
+from src.infrastructure.sharding.sharded_payment_runner import ShardedPaymentRunner, shard_for
+
+START = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture(scope="module")
+def runner():
+    with ShardedPaymentRunner(shards=3) as runner:
+        yield runner
+
+
+@pytest.fixture
+def repository(runner):
+    return ShardedOrderRepository(runner)
+
+
+def make_order(customer_id: str = "customer", minutes: int = 0) -> Order:
+    order = Order(customer_id=customer_id, created_at=START + timedelta(minutes=minutes))
+    order.add_line("prod_1", "Товар 1", 2, Money(Decimal("10"), "USD"))
+    return order
+
+
+class TestShardRouting:
+
+    def test_shard_is_stable_and_in_range(self):
+        assert shard_for("order-1", 8) == shard_for("order-1", 8)
+        assert {shard_for(f"order-{i}", 8) for i in range(100)} == set(range(8))
+
+    def test_invalid_shard_count(self):
+        with pytest.raises(ValueError):
+            ShardedPaymentRunner(shards=0)
+
+
+class TestShardedPaymentRunner:
+
+    def test_execute_pays_order_in_its_shard(self, runner, repository):
+        order = make_order()
+        repository.save(order)
+
+        result = runner.execute(order.id)
+
+        assert result["success"] is True
+        assert result["amount"] == "20 USD"
+        assert repository.get_by_id(order.id).status == OrderStatus.PAID
+
+    def test_execute_errors_are_raised_in_caller(self, runner):
+        with pytest.raises(ValueError, match="не найден"):
+            runner.execute("missing")
+
+    def test_execute_many_spans_shards_and_keeps_order(self, runner, repository):
+        orders = [make_order() for _ in range(12)]
+        repository.save_many(orders)
+        order_ids = [order.id for order in orders] + ["missing"]
+
+        results = runner.execute_many(order_ids)
+
+        assert len({runner.shard_for(order.id) for order in orders}) > 1
+        assert list(results) == order_ids
+        assert all(results[order.id]["success"] for order in orders)
+        assert results["missing"]["success"] is False
+
+
+class TestShardedOrderRepository:
+
+    def test_save_updates_version_and_detects_conflicts(self, repository):
+        order = make_order()
+        repository.save(order)
+        stale = repository.get_by_id(order.id)
+        repository.save(order)
+
+        assert order.version == 2
+        with pytest.raises(ConcurrentModificationError) as error:
+            repository.save(stale)
+        assert error.value.order_id == order.id
+
+    def test_rejected_shard_does_not_hide_versions_saved_by_others(self, runner, repository):
+        stale = make_order()
+        repository.save(stale)
+        repository.save(repository.get_by_id(stale.id))
+        fresh = make_order()
+        while runner.shard_for(fresh.id) == runner.shard_for(stale.id):
+            fresh = make_order()
+        fresh.pay()
+
+        with pytest.raises(ConcurrentModificationError):
+            repository.save_many([stale, fresh])
+
+        assert fresh.version == repository.get_by_id(fresh.id).version == 1
+        assert repository.get_by_id(fresh.id).status == OrderStatus.PAID
+        assert stale.version == 1
+
+    def test_import_counts_orders_saved_by_other_shards(self, runner, repository):
+        stale = make_order()
+        repository.save(stale)
+        repository.save(repository.get_by_id(stale.id))
+        fresh = make_order()
+        while runner.shard_for(fresh.id) == runner.shard_for(stale.id):
+            fresh = make_order()
+
+        report = import_orders(repository, [stale, fresh])
+
+        assert (report.imported, report.rejected) == (1, 1)
+        assert report.errors[0].order_id == stale.id
+        assert repository.get_by_id(fresh.id).version == fresh.version == 1
+
+    def test_get_many_and_delete(self, repository):
+        orders = [make_order() for _ in range(6)]
+        repository.save_many(orders)
+        repository.delete(orders[0].id)
+
+        found = repository.get_many([order.id for order in orders])
+
+        assert list(found) == [order.id for order in orders[1:]]
+        assert all(found[order.id].version == 1 for order in orders[1:])
+
+    def test_queries_merge_all_shards(self, repository):
+        orders = [make_order("sharded-customer", minutes) for minutes in (40, 10, 30, 20, 0)]
+        repository.save_many(orders)
+
+        assert len(repository.find_by_customer("sharded-customer")) == 5
+        found = repository.find_created_between(START, START + timedelta(minutes=30))
+        assert [order.created_at for order in found if order.customer_id == "sharded-customer"] == [
+            START + timedelta(minutes=minutes) for minutes in (0, 10, 20, 30)
+        ]
+
+    def test_iter_orders_reads_every_shard_in_batches(self, repository):
+        orders = [make_order("iter-customer") for _ in range(7)]
+        repository.save_many(orders)
+
+        found = [order.id for order in repository.iter_orders(batch_size=2) if order.customer_id == "iter-customer"]
+
+        assert sorted(found) == sorted(order.id for order in orders)
+        assert {order.id for order in orders} <= set(repository.iter_ids())
+
+
+class TestShardedPaymentRunnerFailures:
+
+    def test_unpicklable_call_sends_nothing(self, runner, repository):
+        order = make_order()
+        repository.save(order)
+        shard = runner.shard_for(order.id)
+        other = (shard + 1) % runner.shards
+
+        with pytest.raises(Exception):
+            runner.call_many({shard: ("get_by_id", (order.id,)), other: ("get_by_id", (lambda: None,))})
+
+        assert runner.call(shard, "get_by_id", order.id).id == order.id
+
+    def test_send_failure_midway_drains_sent_shards(self, monkeypatch):
+        with ShardedPaymentRunner(shards=2) as runner:
+            repository = ShardedOrderRepository(runner)
+            orders = [make_order() for _ in range(8)]
+            repository.save_many(orders)
+            first = next(order for order in orders if runner.shard_for(order.id) == 0)
+
+            def broken_send(payload):
+                raise BrokenPipeError("Канал закрыт")
+
+            monkeypatch.setattr(runner._connections[1], "send_bytes", broken_send)
+            with pytest.raises(BrokenPipeError):
+                runner.call_many({0: ("get_by_id", (first.id,)), 1: ("get_by_id", ("missing",))})
+
+            # Ответ на прерванную пачку вычитан и не достается следующему вызову
+            assert runner.call(0, "get_many", [first.id]) == {first.id: first}
+            with pytest.raises(ValueError, match="повреждено"):
+                runner.call(1, "get_by_id", "missing")
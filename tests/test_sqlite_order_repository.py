@@ -0,0 +1,154 @@
+import pytest
+import sqlite3
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.repositories.sqlite_order_repository import SqliteOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class WriteBeforeLinesSelect:
+    """Соединение, которое перед чтением order_lines дает записать другому соединению"""
+
+    def __init__(self, connection: sqlite3.Connection, write):
+        self._connection = connection
+        self._write = write
+
+    def execute(self, statement: str, *parameters):
+        if "FROM order_lines" in statement:
+            self._write()
+        return self._connection.execute(statement, *parameters)
+
+
+class TestSqliteOrderRepository:
+
+    @pytest.fixture(autouse=True)
+    def setup_repository(self, tmp_path):
+        self.path = str(tmp_path / "orders.db")
+        self.repository = SqliteOrderRepository(self.path, batch_size=2)
+        yield
+        self.repository.close()
+
+    def _create_order(self, customer_id: str = "customer_123") -> Order:
+        order = Order(customer_id=customer_id)
+        order.add_line("prod_1", "Товар 1", 2, Money(Decimal("100.50"), "USD"))
+        order.add_line("prod_2", "Товар 2", 1, Money(Decimal("5"), "USD"))
+        return order
+
+    def test_save_and_load_round_trip(self):
+        order = self._create_order()
+        self.repository.save(order)
+
+        loaded = self.repository.get_by_id(order.id)
+
+        assert loaded == order
+        assert loaded.total_amount.amount == Decimal("206.00")
+        assert str(loaded.lines.get("prod_1").price) == "100.50 USD"
+
+    def test_missing_order_returns_none(self):
+        assert self.repository.get_by_id("missing") is None
+
+    def test_save_replaces_lines(self):
+        order = self._create_order()
+        self.repository.save(order)
+
+        order.remove_line("prod_1")
+        self.repository.save(order)
+
+        loaded = self.repository.get_by_id(order.id)
+        assert [line.product_id for line in loaded.lines] == ["prod_2"]
+
+    def test_delete_removes_order_and_lines(self):
+        order = self._create_order()
+        self.repository.save(order)
+
+        self.repository.delete(order.id)
+
+        assert self.repository.get_by_id(order.id) is None
+
+    def test_bulk_save_and_load(self):
+        orders = [self._create_order(f"customer_{i}") for i in range(5)]
+        self.repository.save_many(orders)
+
+        loaded = self.repository.get_many([order.id for order in orders] + ["missing"])
+
+        assert set(loaded) == {order.id for order in orders}
+        assert all(loaded[order.id] == order for order in orders)
+
+    def test_get_many_reads_orders_and_lines_from_one_snapshot(self):
+        order = self._create_order()
+        self.repository.save(order)
+        changed = self.repository.get_by_id(order.id)
+        changed.add_line("prod_3", "Товар 3", 1, Money(Decimal("1"), "USD"))
+        reader = SqliteOrderRepository(self.path, pool_size=1)
+        connection = reader._pool.get()
+        reader._pool.put(WriteBeforeLinesSelect(connection, lambda: self.repository.save(changed)))
+        try:
+            loaded = reader.get_by_id(order.id)
+        finally:
+            reader.close()
+
+        assert loaded.version == 1
+        assert len(loaded.lines) == 2
+        assert self.repository.get_by_id(order.id).version == 2
+
+    def test_batch_larger_than_parameter_limit(self, tmp_path):
+        repository = SqliteOrderRepository(str(tmp_path / "large.db"), batch_size=1200)
+        try:
+            orders = [self._create_order(f"customer_{i}") for i in range(1200)]
+            repository.save_many(orders)
+            repository.save_many(orders)
+
+            assert all(order.version == 2 for order in orders)
+            assert repository.get_by_id(orders[-1].id).version == 2
+        finally:
+            repository.close()
+
+    def test_duplicate_order_in_batch_is_rejected(self):
+        order = self._create_order()
+
+        with pytest.raises(ValueError, match="несколько раз"):
+            self.repository.save_many([order, order])
+
+        assert order.version == 0
+        assert self.repository.get_by_id(order.id) is None
+
+    def test_data_survives_reopen(self):
+        order = self._create_order()
+        self.repository.save(order)
+
+        reopened = SqliteOrderRepository(self.path)
+        try:
+            assert reopened.get_by_id(order.id) == order
+        finally:
+            reopened.close()
+
+    def test_new_database_gets_schema_version_and_indexes(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            assert connection.execute("PRAGMA user_version").fetchone()[0] == 1
+            indexes = {row[1] for row in connection.execute("PRAGMA index_list(orders)")}
+            assert {"orders_customer", "orders_status", "orders_created_at", "orders_paid_at"} <= indexes
+        finally:
+            connection.close()
+
+    def test_newer_schema_version_is_refused(self, tmp_path):
+        path = str(tmp_path / "newer.db")
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA user_version = 99")
+        connection.close()
+
+        with pytest.raises(ValueError, match="новее"):
+            SqliteOrderRepository(path)
+
+    def test_pay_order_use_case(self):
+        order = self._create_order()
+        self.repository.save(order)
+        use_case = PayOrderUseCase(self.repository, FakePaymentGateway())
+
+        use_case.execute(order.id)
+
+        loaded = self.repository.get_by_id(order.id)
+        assert loaded.is_paid()
+        assert loaded.paid_at is not None
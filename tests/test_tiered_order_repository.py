@@ -0,0 +1,157 @@
+import pytest
+import threading
+from decimal import Decimal
+from src.domain.money import Money
+from src.domain.order import Order
+from src.domain.order_status import OrderStatus
+from src.application.ports.order_repository import ConcurrentModificationError
+from src.application.use_cases.pay_order_use_case import PayOrderUseCase
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.repositories.cold_order_store import SqliteColdOrderStore
+from src.infrastructure.repositories.tiered_order_repository import TieredOrderRepository
+
+
+def make_order() -> Order:
+    order = Order(customer_id="customer")
+    order.add_line("prod_1", "Товар 1", 1, Money(Decimal("10"), "USD"))
+    return order
+
+
+@pytest.fixture
+def cold(tmp_path):
+    store = SqliteColdOrderStore(str(tmp_path / "cold.db"))
+    yield store
+    store.close()
+
+
+class TestTieredOrderRepository:
+
+    def test_created_orders_stay_hot_and_hits_are_counted(self, cold):
+        repository = TieredOrderRepository(cold, hot_capacity=10)
+        order = make_order()
+        repository.save(order)
+
+        assert repository.get_by_id(order.id) == order
+        stats = repository.stats()
+        assert (stats.hits, stats.misses, stats.hot_size) == (1, 0, 1)
+
+    def test_saves_are_written_through_and_survive_a_crash(self, tmp_path):
+        path = str(tmp_path / "crash.db")
+        repository = TieredOrderRepository(SqliteColdOrderStore(path), hot_capacity=10)
+        order = make_order()
+        repository.save(order)
+
+        # Без close(): другой процесс видит заказ на диске сразу после save
+        other = SqliteColdOrderStore(path)
+        try:
+            assert other.get(order.id) == order
+            assert other.versions([order.id, "missing"]) == {order.id: 1}
+        finally:
+            other.close()
+            repository.close()
+
+    def test_write_back_mode_defers_created_orders_until_flush(self, cold):
+        repository = TieredOrderRepository(cold, hot_capacity=10, write_through=False)
+        order = make_order()
+        repository.save(order)
+
+        assert len(cold) == 0
+        repository.flush()
+        assert cold.get(order.id) == order
+
+    def test_paid_orders_are_demoted_to_cold_store(self, cold):
+        repository = TieredOrderRepository(cold, hot_capacity=10)
+        order = make_order()
+        repository.save(order)
+
+        PayOrderUseCase(repository, FakePaymentGateway()).execute(order.id)
+
+        assert repository.stats().hot_size == 0
+        assert repository.stats().demotions == 1
+        assert cold.get(order.id).status == OrderStatus.PAID
+        assert repository.get_by_id(order.id).status == OrderStatus.PAID
+        assert repository.stats().promotions == 0
+
+    def test_lru_eviction_spills_changes_and_read_promotes(self, cold):
+        repository = TieredOrderRepository(cold, hot_capacity=2, write_through=False)
+        orders = [make_order() for _ in range(3)]
+        repository.save_many(orders)
+
+        stats = repository.stats()
+        assert (stats.hot_size, stats.evictions) == (2, 1)
+        assert cold.get(orders[0].id) == orders[0]
+
+        loaded = repository.get_by_id(orders[0].id)
+
+        assert loaded == orders[0]
+        stats = repository.stats()
+        assert (stats.misses, stats.promotions, stats.evictions) == (1, 1, 2)
+        assert stats.hit_ratio == 0.0
+
+    def test_version_is_checked_across_tiers(self, cold):
+        repository = TieredOrderRepository(cold, hot_capacity=1)
+        order = make_order()
+        repository.save(order)
+        stale = repository.get_by_id(order.id)
+        repository.save(make_order())
+        repository.save(order)
+
+        with pytest.raises(ConcurrentModificationError):
+            repository.save(stale)
+
+    def test_hot_copy_wins_over_stale_cold_copy(self, cold):
+        repository = TieredOrderRepository(cold, hot_capacity=1)
+        order = make_order()
+        repository.save(order)
+        repository.save(make_order())
+        promoted = repository.get_by_id(order.id)
+        promoted.customer_id = "other"
+        repository.save(promoted)
+
+        assert [found.id for found in repository.find_by_customer("other")] == [order.id]
+        assert order.id not in [found.id for found in repository.find_by_customer("customer")]
+
+    def test_flush_on_close_keeps_orders_across_restarts(self, tmp_path):
+        path = str(tmp_path / "restart.db")
+        repository = TieredOrderRepository(SqliteColdOrderStore(path))
+        order = make_order()
+        repository.save(order)
+        repository.close()
+
+        reopened = TieredOrderRepository(SqliteColdOrderStore(path))
+        assert reopened.get_by_id(order.id) == order
+        reopened.close()
+
+    def test_cold_views_use_typed_queries(self, cold):
+        repository = TieredOrderRepository(cold, hot_capacity=1)
+        orders = [make_order() for _ in range(3)]
+        repository.save_many(orders)
+
+        assert cold.summary(orders[0].id).total_amount == Money(Decimal("10"), "USD")
+        assert cold.summary("missing") is None
+        assert len(cold.summaries_by_customer("customer")) == 3
+        assert len(repository.find_views_by_status(OrderStatus.CREATED)) == 3
+
+    def test_cold_write_does_not_hold_shared_lock(self, cold):
+        repository = TieredOrderRepository(cold, hot_capacity=10)
+        hot = make_order()
+        repository.save(hot)
+        put_many = cold.put_many
+        reads = []
+
+        def put_many_while_reading(orders):
+            # Чтение из памяти в другом потоке не должно ждать транзакции холодного хранилища
+            reader = threading.Thread(target=lambda: reads.append(repository.get_by_id(hot.id)))
+            reader.start()
+            reader.join(timeout=5)
+            assert not reader.is_alive()
+            put_many(orders)
+
+        cold.put_many = put_many_while_reading
+        repository.save(make_order())
+
+        assert reads == [hot]
+
+    def test_invalid_capacity(self, cold):
+        with pytest.raises(ValueError):
+            TieredOrderRepository(cold, hot_capacity=0)
@@ -0,0 +1,111 @@
+import pytest
+from decimal import Decimal
+from src.domain.money import Money
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.payment_gateways.transaction_ledger import (
+    COMPLETED,
+    REFUNDED,
+    TransactionLedger,
+    TransactionRecord,
+)
+
+
+def usd(amount: str) -> Money:
+    return Money(Decimal(amount), "USD")
+
+
+class TestTransactionLedger:
+
+    def test_indexes_and_running_totals(self):
+        gateway = FakePaymentGateway()
+        first = gateway.charge("order-1", usd("10"))
+        gateway.charge("order-1", usd("5"))
+        gateway.charge("order-2", usd("7"))
+
+        gateway.refund(first, usd("4"))
+        ledger = gateway.transactions
+
+        assert [record.amount for record in ledger.for_order("order-1")] == [usd("10"), usd("5")]
+        assert [record.transaction_id for record in ledger.by_status(REFUNDED)] == [first]
+        assert (ledger.count(COMPLETED), ledger.count(REFUNDED)) == (2, 1)
+        assert ledger.total(COMPLETED) == usd("12")
+        assert ledger.refunded_total() == usd("4")
+
+    def test_repeated_refund_replaces_amount(self):
+        ledger = TransactionLedger()
+        ledger.add(TransactionRecord("t1", "order-1", usd("10")))
+
+        ledger.refund("t1", usd("3"))
+        ledger.refund("t1", usd("5"))
+
+        assert ledger.refunded_total() == usd("5")
+        assert ledger.count(REFUNDED) == 1
+
+    def test_unknown_transaction_refund(self):
+        with pytest.raises(ValueError, match="не найдена"):
+            TransactionLedger().refund("missing", usd("1"))
+
+    def test_limit_requires_archive(self):
+        with pytest.raises(ValueError):
+            TransactionLedger(max_active=10)
+
+
+class TestTransactionArchive:
+
+    def test_oldest_transactions_move_to_archive(self, tmp_path):
+        ledger = TransactionLedger(str(tmp_path / "ledger.jsonl"), max_active=10)
+        for i in range(25):
+            ledger.add(TransactionRecord(f"t{i}", f"order-{i}", usd("1")))
+
+        assert ledger.active_count <= 10
+        assert len(ledger) == 25
+        assert ledger.total(COMPLETED) == usd("25")
+        assert [record.transaction_id for record in ledger] == [f"t{i}" for i in range(25)]
+        assert ledger.for_order("order-0") == []
+        assert ledger.get("t0").order_id == "order-0"
+        assert "t0" in ledger and "t99" not in ledger
+
+    def test_refund_of_archived_transaction(self, tmp_path):
+        ledger = TransactionLedger(str(tmp_path / "ledger.jsonl"), max_active=2)
+        for i in range(5):
+            ledger.add(TransactionRecord(f"t{i}", "order", usd("2")))
+
+        ledger.refund("t0", usd("2"))
+
+        assert ledger.get("t0").status == REFUNDED
+        assert ledger.get("t0").refund_amount == usd("2")
+        assert [record.transaction_id for record in ledger.archived()].count("t0") == 1
+        assert ledger.count(REFUNDED) == 1
+        assert ledger.total(COMPLETED) == usd("8")
+
+    def test_archived_lookup_uses_offset_index(self, tmp_path):
+        ledger = TransactionLedger(str(tmp_path / "ledger.jsonl"), max_active=10)
+        for i in range(50):
+            ledger.add(TransactionRecord(f"t{i}", f"order-{i}", usd("1")))
+
+        ledger.refund("t3", usd("1"))
+        ledger.refund("t3", usd("0.5"))
+
+        assert ledger.get("t3").refund_amount == usd("0.5")
+        assert ledger.get("t40").status == COMPLETED
+        assert [record.transaction_id for record in ledger.archived()].count("t3") == 1
+        assert ledger.archived_count + ledger.active_count == 50
+
+    def test_refunded_transactions_are_archived_first(self, tmp_path):
+        ledger = TransactionLedger(str(tmp_path / "ledger.jsonl"), max_active=4)
+        for i in range(4):
+            ledger.add(TransactionRecord(f"t{i}", "order", usd("1")))
+        ledger.refund("t3", usd("1"))
+
+        ledger.add(TransactionRecord("t4", "order", usd("1")))
+
+        assert [record.transaction_id for record in ledger.archived()] == ["t3"]
+        assert ledger.for_order("order")[0].transaction_id == "t0"
+
+    def test_archived_refund_keeps_its_own_currency(self, tmp_path):
+        ledger = TransactionLedger(str(tmp_path / "ledger.jsonl"), max_active=1)
+        ledger.add(TransactionRecord("t0", "order", usd("10")))
+        ledger.refund("t0", Money(Decimal("900"), "RUB"))
+        ledger.add(TransactionRecord("t1", "order", usd("1")))
+
+        assert ledger.get("t0").refund_amount == Money(Decimal("900"), "RUB")